@@ -1,6 +1,8 @@
 from django.contrib import admin
+from django.db.models.expressions import RawSQL
 
-from .models import Group, Post
+from . import fulltext
+from .models import Group, Post, QueuedTask
 
 
 class PostAdmin(admin.ModelAdmin):
@@ -9,6 +11,17 @@ class PostAdmin(admin.ModelAdmin):
     list_filter = ('pub_date',)
     empty_value_display = '-пусто-'
 
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term or not fulltext.available():
+            return super().get_search_results(
+                request, queryset, search_term
+            )
+        if not fulltext.match_expression(search_term):
+            return queryset.none(), False
+        return queryset.filter(
+            pk__in=RawSQL(*fulltext.post_ids(search_term))
+        ), False
+
 
 class GroupAdmin(admin.ModelAdmin):
     list_display = ('pk', 'title', 'slug', 'description')
@@ -17,5 +30,12 @@ class GroupAdmin(admin.ModelAdmin):
     empty_value_display = '-пусто-'
 
 
+class QueuedTaskAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'name', 'status', 'attempts', 'run_at', 'created')
+    list_filter = ('status', 'name')
+    readonly_fields = ('locked_at', 'last_error', 'created')
+
+
 admin.site.register(Post, PostAdmin)
 admin.site.register(Group, GroupAdmin)
+admin.site.register(QueuedTask, QueuedTaskAdmin)
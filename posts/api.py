@@ -0,0 +1,280 @@
+import json
+from functools import wraps
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.http import Http404, JsonResponse
+from django.shortcuts import get_object_or_404
+
+from .forms import CommentForm, PostForm
+from .models import Comment, Group, Post, User
+from .paginators import KeysetPaginator
+
+SAFE_METHODS = ('GET', 'HEAD')
+# Поля ответа: имя в API -> поле для values().
+POST_FIELDS = {
+    'id': 'id',
+    'text': 'text',
+    'author': 'author__username',
+    'group': 'group_id',
+    'group_slug': 'group__slug',
+    'image': 'image',
+    'pub_date': 'pub_date',
+    'updated': 'updated',
+    'comment_count': 'comment_count',
+}
+COMMENT_FIELDS = {
+    'id': 'id',
+    'post': 'post_id',
+    'author': 'author__username',
+    'text': 'text',
+    'created': 'created',
+}
+GROUP_FIELDS = {
+    'id': 'id',
+    'title': 'title',
+    'slug': 'slug',
+    'description': 'description',
+}
+POST_ORDERING = ('-pub_date', '-id')
+COMMENT_ORDERING = ('-created', '-id')
+GROUP_ORDERING = ('id',)
+
+
+class ApiError(Exception):
+    def __init__(self, status, errors):
+        super().__init__(errors)
+        self.status = status
+        self.errors = errors
+
+
+def _errors(message, code):
+    return {'__all__': [{'message': message, 'code': code}]}
+
+
+def api_view(*methods):
+    """
+    Декоратор функций API: разрешены только методы methods.
+
+    Ошибки отдаются JSON вида {"errors": {поле: [{message, code}]}},
+    как form.errors.get_json_data(). Изменять данные могут только
+    авторизованные пользователи; проверка CSRF остаётся включённой,
+    токен передаётся заголовком X-CSRFToken.
+    """
+    allowed = {*methods, 'HEAD'} if 'GET' in methods else set(methods)
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in allowed:
+                response = JsonResponse({'errors': _errors(
+                    f'Метод {request.method} не поддерживается.',
+                    'method_not_allowed'
+                )}, status=405)
+                response['Allow'] = ', '.join(sorted(allowed))
+                return response
+            try:
+                if (request.method not in SAFE_METHODS
+                        and not request.user.is_authenticated):
+                    raise ApiError(
+                        401, _errors('Нужна авторизация.', 'not_authenticated')
+                    )
+                return view(request, *args, **kwargs)
+            except Http404:
+                return JsonResponse(
+                    {'errors': _errors('Не найдено.', 'not_found')},
+                    status=404
+                )
+            except ApiError as error:
+                return JsonResponse(
+                    {'errors': error.errors}, status=error.status
+                )
+        return wrapper
+    return decorator
+
+
+def selected_fields(request, fields):
+    """
+    Поля из ?fields=a,b в порядке запроса; без параметра — все.
+    """
+    names = [
+        name.strip()
+        for name in request.GET.get('fields', '').split(',')
+        if name.strip()
+    ]
+    if not names:
+        return fields
+    unknown = [name for name in names if name not in fields]
+    if unknown:
+        raise ApiError(400, {'fields': [{
+            'message': f'Неизвестные поля: {", ".join(unknown)}.',
+            'code': 'invalid',
+        }]})
+    return {name: fields[name] for name in names}
+
+
+def serialize(row, selected):
+    """Строка из values() в словарь ответа с полями selected."""
+    item = {name: row[lookup] for name, lookup in selected.items()}
+    if 'image' in item:
+        item['image'] = (
+            default_storage.url(item['image']) if item['image'] else None
+        )
+    return item
+
+
+def _values(queryset, selected, ordering=()):
+    lookups = [*selected.values(), *(name.lstrip('-') for name in ordering)]
+    if 'comment_count' in lookups:
+        queryset = queryset.with_comment_count()
+    return queryset.values(*dict.fromkeys(lookups))
+
+
+def _page_url(request, cursor):
+    if cursor is None:
+        return None
+    query = request.GET.copy()
+    query['cursor'] = cursor
+    return f'{request.path}?{query.urlencode()}'
+
+
+def _list(request, queryset, fields, ordering, per_page):
+    selected = selected_fields(request, fields)
+    paginator = KeysetPaginator(
+        _values(queryset, selected, ordering), per_page, ordering
+    )
+    page = paginator.get_page(request.GET.get('cursor'))
+    return JsonResponse({
+        'results': [serialize(row, selected) for row in page],
+        'next': _page_url(request, page.next_cursor),
+        'previous': _page_url(request, page.previous_cursor),
+    })
+
+
+def _post_list(request, queryset):
+    return _list(
+        request, queryset, POST_FIELDS, POST_ORDERING, settings.PER_PAGE
+    )
+
+
+def _post_detail(request, post_id, status=200):
+    selected = selected_fields(request, POST_FIELDS)
+    row = get_object_or_404(
+        _values(Post.objects.all(), selected), pk=post_id
+    )
+    return JsonResponse(serialize(row, selected), status=status)
+
+
+def form_data(request):
+    """
+    (data, files) для формы: тело JSON или, для POST, поля формы
+    и файлы multipart.
+    """
+    if request.content_type == 'application/json':
+        try:
+            data = json.loads(request.body or b'{}')
+        except ValueError:
+            data = None
+        if not isinstance(data, dict):
+            raise ApiError(
+                400, _errors('Тело должно быть объектом JSON.', 'parse_error')
+            )
+        return data, None
+    if request.method == 'POST':
+        return request.POST, request.FILES
+    raise ApiError(415, _errors(
+        'Ожидается application/json.', 'unsupported_media_type'
+    ))
+
+
+def _save_post(request, form, status):
+    if not form.is_valid():
+        return JsonResponse(
+            {'errors': form.errors.get_json_data()}, status=400
+        )
+    post = form.save(commit=False)
+    post.author = request.user
+    post.save()
+    return _post_detail(request, post.pk, status)
+
+
+@api_view('GET', 'POST')
+def posts(request):
+    """Лента всех постов; POST создаёт пост."""
+    if request.method == 'POST':
+        return _save_post(request, PostForm(*form_data(request)), 201)
+    return _post_list(request, Post.objects.all())
+
+
+@api_view('GET', 'PATCH')
+def post(request, post_id):
+    """Пост; PATCH меняет переданные поля, если это пост автора."""
+    if request.method in SAFE_METHODS:
+        return _post_detail(request, post_id)
+    instance = get_object_or_404(Post, pk=post_id)
+    if instance.author_id != request.user.pk:
+        raise ApiError(403, _errors(
+            'Редактировать пост может только автор.', 'permission_denied'
+        ))
+    data, files = form_data(request)
+    form = PostForm(
+        {'text': instance.text, 'group': instance.group_id, **data},
+        files,
+        instance=instance
+    )
+    return _save_post(request, form, 200)
+
+
+@api_view('GET')
+def group_posts(request, slug):
+    group_id = get_object_or_404(
+        Group.objects.values_list('id', flat=True), slug=slug
+    )
+    return _post_list(request, Post.objects.filter(group_id=group_id))
+
+
+@api_view('GET')
+def profile_posts(request, username):
+    author_id = get_object_or_404(
+        User.objects.values_list('id', flat=True), username=username
+    )
+    return _post_list(request, Post.objects.filter(author_id=author_id))
+
+
+@api_view('GET')
+def groups(request):
+    return _list(
+        request, Group.objects.all(), GROUP_FIELDS, GROUP_ORDERING,
+        settings.PER_PAGE
+    )
+
+
+@api_view('GET', 'POST')
+def comments(request, post_id):
+    """Комментарии к посту от новых к старым; POST добавляет комментарий."""
+    post_id = get_object_or_404(
+        Post.objects.values_list('id', flat=True), pk=post_id
+    )
+    if request.method in SAFE_METHODS:
+        return _list(
+            request, Comment.objects.filter(post_id=post_id), COMMENT_FIELDS,
+            COMMENT_ORDERING, settings.COMMENTS_PER_PAGE
+        )
+    selected = selected_fields(request, COMMENT_FIELDS)
+    form = CommentForm(*form_data(request))
+    if not form.is_valid():
+        return JsonResponse(
+            {'errors': form.errors.get_json_data()}, status=400
+        )
+    comment = form.save(commit=False)
+    comment.author = request.user
+    comment.post_id = post_id
+    comment.save()
+    row = {
+        'id': comment.pk,
+        'post_id': comment.post_id,
+        'author__username': request.user.username,
+        'text': comment.text,
+        'created': comment.created,
+    }
+    return JsonResponse(serialize(row, selected), status=201)
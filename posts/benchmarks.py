@@ -0,0 +1,310 @@
+import http.client
+import io
+import platform
+import random
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from urllib.parse import urlsplit
+
+import django
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.db import connection
+from django.db.models import Count
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+
+from . import bulk, counters, thumbnails
+from .models import Comment, Group, Post, User
+
+PERCENTILES = (50, 90, 99)
+IMAGE_SIZE = (1600, 900)
+# Картинки общие для нескольких постов: миниатюры создаются один раз.
+DISTINCT_IMAGES = 10
+# Метрики, по которым сравниваются прогоны, и как считать их рост.
+COMPARED = {
+    'p50_ms': 'time',
+    'p90_ms': 'time',
+    'queries': 'count',
+    'bytes': 'size',
+}
+# Изменение времени меньше этого порога считается шумом.
+MIN_TIME_DELTA_MS = 1.0
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def _image_file(rng, index):
+    name = f'posts/benchmark_{index}.jpg'
+    image = Image.new('RGB', IMAGE_SIZE, tuple(
+        rng.randrange(256) for _ in range(3)
+    ))
+    buffer = io.BytesIO()
+    image.save(buffer, format='JPEG', quality=85)
+    buffer.seek(0)
+    if default_storage.exists(name):
+        default_storage.delete(name)
+    return default_storage.save(name, buffer)
+
+
+def seed(users, groups, posts, comments, image_ratio, seed=0):
+    """
+    Заполняет базу тестовыми данными через bulk_create.
+
+    Даты постов и комментариев раскладываются по прошедшему году,
+    счётчики пересчитываются, миниатюры картинок создаются заранее.
+    """
+    rng = random.Random(seed)
+    password = make_password(None)
+    User.objects.bulk_create(
+        User(username=f'benchmark_user{i}', password=password)
+        for i in range(users)
+    )
+    user_ids = list(User.objects.filter(
+        username__startswith='benchmark_user'
+    ).order_by('pk').values_list('pk', flat=True))
+    Group.objects.bulk_create(
+        Group(title=f'Группа {i}', slug=f'benchmark-group-{i}',
+              description='Группа для замеров')
+        for i in range(groups)
+    )
+    group_ids = list(Group.objects.filter(
+        slug__startswith='benchmark-group-'
+    ).order_by('pk').values_list('pk', flat=True))
+    images = [
+        _image_file(rng, index)
+        for index in range(min(DISTINCT_IMAGES, posts) if image_ratio else 0)
+    ]
+    for name in images:
+        thumbnails.generate(name)
+    now = timezone.now()
+    year = 365 * 24 * 3600
+    with bulk.preserved_dates():
+        Post.objects.bulk_create(
+            Post(
+                text=' '.join(
+                    ['Текст тестового поста.'] * rng.randint(1, 20)
+                ),
+                author_id=rng.choice(user_ids),
+                group_id=rng.choice(group_ids + [None]),
+                image=rng.choice(images)
+                if images and rng.random() < image_ratio else None,
+                pub_date=now - timedelta(seconds=rng.randrange(year)),
+                updated=now
+            )
+            for _ in range(posts)
+        )
+        post_ids = list(Post.objects.values_list('pk', flat=True))
+        Comment.objects.bulk_create(
+            Comment(
+                post_id=rng.choice(post_ids),
+                author_id=rng.choice(user_ids),
+                text='Тестовый комментарий.',
+                created=now - timedelta(seconds=rng.randrange(year))
+            )
+            for _ in range(comments)
+        )
+    counters.rebuild(counters.actual_counts())
+    return {
+        'users': users,
+        'groups': groups,
+        'posts': posts,
+        'comments': comments,
+        'image_ratio': image_ratio,
+        'seed': seed,
+    }
+
+
+def scenarios():
+    """
+    (имя, метод, адрес, данные формы) для каждой замеряемой страницы.
+
+    Автор профиля — самый активный пользователь, пост — самый
+    комментируемый, чтобы замерять худший случай набора данных.
+    """
+    author = User.objects.annotate(
+        total=Count('posts')
+    ).order_by('-total').first()
+    group = Group.objects.annotate(
+        total=Count('posts')
+    ).order_by('-total').first()
+    post = Post.objects.select_related('author').annotate(
+        total=Count('comments')
+    ).order_by('-total').first()
+    post_url = (post.author.username, post.pk)
+    return [
+        ('index', 'get', reverse('index'), None),
+        ('group_posts', 'get', reverse('group', args=[group.slug]), None),
+        ('profile', 'get', reverse('profile', args=[author.username]), None),
+        ('post_view', 'get', reverse('post', args=post_url), None),
+        ('new_post', 'post', reverse('new_post'),
+         {'text': 'Пост из замера', 'group': group.pk}),
+        ('add_comment', 'post', reverse('add_comment', args=post_url),
+         {'text': 'Комментарий из замера'}),
+    ]
+
+
+def measure(client, method, url, data, requests, warmup, cold_cache):
+    """Время, число запросов к базе и объём ответа для одного адреса."""
+    timings, queries, sizes, statuses = [], [], [], set()
+    for number in range(warmup + requests):
+        if cold_cache:
+            cache.clear()
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            response = getattr(client, method)(url, data)
+            elapsed = (time.perf_counter() - started) * 1000
+        if number < warmup:
+            continue
+        timings.append(elapsed)
+        queries.append(len(captured))
+        sizes.append(len(response.content))
+        statuses.add(response.status_code)
+    result = {
+        f'p{value}_ms': percentile(timings, value / 100)
+        for value in PERCENTILES
+    }
+    result.update({
+        'mean_ms': statistics.mean(timings),
+        'queries': max(queries),
+        'bytes': max(sizes),
+        'status': sorted(statuses),
+        'requests': requests,
+    })
+    return result
+
+
+def run(requests=50, warmup=5, cold_cache=False):
+    """Замеряет все сценарии от имени первого тестового пользователя."""
+    client = Client()
+    client.force_login(User.objects.filter(
+        username__startswith='benchmark_user'
+    ).order_by('pk').first())
+    cache.clear()
+    results = {}
+    for name, method, url, data in scenarios():
+        results[name] = measure(
+            client, method, url, data, requests, warmup, cold_cache
+        )
+        results[name]['url'] = url
+    return results
+
+
+def _load_worker(base_url, paths, deadline, offset):
+    """
+    Запросы по кругу по одному соединению (keep-alive, если сервер его
+    поддерживает) до deadline. Возвращает (задержки в мс, ошибки).
+    """
+    url = urlsplit(base_url)
+    connection_class = (
+        http.client.HTTPSConnection if url.scheme == 'https'
+        else http.client.HTTPConnection
+    )
+    server = connection_class(url.netloc, timeout=30)
+    timings, errors, number = [], 0, offset
+    while time.perf_counter() < deadline:
+        path = url.path.rstrip('/') + paths[number % len(paths)]
+        number += 1
+        started = time.perf_counter()
+        try:
+            server.request('GET', path)
+            response = server.getresponse()
+            response.read()
+        except (OSError, http.client.HTTPException):
+            errors += 1
+            server.close()
+            continue
+        if response.status >= 400:
+            errors += 1
+        else:
+            timings.append((time.perf_counter() - started) * 1000)
+        if response.will_close:
+            server.close()
+    server.close()
+    return timings, errors
+
+
+def load(base_url, paths, concurrency=64, duration=10.0):
+    """
+    Нагружает уже запущенный сервер: concurrency потоков в течение
+    duration секунд запрашивают paths по кругу.
+
+    Возвращает число успешных запросов в секунду, перцентили задержки
+    и число ошибок (статус 4xx/5xx или обрыв соединения).
+    """
+    start = threading.Barrier(concurrency + 1)
+
+    def worker(offset):
+        start.wait()
+        return _load_worker(base_url, paths, deadline, offset)
+
+    with ThreadPoolExecutor(concurrency) as executor:
+        futures = [
+            executor.submit(worker, offset) for offset in range(concurrency)
+        ]
+        # Отсчёт начинается, когда все потоки созданы и ждут старта.
+        deadline = time.perf_counter() + duration
+        start.wait()
+        results = [future.result() for future in futures]
+    timings = [value for worker_timings, _ in results
+               for value in worker_timings]
+    result = {
+        'requests': len(timings),
+        'errors': sum(errors for _, errors in results),
+        'rps': len(timings) / duration,
+        'concurrency': concurrency,
+        'duration_s': duration,
+    }
+    if timings:
+        result.update({
+            f'p{value}_ms': percentile(timings, value / 100)
+            for value in PERCENTILES
+        })
+    return result
+
+
+def environment():
+    return {
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'database': connection.vendor,
+        'cache': settings.CACHES['default']['BACKEND'],
+        'debug': settings.DEBUG,
+        'timestamp': timezone.now().isoformat(),
+    }
+
+
+def compare(base, new, threshold):
+    """
+    Сравнивает два прогона и возвращает строки
+    (сценарий, метрика, было, стало, регрессия ли это).
+
+    Время и объём считаются регрессией при росте больше чем
+    на threshold (доля), число запросов — при любом росте.
+    """
+    rows = []
+    for name in sorted(set(base['results']) & set(new['results'])):
+        before, after = base['results'][name], new['results'][name]
+        for metric, kind in COMPARED.items():
+            old, value = before[metric], after[metric]
+            if kind == 'count':
+                regression = value > old
+            else:
+                regression = value > old * (1 + threshold)
+                if kind == 'time':
+                    regression = regression and (
+                        value - old >= MIN_TIME_DELTA_MS
+                    )
+            rows.append((name, metric, old, value, regression))
+    return rows
@@ -0,0 +1,282 @@
+import csv
+import json
+from collections import Counter
+from contextlib import contextmanager
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from . import counters, fragments
+from .models import Comment, Group, Post, User
+
+MODELS = ('group', 'post', 'comment')
+# Колонки CSV: объединение полей всех моделей, лишние остаются пустыми.
+FIELDS = (
+    'model', 'id', 'title', 'slug', 'description', 'text', 'author',
+    'group', 'post', 'image', 'pub_date', 'updated', 'created',
+)
+# Ограничение SQLite на число параметров в одном запросе.
+LOOKUP_CHUNK = 500
+
+
+def detect_format(path):
+    return 'csv' if path.endswith('.csv') else 'jsonl'
+
+
+def read_records(stream, file_format):
+    """Построчно читает записи из JSON Lines или CSV."""
+    if file_format == 'csv':
+        for row in csv.DictReader(stream):
+            yield {key: value for key, value in row.items() if value != ''}
+        return
+    for line in stream:
+        if line.strip():
+            yield json.loads(line)
+
+
+class RecordWriter:
+    """Пишет записи в JSON Lines или CSV по одной строке."""
+
+    def __init__(self, stream, file_format):
+        self.stream = stream
+        self.file_format = file_format
+        if file_format == 'csv':
+            self.writer = csv.DictWriter(stream, FIELDS)
+            self.writer.writeheader()
+
+    def write(self, record):
+        record = {
+            key: value.isoformat() if hasattr(value, 'isoformat') else value
+            for key, value in record.items()
+            if value is not None
+        }
+        if self.file_format == 'csv':
+            self.writer.writerow(record)
+        else:
+            self.stream.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+
+def export_records(chunk_size):
+    """
+    Все группы, посты и комментарии в порядке, пригодном для импорта.
+
+    Строки читаются курсором порциями по chunk_size, без создания
+    объектов моделей, поэтому память не растёт с размером базы.
+    """
+    groups = Group.objects.order_by('pk').values_list(
+        'id', 'title', 'slug', 'description'
+    )
+    for id_, title, slug, description in groups.iterator(chunk_size):
+        yield {'model': 'group', 'id': id_, 'title': title, 'slug': slug,
+               'description': description}
+    posts = Post.objects.order_by('pk').values_list(
+        'id', 'author__username', 'group__slug', 'text', 'image',
+        'pub_date', 'updated'
+    )
+    for id_, author, group, text, image, pub_date, updated in (
+        posts.iterator(chunk_size)
+    ):
+        yield {'model': 'post', 'id': id_, 'author': author, 'group': group,
+               'text': text, 'image': image or None, 'pub_date': pub_date,
+               'updated': updated}
+    comments = Comment.objects.order_by('pk').values_list(
+        'id', 'post_id', 'author__username', 'text', 'created'
+    )
+    for id_, post_id, author, text, created in comments.iterator(chunk_size):
+        yield {'model': 'comment', 'id': id_, 'post': post_id,
+               'author': author, 'text': text, 'created': created}
+
+
+@contextmanager
+def preserved_dates():
+    """
+    Отключает auto_now и auto_now_add, чтобы bulk_create сохранил
+    даты из файла, а не текущее время.
+    """
+    fields = [
+        field
+        for model in (Post, Comment)
+        for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now', False)
+        or getattr(field, 'auto_now_add', False)
+    ]
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def _date(value, default=None):
+    if not value:
+        return default or timezone.now()
+    parsed = parse_datetime(value) if isinstance(value, str) else value
+    if parsed is None:
+        raise ValueError(f'Неверная дата: {value!r}')
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed, timezone.utc)
+    return parsed
+
+
+def _chunks(values, size=LOOKUP_CHUNK):
+    values = list(values)
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+class Importer:
+    """
+    Загружает записи пачками через bulk_create.
+
+    Записи копятся по моделям и сохраняются каждые batch_size строк
+    одной транзакцией: сначала группы, потом посты, потом комментарии.
+    Авторы и группы ищутся по словарям username/slug -> id, которые
+    дополняются одним запросом на пачку. Неизвестные авторы создаются
+    без пароля. Id из файла сохраняются.
+    """
+
+    def __init__(self, batch_size=1000):
+        self.batch_size = batch_size
+        self.pending = {model: [] for model in MODELS}
+        self.authors = {}
+        self.groups = {}
+        self.created = Counter()
+        self.scopes = {fragments.index_scope()}
+        self.commented = set()
+
+    def add(self, record):
+        model = record.get('model')
+        if model not in self.pending:
+            raise ValueError(f'Неизвестная модель: {model!r}')
+        self.pending[model].append(record)
+        if sum(map(len, self.pending.values())) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        with transaction.atomic(), preserved_dates():
+            self._flush_groups(self.pending['group'])
+            self._flush_posts(self.pending['post'])
+            self._flush_comments(self.pending['comment'])
+        self.pending = {model: [] for model in MODELS}
+
+    def finish(self):
+        """Сохраняет остаток и вызывает settle()."""
+        self.flush()
+        return self.settle()
+
+    def settle(self):
+        """
+        Приводит в порядок то, что bulk_create обходит: счётчики,
+        версии фрагментов и последовательности id. Вызывается и после
+        ошибки — для пачек, сохранённых до неё.
+        """
+        statements = connection.ops.sequence_reset_sql(
+            no_style(), [Group, Post, Comment]
+        )
+        if statements:
+            with connection.cursor() as cursor:
+                for sql in statements:
+                    cursor.execute(sql)
+        counters.rebuild(counters.actual_counts())
+        for post_ids in _chunks(self.commented):
+            for post in Post.objects.filter(pk__in=post_ids).only(
+                'id', 'author_id', 'group_id'
+            ):
+                self.scopes.update(fragments.post_scopes(post))
+        fragments.bump(*self.scopes)
+        return self.created
+
+    def _resolve_authors(self, records):
+        missing = {record['author'] for record in records} - set(self.authors)
+        if not missing:
+            return
+        for usernames in _chunks(missing):
+            self.authors.update(User.objects.filter(
+                username__in=usernames
+            ).values_list('username', 'id'))
+        new = missing - set(self.authors)
+        if new:
+            User.objects.bulk_create(
+                User(username=username, password=make_password(None))
+                for username in new
+            )
+            for usernames in _chunks(new):
+                self.authors.update(User.objects.filter(
+                    username__in=usernames
+                ).values_list('username', 'id'))
+            self.created['user'] += len(new)
+
+    def _resolve_groups(self, slugs):
+        missing = set(slugs) - set(self.groups)
+        for chunk in _chunks(missing):
+            self.groups.update(Group.objects.filter(
+                slug__in=chunk
+            ).values_list('slug', 'id'))
+        unknown = missing - set(self.groups)
+        if unknown:
+            raise ValueError(f'Неизвестные группы: {", ".join(unknown)}')
+
+    def _flush_groups(self, records):
+        if not records:
+            return
+        Group.objects.bulk_create(
+            Group(
+                id=record.get('id'),
+                title=record['title'],
+                slug=record['slug'],
+                description=record.get('description', '')
+            )
+            for record in records
+        )
+        self._resolve_groups(record['slug'] for record in records)
+        self.created['group'] += len(records)
+
+    def _flush_posts(self, records):
+        if not records:
+            return
+        self._resolve_authors(records)
+        self._resolve_groups(
+            record['group'] for record in records if record.get('group')
+        )
+        posts = []
+        for record in records:
+            pub_date = _date(record.get('pub_date'))
+            post = Post(
+                id=record.get('id'),
+                text=record['text'],
+                author_id=self.authors[record['author']],
+                group_id=self.groups.get(record.get('group')),
+                image=record.get('image') or None,
+                pub_date=pub_date,
+                updated=_date(record.get('updated'), pub_date)
+            )
+            posts.append(post)
+            self.scopes.add(fragments.profile_scope(post.author_id))
+            if post.group_id is not None:
+                self.scopes.add(fragments.group_scope(post.group_id))
+        Post.objects.bulk_create(posts)
+        self.created['post'] += len(posts)
+
+    def _flush_comments(self, records):
+        if not records:
+            return
+        self._resolve_authors(records)
+        comments = [
+            Comment(
+                id=record.get('id'),
+                post_id=int(record['post']),
+                author_id=self.authors[record['author']],
+                text=record['text'],
+                created=_date(record.get('created'))
+            )
+            for record in records
+        ]
+        Comment.objects.bulk_create(comments)
+        self.commented.update(comment.post_id for comment in comments)
+        self.created['comment'] += len(comments)
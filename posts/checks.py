@@ -0,0 +1,101 @@
+from django.conf import settings
+from django.core.checks import Warning, register
+from django.template import engines
+from django.template.backends.django import DjangoTemplates
+
+CACHED_LOADER = 'django.template.loaders.cached.Loader'
+MANIFEST_STORAGE = (
+    'django.contrib.staticfiles.storage.ManifestStaticFilesStorage'
+)
+FAST_MIDDLEWARE = (
+    'django.middleware.gzip.GZipMiddleware',
+    'django.middleware.http.ConditionalGetMiddleware',
+)
+PER_PROCESS_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+def _uses_cached_loader(engine):
+    loaders = engine.engine.loaders
+    return bool(loaders) and all(
+        (loader[0] if isinstance(loader, (list, tuple)) else loader)
+        == CACHED_LOADER
+        for loader in loaders
+    )
+
+
+def _process_warnings():
+    """Отладка, компиляция шаблонов и соединения с базой."""
+    warnings = []
+    if settings.DEBUG:
+        warnings.append(Warning(
+            'DEBUG включён: Django хранит все SQL-запросы в памяти '
+            'и отдаёт подробные страницы ошибок.',
+            hint='Установите YATUBE_ENV=production или YATUBE_DEBUG=0.',
+            id='posts.W001',
+        ))
+    for engine in engines.all():
+        if isinstance(engine, DjangoTemplates) and not (
+            _uses_cached_loader(engine)
+        ):
+            warnings.append(Warning(
+                f'Шаблоны движка {engine.name} компилируются '
+                f'при каждом рендере.',
+                hint=f'Оберните загрузчики в {CACHED_LOADER}.',
+                id='posts.W002',
+            ))
+    for alias, database in settings.DATABASES.items():
+        if not database.get('CONN_MAX_AGE'):
+            warnings.append(Warning(
+                f'База {alias}: соединение открывается заново '
+                f'на каждый запрос.',
+                hint='Задайте CONN_MAX_AGE (YATUBE_CONN_MAX_AGE).',
+                id='posts.W003',
+            ))
+    return warnings
+
+
+def _serving_warnings():
+    """Кэш, статика, сжатие ответов и сессии."""
+    warnings = []
+    backend = settings.CACHES['default']['BACKEND']
+    if backend in PER_PROCESS_CACHES:
+        warnings.append(Warning(
+            f'Кэш {backend} не разделяется между процессами: у каждого '
+            f'воркера свой холодный кэш, инвалидация не доходит до других.',
+            hint='Выберите redis или memcached через YATUBE_CACHE.',
+            id='posts.W004',
+        ))
+    if settings.STATICFILES_STORAGE != MANIFEST_STORAGE:
+        warnings.append(Warning(
+            'Имена статических файлов без хэша: браузеры не могут '
+            'кэшировать их надолго.',
+            hint=f'Используйте STATICFILES_STORAGE = {MANIFEST_STORAGE!r}.',
+            id='posts.W005',
+        ))
+    for middleware in FAST_MIDDLEWARE:
+        if middleware not in settings.MIDDLEWARE:
+            warnings.append(Warning(
+                f'{middleware} не подключён.',
+                id='posts.W006',
+            ))
+    if settings.SESSION_ENGINE == 'django.contrib.sessions.backends.db':
+        warnings.append(Warning(
+            'Сессия читается из базы на каждый запрос.',
+            hint="Используйте SESSION_ENGINE 'django.contrib.sessions."
+                 "backends.cached_db'.",
+            id='posts.W007',
+        ))
+    return warnings
+
+
+@register('performance', deploy=True)
+def check_slow_settings(app_configs, **kwargs):
+    """
+    Предупреждает о настройках, которые замедляют работу в продакшене.
+
+    Запускается командой ./manage.py check --deploy.
+    """
+    return _process_warnings() + _serving_warnings()
@@ -0,0 +1,163 @@
+import hashlib
+import time
+from datetime import datetime, timezone
+from functools import wraps
+
+from django.conf import settings
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.views.decorators.http import condition
+
+from . import counters, fragments, routers
+from .models import Group, Post, User
+
+VALIDATORS_ATTR = '_page_validators'
+
+
+def index_page(request):
+    return [fragments.index_scope()], []
+
+
+def group_page(request, slug):
+    group_id = Group.objects.filter(slug=slug).values_list(
+        'id', flat=True
+    ).first()
+    if group_id is None:
+        return None
+    return [fragments.group_scope(group_id)], []
+
+
+def _author_counters(author_id):
+    return [counters.followers(author_id), counters.following(author_id)]
+
+
+def _author_id(username):
+    return User.objects.filter(username=username).values_list(
+        'id', flat=True
+    ).first()
+
+
+def profile_page(request, username):
+    author_id = _author_id(username)
+    if author_id is None:
+        return None
+    extra = _author_counters(author_id)
+    if request.user.is_authenticated:
+        # Кнопка подписки меняется вместе с числом подписок читателя.
+        extra.append(counters.following(request.user.pk))
+    return [fragments.profile_scope(author_id)], extra
+
+
+def profile_feed(request, username):
+    """Лента автора: в ней нет счётчиков подписок и кнопки подписки."""
+    author_id = _author_id(username)
+    if author_id is None:
+        return None
+    return [fragments.profile_scope(author_id)], []
+
+
+def post_page(request, username, post_id):
+    author_id = Post.objects.filter(
+        id=post_id, author__username=username
+    ).order_by().values_list('author_id', flat=True).first()
+    if author_id is None:
+        return None
+    scopes = [
+        fragments.post_scope(post_id),
+        fragments.profile_scope(author_id),
+    ]
+    return scopes, _author_counters(author_id)
+
+
+def validators(request, page, personal=True):
+    """
+    (ETag, Last-Modified) страницы без её рендера.
+
+    ETag — хэш версий областей кэша фрагментов, которые меняются при
+    публикации, правке и удалении постов и комментариев, а также
+    счётчиков, пользователя и адреса с параметрами. Для авторизованных
+    в него входят сессия и CSRF-cookie: страница с формой из прошлой
+    сессии не продлевается ответом 304. Страницы с personal=False
+    одинаковы для всех читателей, и читатель в ETag не входит.
+
+    Last-Modified — время последней смены версии областей. Оно не
+    отражает счётчики и состояние читателя, поэтому отдаётся только
+    для страниц, которые зависят лишь от областей, и только
+    когда эта секунда уже прошла: заголовок точен до секунды.
+
+    В течение settings.DATABASE_PIN_SECONDS после изменения областей
+    остаток запроса читает из основной базы, а не из реплики.
+    """
+    if page is None:
+        return None, None
+    scopes, extra = page
+    parts = [
+        *(fragments.version(scope) for scope in scopes),
+        *extra,
+        request.get_full_path(),
+    ]
+    private = personal and request.user.is_authenticated
+    if private:
+        parts += [
+            request.user.pk,
+            request.session.session_key,
+            request.META.get('CSRF_COOKIE'),
+        ]
+    etag = hashlib.md5(
+        ':'.join(str(part) for part in parts).encode()
+    ).hexdigest()
+    changed = max(fragments.modified(scope) for scope in scopes)
+    if time.time() - changed < settings.DATABASE_PIN_SECONDS:
+        # Реплики могли ещё не получить изменение, а фрагменты и ленты
+        # новой версии кэшируются до следующей: их читаем из основной.
+        routers.use_primary()
+    changed = int(changed)
+    last_modified = None
+    if not private and not extra and changed < int(time.time()):
+        last_modified = datetime.fromtimestamp(changed, timezone.utc)
+    return etag, last_modified
+
+
+def conditional_page(describe, personal=True):
+    """
+    Отвечает 304 на условные GET и HEAD, если страница не менялась.
+
+    describe(request, *args, **kwargs) возвращает области кэша
+    фрагментов и дополнительные значения, от которых зависит страница,
+    или None, если объекта нет. Ответы анонимам, а при personal=False
+    всем читателям, разрешено хранить общим кэшам
+    settings.PAGE_CACHE_MAX_AGE секунд, остальным — только браузеру.
+    """
+    def page_validators(request, *args, **kwargs):
+        if not hasattr(request, VALIDATORS_ATTR):
+            setattr(request, VALIDATORS_ATTR, validators(
+                request, describe(request, *args, **kwargs), personal
+            ))
+        return getattr(request, VALIDATORS_ATTR)
+
+    def decorator(view):
+        conditional_view = condition(
+            etag_func=lambda *args, **kwargs: page_validators(
+                *args, **kwargs
+            )[0],
+            last_modified_func=lambda *args, **kwargs: page_validators(
+                *args, **kwargs
+            )[1],
+        )(view)
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            response = conditional_view(request, *args, **kwargs)
+            if response.status_code in (200, 304):
+                if personal:
+                    patch_vary_headers(response, ['Cookie'])
+                if personal and request.user.is_authenticated:
+                    patch_cache_control(response, private=True, max_age=0)
+                else:
+                    patch_cache_control(
+                        response,
+                        public=True,
+                        max_age=settings.PAGE_CACHE_MAX_AGE
+                    )
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,158 @@
+from django.core.cache import cache
+from django.db.models import Count
+
+from .models import Follow, Group, Post, User
+from .routers import PRIMARY
+
+TOTAL_KEY = 'posts:count:total'
+AUTHOR_KEY = 'posts:count:author:{}'
+GROUP_KEY = 'posts:count:group:{}'
+FOLLOWERS_KEY = 'posts:count:followers:{}'
+FOLLOWING_KEY = 'posts:count:following:{}'
+
+
+def _get(key, queryset):
+    value = cache.get(key)
+    if value is None:
+        # Счётчик хранится без срока, поэтому считается не по реплике,
+        # которая могла ещё не получить последние записи.
+        value = queryset.using(PRIMARY).count()
+        cache.add(key, value, None)
+    return value
+
+
+def _shift(key, delta):
+    """Новое значение счётчика или None, если его нет в кэше."""
+    try:
+        return cache.incr(key, delta)
+    except ValueError:
+        # Счётчика ещё нет в кэше — он будет посчитан при первом чтении.
+        return None
+
+
+def total_posts():
+    """Общее число постов."""
+    return _get(TOTAL_KEY, Post.objects.all())
+
+
+def author_posts(author_id):
+    """Число постов автора."""
+    return _get(AUTHOR_KEY.format(author_id), Post.objects.filter(
+        author_id=author_id
+    ))
+
+
+def group_posts(group_id):
+    """Число постов в группе."""
+    return _get(GROUP_KEY.format(group_id), Post.objects.filter(
+        group_id=group_id
+    ))
+
+
+def followers(author_id):
+    """Число подписчиков автора."""
+    return _get(FOLLOWERS_KEY.format(author_id), Follow.objects.filter(
+        author_id=author_id
+    ))
+
+
+def following(user_id):
+    """Число авторов, на которых подписан пользователь."""
+    return _get(FOLLOWING_KEY.format(user_id), Follow.objects.filter(
+        user_id=user_id
+    ))
+
+
+def followers_many(author_ids):
+    """{id автора: число подписчиков} одним обращением к кэшу."""
+    keys = {FOLLOWERS_KEY.format(author_id): author_id
+            for author_id in author_ids}
+    cached = cache.get_many(list(keys))
+    result = {keys[key]: value for key, value in cached.items()}
+    missing = [author_id for key, author_id in keys.items()
+               if key not in cached]
+    if missing:
+        counted = dict.fromkeys(missing, 0)
+        follows = Follow.objects.using(PRIMARY).filter(
+            author_id__in=missing
+        )
+        counted.update(
+            follows.order_by().values('author').annotate(
+                total=Count('id')
+            ).values_list('author', 'total')
+        )
+        for author_id, total in counted.items():
+            cache.add(FOLLOWERS_KEY.format(author_id), total, None)
+        result.update(counted)
+    return result
+
+
+def post_added(author_id, group_id):
+    _shift(TOTAL_KEY, 1)
+    _shift(AUTHOR_KEY.format(author_id), 1)
+    if group_id is not None:
+        _shift(GROUP_KEY.format(group_id), 1)
+
+
+def post_removed(author_id, group_id):
+    _shift(TOTAL_KEY, -1)
+    _shift(AUTHOR_KEY.format(author_id), -1)
+    if group_id is not None:
+        _shift(GROUP_KEY.format(group_id), -1)
+
+
+def post_moved(old_group_id, new_group_id):
+    if old_group_id is not None:
+        _shift(GROUP_KEY.format(old_group_id), -1)
+    if new_group_id is not None:
+        _shift(GROUP_KEY.format(new_group_id), 1)
+
+
+def follow_added(user_id, author_id):
+    _shift(FOLLOWERS_KEY.format(author_id), 1)
+    _shift(FOLLOWING_KEY.format(user_id), 1)
+
+
+def follow_removed(user_id, author_id):
+    """Возвращает новое число подписчиков автора, если оно в кэше."""
+    _shift(FOLLOWING_KEY.format(user_id), -1)
+    return _shift(FOLLOWERS_KEY.format(author_id), -1)
+
+
+def actual_counts():
+    """Настоящие значения всех счётчиков, посчитанные по базе."""
+    counts = {TOTAL_KEY: Post.objects.count()}
+    by_author = User.objects.order_by().annotate(
+        total=Count('posts', distinct=True),
+        total_followers=Count('following', distinct=True),
+        total_following=Count('follower', distinct=True),
+    ).values_list('id', 'total', 'total_followers', 'total_following')
+    for author_id, total, total_followers, total_following in by_author:
+        counts[AUTHOR_KEY.format(author_id)] = total
+        counts[FOLLOWERS_KEY.format(author_id)] = total_followers
+        counts[FOLLOWING_KEY.format(author_id)] = total_following
+    by_group = Group.objects.order_by().annotate(
+        total=Count('posts')
+    ).values_list('id', 'total')
+    for group_id, total in by_group:
+        counts[GROUP_KEY.format(group_id)] = total
+    return counts
+
+
+def drift(counts):
+    """
+    Сравнивает закэшированные счётчики с настоящими значениями.
+
+    Возвращает список (ключ, в кэше, в базе) для расходящихся счётчиков.
+    Отсутствующий в кэше счётчик расхождением не считается.
+    """
+    cached = cache.get_many(list(counts))
+    return [
+        (key, cached[key], value)
+        for key, value in counts.items()
+        if key in cached and cached[key] != value
+    ]
+
+
+def rebuild(counts):
+    cache.set_many(counts, None)
@@ -0,0 +1,242 @@
+import io
+import json
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.feedgenerator import (
+    Atom1Feed, Rss201rev2Feed, SyndicationFeed
+)
+from django.utils.html import linebreaks
+from django.utils.text import Truncator
+from django.utils.xmlutils import SimplerXMLGenerator
+
+from . import conditional, fragments
+from .models import Group, Post, User
+
+FEED_KEY = 'posts:feed:{}:{}:{}:{}:{}'
+
+
+class StreamingFeed:
+    """
+    Пишет ленту по частям: заголовок, затем записи пачками по
+    settings.FEED_CHUNK_ITEMS, затем окончание документа.
+
+    Дата обновления ленты передаётся аргументом updated, а не
+    вычисляется по списку записей, которого здесь нет.
+    """
+
+    def latest_post_date(self):
+        return self.feed['updated']
+
+    def stream(self, items):
+        buffer = io.StringIO()
+        handler = SimplerXMLGenerator(buffer, 'utf-8')
+        self.open(handler)
+        for number, item in enumerate(items, 1):
+            self.add_item(**item)
+            self.write_items(handler)
+            self.items.clear()
+            if number % settings.FEED_CHUNK_ITEMS == 0:
+                yield _drain(buffer)
+        self.close(handler)
+        yield _drain(buffer)
+
+
+def _drain(buffer):
+    value = buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+    return value
+
+
+class StreamingRssFeed(StreamingFeed, Rss201rev2Feed):
+    def open(self, handler):
+        handler.startDocument()
+        handler.startElement('rss', self.rss_attributes())
+        handler.startElement('channel', self.root_attributes())
+        self.add_root_elements(handler)
+
+    def close(self, handler):
+        self.endChannelElement(handler)
+        handler.endElement('rss')
+
+
+class StreamingAtomFeed(StreamingFeed, Atom1Feed):
+    def open(self, handler):
+        handler.startDocument()
+        handler.startElement('feed', self.root_attributes())
+        self.add_root_elements(handler)
+
+    def close(self, handler):
+        handler.endElement('feed')
+
+
+class StreamingJsonFeed(SyndicationFeed):
+    """Лента в формате JSON Feed 1.1 (https://jsonfeed.org)."""
+    content_type = 'application/feed+json; charset=utf-8'
+    version = 'https://jsonfeed.org/version/1.1'
+
+    def stream(self, items):
+        header = json.dumps({
+            'version': self.version,
+            'title': self.feed['title'],
+            'home_page_url': self.feed['link'],
+            'feed_url': self.feed['feed_url'],
+            'description': self.feed['description'],
+        }, ensure_ascii=False)
+        chunk = [header[:-1], ', "items": [']
+        for number, item in enumerate(items):
+            if number:
+                chunk.append(', ')
+            chunk.append(self.item_json(item))
+            if (number + 1) % settings.FEED_CHUNK_ITEMS == 0:
+                yield ''.join(chunk)
+                chunk = []
+        chunk.append(']}')
+        yield ''.join(chunk)
+
+    def item_json(self, item):
+        data = {
+            'id': item['unique_id'],
+            'url': item['link'],
+            'title': item['title'],
+            'content_html': item['description'],
+            'date_published': item['pubdate'],
+            'date_modified': item['updateddate'],
+            'authors': [{
+                'name': item['author_name'],
+                'url': item['author_link'],
+            }],
+        }
+        if item['categories']:
+            data['tags'] = list(item['categories'])
+        return json.dumps(data, cls=DjangoJSONEncoder, ensure_ascii=False)
+
+
+FORMATS = {
+    'rss': StreamingRssFeed,
+    'atom': StreamingAtomFeed,
+    'json': StreamingJsonFeed,
+}
+
+
+def _title(text):
+    lines = text.strip().splitlines()
+    return Truncator(lines[0] if lines else '').chars(80)
+
+
+def items(request, queryset):
+    """Записи ленты: посты читаются курсором, без кэша результатов."""
+    posts = queryset.select_related('author', 'group').order_by(
+        '-pub_date', '-id'
+    )[:settings.FEED_ITEMS]
+    for post in posts.iterator(chunk_size=settings.FEED_CHUNK_ITEMS):
+        link = request.build_absolute_uri(
+            reverse('post', args=[post.author.username, post.pk])
+        )
+        yield {
+            'title': _title(post.text),
+            'link': link,
+            'unique_id': link,
+            'description': linebreaks(post.text, autoescape=True),
+            'author_name': post.author.get_full_name()
+            or post.author.username,
+            'author_link': request.build_absolute_uri(
+                reverse('profile', args=[post.author.username])
+            ),
+            'pubdate': post.pub_date,
+            'updateddate': post.updated,
+            'categories': [post.group.title] if post.group else (),
+        }
+
+
+def _cached(key, chunks):
+    """Отдаёт части ленты и кэширует документ, если он дописан до конца."""
+    parts = []
+    for chunk in chunks:
+        parts.append(chunk)
+        yield chunk
+    cache.set(key, ''.join(parts), settings.FRAGMENT_CACHE_TIMEOUT)
+
+
+def render_feed(request, fmt, scope, queryset, title, link, description):
+    """
+    Ответ с лентой формата fmt.
+
+    Готовый документ хранится в кэше под версией области scope и
+    устаревает вместе с фрагментами страниц. При промахе лента
+    выводится потоком и сохраняется по мере вывода.
+    """
+    feed_class = FORMATS.get(fmt)
+    if feed_class is None:
+        raise Http404(f'Неизвестный формат ленты: {fmt}')
+    # Ссылки в ленте абсолютные, поэтому документ зависит от схемы
+    # и хоста.
+    key = FEED_KEY.format(
+        scope, fragments.version(scope), fmt, request.scheme,
+        request.get_host()
+    )
+    cached = cache.get(key)
+    if cached is not None:
+        return HttpResponse(cached, content_type=feed_class.content_type)
+    feed = feed_class(
+        title=title,
+        link=request.build_absolute_uri(link),
+        description=description,
+        feed_url=request.build_absolute_uri(),
+        language=settings.LANGUAGE_CODE,
+        updated=datetime.fromtimestamp(
+            fragments.modified(scope), timezone.utc
+        ),
+    )
+    return StreamingHttpResponse(
+        _cached(key, feed.stream(items(request, queryset))),
+        content_type=feed_class.content_type
+    )
+
+
+@conditional.conditional_page(
+    lambda request, fmt: conditional.index_page(request), personal=False
+)
+def index_feed(request, fmt):
+    return render_feed(
+        request, fmt, fragments.index_scope(), Post.objects.all(),
+        'Yatube: последние записи', reverse('index'),
+        'Новые записи всех авторов'
+    )
+
+
+@conditional.conditional_page(
+    lambda request, fmt, slug: conditional.group_page(request, slug),
+    personal=False
+)
+def group_feed(request, fmt, slug):
+    group = get_object_or_404(Group, slug=slug)
+    return render_feed(
+        request, fmt, fragments.group_scope(group.id),
+        Post.objects.filter(group_id=group.id),
+        f'Yatube: {group.title}', reverse('group', args=[group.slug]),
+        group.description
+    )
+
+
+@conditional.conditional_page(
+    lambda request, fmt, username: conditional.profile_feed(
+        request, username
+    ),
+    personal=False
+)
+def profile_feed(request, fmt, username):
+    author = get_object_or_404(User, username=username)
+    return render_feed(
+        request, fmt, fragments.profile_scope(author.id),
+        Post.objects.filter(author_id=author.id),
+        f'Yatube: {author.get_full_name() or author.username}',
+        reverse('profile', args=[author.username]),
+        f'Записи автора {author.username}'
+    )
@@ -1,19 +1,53 @@
+from django import forms
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import UploadedFile
 from django.forms import ModelForm
 
 from .models import Post, Comment
+from .uploads import OversizedUploadedFile, normalize_image
 
 User = get_user_model()
 
 
+class PostImageField(forms.ImageField):
+    default_error_messages = {
+        'too_large': 'Файл слишком большой: %(size)s МБ, '
+                     'допустимо не больше %(limit)s МБ.',
+    }
+
+    def to_python(self, data):
+        if isinstance(data, OversizedUploadedFile) or (
+            data is not None
+            and data.size > settings.POST_IMAGE_MAX_UPLOAD_SIZE
+        ):
+            raise forms.ValidationError(
+                self.error_messages['too_large'],
+                code='too_large',
+                params={
+                    'size': round(data.size / 2 ** 20, 1),
+                    'limit': round(
+                        settings.POST_IMAGE_MAX_UPLOAD_SIZE / 2 ** 20, 1
+                    ),
+                }
+            )
+        return super().to_python(data)
+
+
 class PostForm(ModelForm):
     class Meta:
         model = Post
         fields = ('text', 'group', 'image')
+        field_classes = {'image': PostImageField}
+
+    def clean_image(self):
+        image = self.cleaned_data.get('image')
+        if isinstance(image, UploadedFile):
+            return normalize_image(image)
+        return image
 
 
 class CommentForm(ModelForm):
     class Meta:
         model = Comment
         fields = ('text',)
-
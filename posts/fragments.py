@@ -0,0 +1,267 @@
+import hashlib
+import math
+import random
+import time
+import zlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+VERSION_KEY = 'posts:version:{}'
+FRAGMENT_KEY = 'posts:fragment:{}:{}:{}'
+STALE_KEY = 'posts:fragment-stale:{}:{}'
+LOCK_KEY = 'posts:fragment-lock:{}:{}'
+STATS_KEY = 'posts:fragment-stats:{}:{}'
+MODIFIED_KEY = 'posts:modified:{}'
+CARD_KEY = 'posts:card:{}:{}'
+CARD_TEMPLATE = 'includes/post_card.html'
+SCOPE_NAMES = ('index', 'group', 'profile')
+COMPRESSED = b'z'
+
+
+def index_scope():
+    return 'index'
+
+
+def group_scope(group_id):
+    return f'group:{group_id}'
+
+
+def profile_scope(author_id):
+    return f'profile:{author_id}'
+
+
+def post_scope(post_id):
+    return f'post:{post_id}'
+
+
+def post_scopes(post):
+    """Области кэша, в которых выводится пост."""
+    scopes = [
+        index_scope(),
+        profile_scope(post.author_id),
+        post_scope(post.pk),
+    ]
+    if post.group_id is not None:
+        scopes.append(group_scope(post.group_id))
+    return scopes
+
+
+def _initial_version():
+    # Версия от текущего времени всегда больше вытесненной из кэша,
+    # поэтому старые фрагменты не оживут после потери ключа версии.
+    return int(time.time() * 1000)
+
+
+def version(scope):
+    key = VERSION_KEY.format(scope)
+    value = cache.get(key)
+    if value is None:
+        cache.add(key, _initial_version(), None)
+        value = cache.get(key)
+    return value
+
+
+def modified(scope):
+    """
+    Время (timestamp) последней смены версии области. Если оно
+    вытеснено из кэша, считается, что область изменилась сейчас.
+    """
+    key = MODIFIED_KEY.format(scope)
+    value = cache.get(key)
+    if value is None:
+        cache.add(key, time.time(), None)
+        value = cache.get(key)
+    return value
+
+
+def bump(*scopes):
+    """Делает недействительными все фрагменты указанных областей."""
+    scopes = set(scopes)
+    for scope in scopes:
+        key = VERSION_KEY.format(scope)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, _initial_version(), None)
+    now = time.time()
+    cache.set_many(
+        {MODIFIED_KEY.format(scope): now for scope in scopes}, None
+    )
+
+
+def _digest(vary_on):
+    return hashlib.md5(
+        ':'.join(str(value) for value in vary_on).encode()
+    ).hexdigest()
+
+
+def fragment_key(scope, vary_on):
+    return FRAGMENT_KEY.format(scope, version(scope), _digest(vary_on))
+
+
+def pack(html):
+    """
+    Сжимает html длиннее settings.FRAGMENT_COMPRESS_MIN_LENGTH.
+
+    Сжатые значения хранятся как bytes с префиксом, короткие — строкой.
+    """
+    if len(html) < settings.FRAGMENT_COMPRESS_MIN_LENGTH:
+        return html
+    return COMPRESSED + zlib.compress(html.encode())
+
+
+def unpack(value):
+    if isinstance(value, bytes):
+        value = zlib.decompress(value[len(COMPRESSED):]).decode()
+    return mark_safe(value)
+
+
+def _fresh(entry):
+    """
+    Вероятностное раннее обновление (XFetch): чем ближе истечение
+    срока и чем дольше рендер, тем вероятнее промах до истечения.
+    """
+    _, delta, expires = entry
+    early = -delta * settings.FRAGMENT_XFETCH_BETA * math.log(
+        1 - random.random()
+    )
+    return time.time() + early < expires
+
+
+def _protected(name):
+    return name in settings.FRAGMENT_STAMPEDE_SCOPES
+
+
+def get_or_render(scope, vary_on, render):
+    """
+    Возвращает фрагмент из кэша или рендерит и кэширует его.
+
+    Время жизни задаётся settings.FRAGMENT_CACHE_TIMEOUT: свежесть
+    обеспечивает смена версии области, а не истечение срока.
+
+    Для областей из settings.FRAGMENT_STAMPEDE_SCOPES после смены
+    версии рендерит только тот запрос, что взял блокировку, остальные
+    отдают прежнюю версию фрагмента. В режиме xfetch фрагмент
+    обновляется заранее, до истечения срока.
+    """
+    digest = _digest(vary_on)
+    key = FRAGMENT_KEY.format(scope, version(scope), digest)
+    name = scope.split(':')[0]
+    mode = settings.FRAGMENT_STAMPEDE_MODE if _protected(name) else None
+    entry = cache.get(key)
+    if isinstance(entry, tuple) and (mode != 'xfetch' or _fresh(entry)):
+        _count(name, 'hits')
+        return unpack(entry[0])
+    stale_key = STALE_KEY.format(scope, digest)
+    lock_key = LOCK_KEY.format(scope, digest)
+    locked = mode == 'lock' and cache.add(
+        lock_key, 1, settings.FRAGMENT_LOCK_TIMEOUT
+    )
+    if mode == 'lock' and not locked:
+        stale = cache.get(stale_key)
+        if stale is not None:
+            _count(name, 'hits')
+            return unpack(stale)
+    _count(name, 'misses')
+    try:
+        started = time.time()
+        content = render()
+        finished = time.time()
+    finally:
+        if locked:
+            cache.delete(lock_key)
+    timeout = settings.FRAGMENT_CACHE_TIMEOUT
+    expires = finished + timeout if timeout else math.inf
+    packed = pack(content)
+    cache.set(key, (packed, finished - started, expires), timeout)
+    if mode == 'lock':
+        cache.set(stale_key, packed, timeout)
+    return content
+
+
+def _count(name, kind):
+    key = STATS_KEY.format(name, kind)
+    if not cache.add(key, 1, None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, 1, None)
+
+
+def stats():
+    """Попадания и промахи кэша фрагментов по областям."""
+    keys = {
+        (name, kind): STATS_KEY.format(name, kind)
+        for name in SCOPE_NAMES
+        for kind in ('hits', 'misses')
+    }
+    values = cache.get_many(list(keys.values()))
+    return {
+        name: {
+            kind: values.get(keys[(name, kind)], 0)
+            for kind in ('hits', 'misses')
+        }
+        for name in SCOPE_NAMES
+    }
+
+
+def reset_stats():
+    cache.delete_many([
+        STATS_KEY.format(name, kind)
+        for name in SCOPE_NAMES
+        for kind in ('hits', 'misses')
+    ])
+
+
+def card_key(post):
+    """
+    Ключ карточки поста: id и версия всего, что в ней выводится.
+
+    Автор и группа должны быть загружены вместе с постом
+    (Post.objects.for_feed()), чтобы ключ считался без запросов.
+    """
+    group = post.group
+    version = ':'.join(str(value) for value in (
+        post.updated.isoformat(),
+        post.author.username,
+        group.slug if group else '',
+        group.title if group else '',
+    ))
+    return CARD_KEY.format(
+        post.pk, hashlib.md5(version.encode()).hexdigest()
+    )
+
+
+def render_card(post):
+    return render_to_string(CARD_TEMPLATE, {'post': post})
+
+
+def get_cards(posts):
+    """
+    Возвращает {id поста: html карточки} одним обращением к кэшу.
+
+    Недостающие карточки рендерятся и сохраняются одним set_many.
+    """
+    keys = {card_key(post): post for post in posts}
+    cards = {
+        key: unpack(value)
+        for key, value in cache.get_many(list(keys)).items()
+    }
+    missing = {
+        key: render_card(post)
+        for key, post in keys.items()
+        if key not in cards
+    }
+    if missing:
+        cache.set_many(
+            {key: pack(html) for key, html in missing.items()},
+            settings.FRAGMENT_CACHE_TIMEOUT
+        )
+        cards.update(missing)
+    return {
+        post.pk: mark_safe(cards[key])
+        for key, post in keys.items()
+    }
@@ -0,0 +1,204 @@
+import re
+
+from django.conf import settings
+from django.db import connection, connections
+from django.db.models import Q
+
+from .models import Comment, Post
+from .paginators import KeysetPaginator
+
+POST_INDEX = 'posts_post_fts'
+COMMENT_INDEX = 'posts_comment_fts'
+# Совпадение в комментарии ранжируется ниже такого же совпадения в посте.
+COMMENT_WEIGHT = 0.5
+MAX_TERMS = 10
+TOKEN = re.compile(r'\w+')
+
+INDEX_SQL = '''
+CREATE VIRTUAL TABLE IF NOT EXISTS {index} USING fts5(
+    text,
+    content='{table}',
+    content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2'
+)
+'''
+TRIGGERS_SQL = (
+    '''
+    CREATE TRIGGER IF NOT EXISTS {index}_insert AFTER INSERT ON {table}
+    BEGIN
+        INSERT INTO {index}(rowid, text) VALUES (new.id, new.text);
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS {index}_delete AFTER DELETE ON {table}
+    BEGIN
+        INSERT INTO {index}({index}, rowid, text)
+        VALUES ('delete', old.id, old.text);
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS {index}_update
+    AFTER UPDATE OF text ON {table}
+    BEGIN
+        INSERT INTO {index}({index}, rowid, text)
+        VALUES ('delete', old.id, old.text);
+        INSERT INTO {index}(rowid, text) VALUES (new.id, new.text);
+    END
+    ''',
+)
+REBUILD_SQL = "INSERT INTO {index}({index}) VALUES ('rebuild')"
+
+MATCHES_SQL = f'''
+SELECT post_id, MIN(rank) AS rank FROM (
+    SELECT rowid AS post_id, bm25({POST_INDEX}) AS rank
+    FROM {POST_INDEX} WHERE {POST_INDEX} MATCH %s
+    UNION ALL
+    SELECT comment.post_id, bm25({COMMENT_INDEX}) * %s AS rank
+    FROM {COMMENT_INDEX}
+    JOIN posts_comment AS comment ON comment.id = {COMMENT_INDEX}.rowid
+    WHERE {COMMENT_INDEX} MATCH %s
+)
+GROUP BY post_id
+'''
+
+INDEXES = (
+    (POST_INDEX, Post._meta.db_table),
+    (COMMENT_INDEX, Comment._meta.db_table),
+)
+
+_available = set()
+
+
+def install(using='default'):
+    """
+    Создаёт индексы FTS5 и триггеры, которые поддерживают их
+    в актуальном состоянии. Повторный вызов ничего не меняет.
+
+    Вызывается после каждой миграции: пересоздание таблицы
+    в миграции SQLite удаляет её триггеры.
+    """
+    db = connections[using]
+    if db.vendor != 'sqlite':
+        return False
+    existing = set(db.introspection.table_names())
+    with db.cursor() as cursor:
+        for index, table in INDEXES:
+            cursor.execute(INDEX_SQL.format(index=index, table=table))
+            for trigger in TRIGGERS_SQL:
+                cursor.execute(trigger.format(index=index, table=table))
+            if index not in existing:
+                cursor.execute(REBUILD_SQL.format(index=index))
+    _available.add(using)
+    return True
+
+
+def rebuild(using='default'):
+    """Перестраивает индексы по текущему содержимому таблиц."""
+    install(using)
+    with connections[using].cursor() as cursor:
+        for index, _ in INDEXES:
+            cursor.execute(REBUILD_SQL.format(index=index))
+
+
+def available():
+    if connection.alias in _available:
+        return True
+    if connection.vendor != 'sqlite':
+        return False
+    if POST_INDEX in connection.introspection.table_names():
+        _available.add(connection.alias)
+        return True
+    return False
+
+
+def match_expression(query):
+    """
+    Запрос пользователя в виде выражения MATCH.
+
+    Из запроса берутся только слова, и каждое берётся в кавычки,
+    поэтому синтаксис FTS5 (AND, NEAR, *, :) в нём не срабатывает.
+    """
+    terms = TOKEN.findall(query)[:MAX_TERMS]
+    return ' '.join(f'"{term}"' for term in terms)
+
+
+def post_ids(query):
+    """Подзапрос id постов, в тексте которых есть все слова query."""
+    return (
+        f'SELECT rowid FROM {POST_INDEX} WHERE {POST_INDEX} MATCH %s',
+        [match_expression(query)]
+    )
+
+
+class SearchPaginator(KeysetPaginator):
+    """
+    Постраничный вывод результатов поиска по релевантности (bm25).
+
+    Ключ страницы — пара (ранг, id поста), поэтому следующая страница
+    не пересчитывает предыдущие через OFFSET.
+    """
+
+    def __init__(self, match, per_page):
+        super().__init__(
+            Post.objects.for_feed(), per_page, ordering=('search_rank', 'id')
+        )
+        self.match = match
+
+    def _fetch(self, ordering, values=None):
+        descending = ordering[0].startswith('-')
+        params = [self.match, COMMENT_WEIGHT, self.match]
+        where = ''
+        if values is not None:
+            sign = '<' if descending else '>'
+            where = (
+                f'WHERE rank {sign} %s OR (rank = %s AND post_id {sign} %s)'
+            )
+            params += [values[0], values[0], values[1]]
+        direction = 'DESC' if descending else 'ASC'
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT post_id, rank FROM ({MATCHES_SQL}) {where} '
+                f'ORDER BY rank {direction}, post_id {direction} LIMIT %s',
+                params + [self.per_page + 1]
+            )
+            rows = cursor.fetchall()
+        posts = self.object_list.in_bulk([post_id for post_id, _ in rows])
+        result = []
+        for post_id, rank in rows:
+            post = posts.get(post_id)
+            if post is not None:
+                post.search_rank = rank
+                result.append(post)
+        return result
+
+    def dump_values(self, obj):
+        return [obj.search_rank, obj.pk]
+
+    def load_values(self, raw_values):
+        rank, post_id = raw_values
+        return [float(rank), int(post_id)]
+
+
+def fallback_queryset(query):
+    """Поиск подстрокой (LIKE) для баз без FTS5."""
+    commented = Comment.objects.filter(
+        text__icontains=query
+    ).values('post_id')
+    return Post.objects.for_feed().filter(
+        Q(text__icontains=query) | Q(pk__in=commented)
+    )
+
+
+def paginate(request, query):
+    """Возвращает пару (paginator, page) с результатами поиска query."""
+    query = query.strip()
+    paginator = KeysetPaginator(Post.objects.none(), settings.PER_PAGE)
+    if available():
+        match = match_expression(query)
+        if match:
+            paginator = SearchPaginator(match, settings.PER_PAGE)
+    elif query:
+        paginator = KeysetPaginator(
+            fallback_queryset(query), settings.PER_PAGE
+        )
+    return paginator, paginator.get_page(request.GET.get('cursor'))
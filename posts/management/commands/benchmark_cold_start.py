@@ -0,0 +1,102 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+
+from posts import benchmarks, warmup
+
+VIEWS = ('index', 'group_posts', 'profile', 'post_view')
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет первый запрос к каждой странице в новом процессе '
+        'с кэширующим загрузчиком шаблонов: без прогрева и после '
+        'warm_templates. Каждый замер — отдельный процесс со своей '
+        'тестовой базой.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=3,
+                            help='Процессов на страницу и режим.')
+        parser.add_argument('--json', action='store_true',
+                            help='Вывести результат в JSON.')
+        parser.add_argument('--child', help='Служебный: замер в процессе.')
+        parser.add_argument('--warm', action='store_true',
+                            help='Служебный: прогреть шаблоны.')
+
+    def handle(self, *args, **options):
+        if options['child']:
+            self.measure_child(options['child'], options['warm'])
+            return
+        results = []
+        for name in VIEWS:
+            row = {'view': name}
+            for mode in ('cold', 'warm'):
+                timings = [
+                    self.spawn(name, mode == 'warm')
+                    for _ in range(options['repeat'])
+                ]
+                row[f'{mode}_ms'] = statistics.median(
+                    timing['first_ms'] for timing in timings
+                )
+                if mode == 'warm':
+                    row['warmup_ms'] = statistics.median(
+                        timing['warmup_ms'] for timing in timings
+                    )
+            results.append(row)
+        if options['json']:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+        for row in results:
+            self.stdout.write(
+                f'{row["view"]}: первый запрос {row["cold_ms"]:.1f} мс '
+                f'без прогрева, {row["warm_ms"]:.1f} мс после прогрева '
+                f'({row["warmup_ms"]:.1f} мс на прогрев)'
+            )
+
+    def spawn(self, name, warm):
+        command = [
+            sys.executable, os.path.join(settings.BASE_DIR, 'manage.py'),
+            'benchmark_cold_start', '--child', name,
+        ]
+        if warm:
+            command.append('--warm')
+        # Без отладки Django включает кэширующий загрузчик шаблонов.
+        env = {**os.environ, 'YATUBE_DEBUG': '0'}
+        result = subprocess.run(
+            command, env=env, capture_output=True, text=True
+        )
+        if result.returncode:
+            raise CommandError(result.stderr)
+        return json.loads(result.stdout.strip().splitlines()[-1])
+
+    def measure_child(self, name, warm):
+        connection.creation.create_test_db(verbosity=0, autoclobber=True,
+                                           serialize=False)
+        benchmarks.seed(users=5, groups=2, posts=50, comments=100,
+                        image_ratio=0)
+        urls = {
+            scenario: url
+            for scenario, method, url, _ in benchmarks.scenarios()
+        }
+        warmup_ms = 0
+        if warm:
+            _, _, elapsed = warmup.warm_templates()
+            warmup_ms = elapsed * 1000
+        client = Client()
+        started = time.perf_counter()
+        response = client.get(urls[name])
+        first_ms = (time.perf_counter() - started) * 1000
+        if response.status_code != 200:
+            raise CommandError(f'{urls[name]}: {response.status_code}')
+        self.stdout.write(json.dumps({
+            'view': name, 'first_ms': first_ms, 'warmup_ms': warmup_ms,
+        }))
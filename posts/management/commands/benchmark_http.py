@@ -0,0 +1,78 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from posts import benchmarks
+
+
+class Command(BaseCommand):
+    help = (
+        'Нагружает запущенные серверы и сравнивает число запросов в '
+        'секунду и задержку при высокой конкурентности, например WSGI '
+        'и ASGI: --target wsgi=http://127.0.0.1:8000 '
+        '--target asgi=http://127.0.0.1:8001. Без --path запрашиваются '
+        'страницы index, group_posts, profile и post_view из сценариев '
+        'benchmark_views, поэтому база серверов должна быть заполнена.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--target', action='append', required=True,
+            help='имя=адрес сервера, можно указать несколько раз.'
+        )
+        parser.add_argument('--path', action='append',
+                            help='Адрес страницы, можно несколько раз.')
+        parser.add_argument('--concurrency', type=int, default=64)
+        parser.add_argument('--duration', type=float, default=10.0,
+                            help='Секунд на каждый сервер.')
+        parser.add_argument('--warmup', type=float, default=2.0,
+                            help='Секунд прогрева перед замером.')
+        parser.add_argument('--output', help='Записать JSON в файл.')
+
+    def handle(self, *args, **options):
+        targets = []
+        for target in options['target']:
+            name, separator, url = target.partition('=')
+            if not separator or not url.startswith(('http://', 'https://')):
+                raise CommandError(f'Ожидается имя=http://хост:порт: {target}')
+            targets.append((name, url))
+        paths = options['path'] or self.default_paths()
+        results = {}
+        for name, url in targets:
+            if options['warmup']:
+                benchmarks.load(
+                    url, paths, options['concurrency'], options['warmup']
+                )
+            results[name] = benchmarks.load(
+                url, paths, options['concurrency'], options['duration']
+            )
+            self.report(name, results[name])
+        report = {
+            'environment': benchmarks.environment(),
+            'paths': paths,
+            'results': results,
+        }
+        if options['output']:
+            with open(options['output'], 'w') as stream:
+                json.dump(report, stream, indent=2)
+
+    def default_paths(self):
+        try:
+            scenarios = benchmarks.scenarios()
+        except AttributeError:
+            raise CommandError(
+                'В базе нет данных для сценариев, передайте --path.'
+            )
+        return [url for _, method, url, _ in scenarios if method == 'get']
+
+    def report(self, name, row):
+        if not row['requests']:
+            self.stdout.write(f'{name}: нет успешных ответов, '
+                              f'{row["errors"]} ошибок')
+            return
+        self.stdout.write(
+            f'{name}: {row["rps"]:.1f} запросов/с, '
+            f'p50 {row["p50_ms"]:.1f} мс, p90 {row["p90_ms"]:.1f} мс, '
+            f'p99 {row["p99_ms"]:.1f} мс, {row["errors"]} ошибок '
+            f'при {row["concurrency"]} соединениях'
+        )
@@ -0,0 +1,88 @@
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from sorl.thumbnail import default
+
+from posts import thumbnails
+from posts.models import Post
+
+VIEWPORTS = ((360, 2), (768, 1), (1440, 1), (1440, 2))
+
+
+def slot_width(viewport):
+    """Ширина слота картинки по правилу POST_IMAGE_SIZES."""
+    for rule in settings.POST_IMAGE_SIZES.split(','):
+        condition, _, width = rule.strip().rpartition(' ')
+        if condition:
+            minimum = int(condition.split(':')[1].strip(' px)'))
+            if viewport < minimum:
+                continue
+        if width.endswith('vw'):
+            return viewport * int(width[:-2]) / 100
+        return int(width.rstrip('px'))
+    return viewport
+
+
+def pick(variants, needed):
+    """Вариант из srcset, который выберет браузер для needed пикселей."""
+    for thumbnail in variants:
+        if thumbnail.width >= needed:
+            return thumbnail
+    return variants[-1]
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает объём картинок первой страницы ленты: одна миниатюра '
+        'POST_THUMBNAIL_GEOMETRY против выбора из srcset для разных экранов.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--json', action='store_true',
+                            help='Вывести результат в JSON.')
+
+    def handle(self, *args, **options):
+        posts = list(
+            Post.objects.exclude(image='').exclude(image__isnull=True)
+            [:settings.PER_PAGE]
+        )
+        sizes = {}
+        pages = []
+        for post in posts:
+            variants = sorted(
+                thumbnails.generate(post.image),
+                key=lambda thumbnail: thumbnail.width
+            )
+            for thumbnail in variants:
+                sizes[thumbnail.name] = default.storage.size(thumbnail.name)
+            pages.append(variants)
+        legacy_width = int(settings.POST_THUMBNAIL_GEOMETRY.split('x')[0])
+        before = sum(
+            sizes[pick(variants, legacy_width).name] for variants in pages
+        )
+        results = []
+        for viewport, ratio in VIEWPORTS:
+            needed = slot_width(viewport) * ratio
+            after = sum(
+                sizes[pick(variants, needed).name] for variants in pages
+            )
+            results.append({
+                'viewport': viewport,
+                'device_pixel_ratio': ratio,
+                'posts': len(pages),
+                'bytes_before': before,
+                'bytes_after': after,
+            })
+        if options['json']:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+        for row in results:
+            saved = 1 - row['bytes_after'] / row['bytes_before'] if (
+                row['bytes_before']
+            ) else 0
+            self.stdout.write(
+                f'{row["viewport"]}px@{row["device_pixel_ratio"]}x: '
+                f'{row["bytes_before"]} -> {row["bytes_after"]} байт '
+                f'на {row["posts"]} постов ({saved:.0%} экономии)'
+            )
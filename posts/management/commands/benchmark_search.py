@@ -0,0 +1,135 @@
+import itertools
+import json
+import random
+import statistics
+import string
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from posts import fulltext
+from posts.benchmarks import percentile
+from posts.models import Comment, Post
+
+User = get_user_model()
+
+VOCABULARY_SIZE = 5000
+WORDS_PER_TEXT = (5, 40)
+BATCH_SIZE = 500
+# Слова с разной частотой: частое, среднее и редкое.
+QUERY_RANKS = (0, 100, 3000)
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает задержку первой страницы поиска: FTS5 против '
+        'icontains (LIKE). Тестовые посты и комментарии создаются '
+        'в транзакции, которая в конце откатывается.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=100000,
+                            help='Сколько постов создать.')
+        parser.add_argument('--comments', type=int, default=50000,
+                            help='Сколько комментариев создать.')
+        parser.add_argument('--repeat', type=int, default=20,
+                            help='Сколько раз выполнить каждый запрос.')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--json', action='store_true',
+                            help='Вывести результат в JSON.')
+
+    def handle(self, *args, **options):
+        if not fulltext.available():
+            raise CommandError(
+                'Индекс FTS5 не найден: выполните migrate '
+                'или rebuild_search_index.'
+            )
+        rng = random.Random(options['seed'])
+        vocabulary = [
+            ''.join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 9)))
+            for _ in range(VOCABULARY_SIZE)
+        ]
+        # Частоты слов убывают по закону Ципфа, как в живом тексте.
+        weights = list(itertools.accumulate(
+            1 / (rank + 1) for rank in range(VOCABULARY_SIZE)
+        ))
+        with transaction.atomic():
+            started = time.monotonic()
+            self.seed(rng, vocabulary, weights, options)
+            seeded = time.monotonic() - started
+            results = [
+                self.measure(vocabulary[rank], options['repeat'])
+                for rank in QUERY_RANKS
+            ]
+            transaction.set_rollback(True)
+        if options['json']:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+        self.stdout.write(
+            f'Создано {options["posts"]} постов и {options["comments"]} '
+            f'комментариев за {seeded:.1f} с (с обновлением индекса).'
+        )
+        for row in results:
+            self.stdout.write(
+                f'«{row["query"]}» ({row["matches"]} постов): '
+                f'icontains {row["icontains_p50_ms"]:.1f}/'
+                f'{row["icontains_p95_ms"]:.1f} мс, '
+                f'fts5 {row["fts5_p50_ms"]:.1f}/{row["fts5_p95_ms"]:.1f} мс '
+                f'(медиана/p95)'
+            )
+
+    def text(self, rng, vocabulary, weights):
+        return ' '.join(rng.choices(
+            vocabulary, cum_weights=weights, k=rng.randint(*WORDS_PER_TEXT)
+        ))
+
+    def seed(self, rng, vocabulary, weights, options):
+        author = User.objects.create_user(
+            username=f'benchmark_search_{rng.getrandbits(32):x}'
+        )
+        Post.objects.bulk_create(
+            (Post(text=self.text(rng, vocabulary, weights), author=author)
+             for _ in range(options['posts'])),
+            batch_size=BATCH_SIZE
+        )
+        post_ids = list(
+            Post.objects.filter(author=author).values_list('pk', flat=True)
+        )
+        Comment.objects.bulk_create(
+            (Comment(
+                post_id=rng.choice(post_ids),
+                author=author,
+                text=self.text(rng, vocabulary, weights)
+            ) for _ in range(options['comments'])),
+            batch_size=BATCH_SIZE
+        )
+
+    def measure(self, query, repeat):
+        def like():
+            return list(fulltext.fallback_queryset(query).order_by(
+                '-pub_date', '-id'
+            )[:settings.PER_PAGE])
+
+        def fts():
+            paginator = fulltext.SearchPaginator(
+                fulltext.match_expression(query), settings.PER_PAGE
+            )
+            return list(paginator.get_page())
+
+        timings = {'icontains': [], 'fts5': []}
+        for _ in range(repeat):
+            for name, run in (('icontains', like), ('fts5', fts)):
+                started = time.perf_counter()
+                run()
+                timings[name].append((time.perf_counter() - started) * 1000)
+        row = {
+            'query': query,
+            'matches': fulltext.fallback_queryset(query).count(),
+        }
+        for name, values in timings.items():
+            row[f'{name}_p50_ms'] = statistics.median(values)
+            row[f'{name}_p95_ms'] = percentile(values, 0.95)
+        return row
@@ -0,0 +1,80 @@
+import json
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import override_settings
+
+from posts import benchmarks
+
+
+class Command(BaseCommand):
+    help = (
+        'Создаёт отдельную тестовую базу, заполняет её данными и замеряет '
+        'задержку (перцентили), число запросов к базе и объём ответа '
+        'страниц index, group_posts, profile, post_view, new_post '
+        'и add_comment. Результат сравнивается командой compare_benchmarks.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=50)
+        parser.add_argument('--groups', type=int, default=10)
+        parser.add_argument('--posts', type=int, default=5000)
+        parser.add_argument('--comments', type=int, default=20000)
+        parser.add_argument(
+            '--image-ratio', type=float, default=0.3,
+            help='Доля постов с картинкой.'
+        )
+        parser.add_argument('--requests', type=int, default=50,
+                            help='Замеров на страницу.')
+        parser.add_argument('--warmup', type=int, default=5,
+                            help='Запросов на прогрев перед замерами.')
+        parser.add_argument(
+            '--cold-cache', action='store_true',
+            help='Очищать кэш перед каждым запросом.'
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--output', help='Записать JSON в файл.')
+
+    def handle(self, *args, **options):
+        media_root = tempfile.mkdtemp()
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True,
+                                           serialize=False)
+        try:
+            with override_settings(
+                MEDIA_ROOT=media_root,
+                ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']
+            ):
+                dataset = benchmarks.seed(
+                    options['users'], options['groups'], options['posts'],
+                    options['comments'], options['image_ratio'],
+                    options['seed']
+                )
+                results = benchmarks.run(
+                    options['requests'], options['warmup'],
+                    options['cold_cache']
+                )
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            shutil.rmtree(media_root, ignore_errors=True)
+        report = {
+            'environment': benchmarks.environment(),
+            'dataset': dataset,
+            'cold_cache': options['cold_cache'],
+            'results': results,
+        }
+        if options['output']:
+            with open(options['output'], 'w') as stream:
+                json.dump(report, stream, indent=2)
+        else:
+            self.stdout.write(json.dumps(report, indent=2))
+        for name, row in results.items():
+            self.stderr.write(
+                f'{name}: p50 {row["p50_ms"]:.1f} мс, '
+                f'p90 {row["p90_ms"]:.1f} мс, p99 {row["p99_ms"]:.1f} мс, '
+                f'{row["queries"]} запросов, {row["bytes"]} байт',
+                style_func=lambda message: message
+            )
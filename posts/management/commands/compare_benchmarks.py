@@ -0,0 +1,44 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from posts import benchmarks
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает два прогона benchmark_views и завершается с ошибкой, '
+        'если страницы стали медленнее, тяжелее или делают больше '
+        'запросов к базе.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('base', help='JSON прогона, с которым сравнивать.')
+        parser.add_argument('new', help='JSON нового прогона.')
+        parser.add_argument(
+            '--threshold', type=float, default=0.1,
+            help='Допустимый рост времени и объёма (доля, 0.1 = 10%%).'
+        )
+
+    def handle(self, *args, **options):
+        runs = []
+        for path in (options['base'], options['new']):
+            with open(path) as stream:
+                runs.append(json.load(stream))
+        base, new = runs
+        if base['dataset'] != new['dataset']:
+            self.stderr.write('Прогоны сделаны на разных наборах данных.')
+        rows = benchmarks.compare(base, new, options['threshold'])
+        for name, metric, old, value, regression in rows:
+            change = (value - old) / old if old else 0
+            line = (
+                f'{name:12} {metric:8} {old:>10.1f} -> {value:>10.1f} '
+                f'({change:+.0%})'
+            )
+            self.stdout.write(
+                self.style.ERROR(line) if regression else line
+            )
+        regressions = [row for row in rows if row[-1]]
+        if regressions:
+            raise CommandError(f'Регрессий: {len(regressions)}.')
+        self.stdout.write(self.style.SUCCESS('Регрессий нет.'))
@@ -0,0 +1,51 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from posts import bulk
+
+
+class Command(BaseCommand):
+    help = (
+        'Выгружает группы, посты и комментарии в JSON Lines или CSV '
+        'в формате import_posts.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path', nargs='?', default='-', help='Файл или - для stdout.'
+        )
+        parser.add_argument(
+            '--format',
+            choices=('jsonl', 'csv'),
+            help='Формат файла, по умолчанию по расширению.'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=2000,
+            help='Сколько строк читать из базы за раз.'
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['format'] or bulk.detect_format(path)
+        started = time.monotonic()
+        stream = self.stdout if path == '-' else open(
+            path, 'w', encoding='utf-8', newline=''
+        )
+        rows = 0
+        try:
+            writer = bulk.RecordWriter(stream, file_format)
+            for record in bulk.export_records(options['chunk_size']):
+                writer.write(record)
+                rows += 1
+        finally:
+            if stream is not self.stdout:
+                stream.close()
+        elapsed = time.monotonic() - started
+        self.stderr.write(
+            f'Выгружено строк: {rows} за {elapsed:.1f} с '
+            f'({rows / elapsed if elapsed else 0:.0f} строк/с).',
+            style_func=self.style.SUCCESS
+        )
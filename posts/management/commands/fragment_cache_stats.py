@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from posts import fragments
+
+
+class Command(BaseCommand):
+    help = 'Выводит попадания и промахи кэша фрагментов лент.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reset',
+            action='store_true',
+            help='Обнулить счётчики после вывода.'
+        )
+
+    def handle(self, *args, **options):
+        for name, values in fragments.stats().items():
+            total = values['hits'] + values['misses']
+            ratio = values['hits'] / total if total else 0
+            self.stdout.write(
+                f'{name}: hits={values["hits"]} '
+                f'misses={values["misses"]} ratio={ratio:.2f}'
+            )
+        if options['reset']:
+            fragments.reset_stats()
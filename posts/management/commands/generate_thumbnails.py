@@ -0,0 +1,38 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from posts import thumbnails
+from posts.models import Post
+
+
+class Command(BaseCommand):
+    help = (
+        'Параллельно создаёт миниатюры для всех постов с картинками. '
+        'Pillow отпускает GIL при декодировании и масштабировании, '
+        'поэтому пула потоков достаточно.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=settings.THUMBNAIL_WORKERS,
+            help='Число потоков.'
+        )
+
+    def handle(self, *args, **options):
+        post_ids = list(
+            Post.objects.exclude(image='').exclude(image__isnull=True)
+            .order_by('pk').values_list('pk', flat=True)
+        )
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+            done = sum(executor.map(thumbnails.run, post_ids))
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Миниатюр создано: {done} из {len(post_ids)} '
+            f'за {elapsed:.1f} с.'
+        ))
@@ -0,0 +1,63 @@
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError
+
+from posts import bulk
+
+
+class Command(BaseCommand):
+    help = (
+        'Загружает группы, посты и комментарии из JSON Lines или CSV '
+        '(колонка model: group, post, comment) через bulk_create. '
+        'Сигналы не отправляются: персональные ленты подписчиков '
+        'не пополняются, миниатюры создаёт generate_thumbnails.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Файл или - для stdin.')
+        parser.add_argument(
+            '--format',
+            choices=('jsonl', 'csv'),
+            help='Формат файла, по умолчанию по расширению.'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Сколько строк сохранять одной транзакцией.'
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['format'] or bulk.detect_format(path)
+        importer = bulk.Importer(batch_size=options['batch_size'])
+        started = time.monotonic()
+        stream = sys.stdin if path == '-' else open(
+            path, encoding='utf-8', newline=''
+        )
+        line = 0
+        try:
+            for line, record in enumerate(
+                bulk.read_records(stream, file_format), 1
+            ):
+                importer.add(record)
+            created = importer.finish()
+        except (KeyError, ValueError, DatabaseError) as error:
+            importer.settle()
+            raise CommandError(
+                f'Ошибка в пачке до строки {line}: {error!r}. '
+                f'Предыдущие пачки сохранены.'
+            )
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+        elapsed = time.monotonic() - started
+        rows = sum(created[model] for model in bulk.MODELS)
+        self.stdout.write(self.style.SUCCESS(
+            f'Загружено групп: {created["group"]}, постов: '
+            f'{created["post"]}, комментариев: {created["comment"]}, '
+            f'новых авторов: {created["user"]} за {elapsed:.1f} с '
+            f'({rows / elapsed if elapsed else 0:.0f} строк/с).'
+        ))
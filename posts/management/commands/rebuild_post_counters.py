@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from posts import counters
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает счётчики постов (общий, по авторам и группам) '
+        'и подписок, сообщает о расхождениях с кэшем.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Только проверить расхождения, не перезаписывая кэш.'
+        )
+
+    def handle(self, *args, **options):
+        counts = counters.actual_counts()
+        drift = counters.drift(counts)
+        for key, cached, actual in drift:
+            self.stdout.write(f'{key}: в кэше {cached}, в базе {actual}')
+        if options['check']:
+            if drift:
+                raise CommandError(
+                    f'Расходящихся счётчиков: {len(drift)}.'
+                )
+            self.stdout.write(self.style.SUCCESS('Расхождений нет.'))
+            return
+        counters.rebuild(counts)
+        self.stdout.write(self.style.SUCCESS(
+            f'Пересчитано счётчиков: {len(counts)}, '
+            f'исправлено расхождений: {len(drift)}.'
+        ))
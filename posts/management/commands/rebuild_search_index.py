@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from posts import fulltext
+
+
+class Command(BaseCommand):
+    help = (
+        'Создаёт индексы полнотекстового поиска (SQLite FTS5) и триггеры '
+        'и перестраивает индексы по текущим постам и комментариям.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--database',
+            default='default',
+            help='База данных, в которой перестроить индексы.'
+        )
+
+    def handle(self, *args, **options):
+        if not fulltext.install(options['database']):
+            raise CommandError(
+                'Полнотекстовый поиск доступен только в SQLite, '
+                'в остальных базах используется поиск подстрокой.'
+            )
+        fulltext.rebuild(options['database'])
+        self.stdout.write(self.style.SUCCESS('Индексы поиска перестроены.'))
@@ -0,0 +1,56 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from posts import tasks
+
+
+class Command(BaseCommand):
+    help = (
+        'Выполняет фоновые задачи из очереди в базе '
+        '(TASK_BACKEND = "database"). Можно запустить несколько '
+        'воркеров: каждую задачу берёт один из них.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch', type=int, default=100,
+                            help='Задач за одно обращение к очереди.')
+        parser.add_argument('--poll', type=float, default=1.0,
+                            help='Секунд ожидания при пустой очереди.')
+        parser.add_argument('--report', type=float, default=60.0,
+                            help='Выводить пропускную способность '
+                                 'раз в столько секунд.')
+        parser.add_argument('--once', action='store_true',
+                            help='Разобрать готовые задачи и выйти.')
+
+    def handle(self, *args, **options):
+        backend = tasks.DatabaseBackend()
+        total, done, started = 0, 0, time.monotonic()
+        reported = started
+        try:
+            while True:
+                processed = backend.run_pending(options['batch'])
+                done += processed
+                now = time.monotonic()
+                if now - reported >= options['report']:
+                    self.report(done, now - reported, backend.pending())
+                    total += done
+                    done, reported = 0, now
+                if processed:
+                    continue
+                if options['once']:
+                    break
+                time.sleep(options['poll'])
+        except KeyboardInterrupt:
+            pass
+        total += done
+        elapsed = time.monotonic() - started
+        self.stdout.write(
+            f'Выполнено задач: {total} за {elapsed:.1f} с '
+            f'({total / elapsed if elapsed else 0:.1f} в секунду).'
+        )
+
+    def report(self, done, elapsed, pending):
+        self.stdout.write(
+            f'{done / elapsed:.1f} задач в секунду, в очереди {pending}.'
+        )
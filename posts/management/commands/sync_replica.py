@@ -0,0 +1,64 @@
+import sqlite3
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from posts.routers import PRIMARY
+
+
+class Command(BaseCommand):
+    help = (
+        'Копирует основную базу SQLite в реплики из YATUBE_DB_REPLICAS '
+        'через backup API. С --interval копирует раз в N секунд и '
+        'так имитирует отставание реплик при локальной проверке.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=0,
+            help='Пауза между копиями в секундах; 0 — скопировать один раз.'
+        )
+        parser.add_argument(
+            '--to',
+            action='append',
+            default=[],
+            metavar='PATH',
+            help='Файл реплики вместо настроенных; можно указать несколько.'
+        )
+
+    def handle(self, *args, **options):
+        primary = connections[PRIMARY]
+        if primary.vendor != 'sqlite':
+            raise CommandError(
+                'Реплики других СУБД настраиваются их репликацией.'
+            )
+        targets = options['to'] or [
+            connections[alias].settings_dict['NAME']
+            for alias in settings.DATABASE_REPLICAS
+        ]
+        if not targets:
+            raise CommandError(
+                'Реплики не заданы: укажите YATUBE_DB_REPLICAS.'
+            )
+        while True:
+            for path in targets:
+                self.copy(primary, path)
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
+
+    def copy(self, primary, path):
+        started = time.perf_counter()
+        primary.ensure_connection()
+        target = sqlite3.connect(path)
+        try:
+            primary.connection.backup(target)
+        finally:
+            target.close()
+        self.stdout.write(
+            f'{path}: {(time.perf_counter() - started) * 1000:.0f} мс'
+        )
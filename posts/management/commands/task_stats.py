@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+
+from posts import tasks
+from posts.models import QueuedTask
+
+
+class Command(BaseCommand):
+    help = (
+        'Выводит по каждой фоновой задаче число постановок, успехов, '
+        'повторов, ошибок и среднее время выполнения, а также размер '
+        'очереди в базе.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reset',
+            action='store_true',
+            help='Обнулить счётчики после вывода.'
+        )
+
+    def handle(self, *args, **options):
+        for name, values in tasks.stats().items():
+            runs = values['succeeded'] + values['retried'] + values['failed']
+            mean = values['runtime_ms'] / runs if runs else 0
+            self.stdout.write(
+                f'{name}: enqueued={values["enqueued"]} '
+                f'succeeded={values["succeeded"]} '
+                f'retried={values["retried"]} failed={values["failed"]} '
+                f'mean_ms={mean:.1f}'
+            )
+        for status, label in QueuedTask.STATUSES:
+            count = QueuedTask.objects.filter(status=status).count()
+            self.stdout.write(f'{label}: {count}')
+        if options['reset']:
+            tasks.reset_stats()
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from posts import warmup
+
+
+class Command(BaseCommand):
+    help = (
+        'Компилирует все шаблоны проекта. При кэширующем загрузчике '
+        'они остаются в памяти процесса; ошибки синтаксиса выводятся.'
+    )
+
+    def handle(self, *args, **options):
+        compiled, errors, elapsed = warmup.warm_templates()
+        for name, error in errors:
+            self.stderr.write(f'{name}: {error}')
+        if errors:
+            raise CommandError(f'Шаблонов с ошибками: {len(errors)}.')
+        self.stdout.write(self.style.SUCCESS(
+            f'Скомпилировано шаблонов: {compiled} за {elapsed * 1000:.0f} мс.'
+        ))
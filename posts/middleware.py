@@ -0,0 +1,108 @@
+import logging
+import random
+import time
+from contextlib import ExitStack
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+from django.template.base import Template
+
+logger = logging.getLogger('posts.metrics')
+
+_current = ContextVar('request_metrics', default=None)
+_original_render = Template.render
+
+
+class RequestMetrics:
+    """Запросы к базе и время рендера шаблонов одного HTTP-запроса."""
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+        self.template_depth = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - started
+            self.queries += 1
+
+
+def _timed_render(self, context):
+    metrics = _current.get()
+    if metrics is None:
+        return _original_render(self, context)
+    # Вложенные шаблоны (include, карточки) уже входят во время внешнего.
+    metrics.template_depth += 1
+    started = time.perf_counter()
+    try:
+        return _original_render(self, context)
+    finally:
+        metrics.template_depth -= 1
+        if not metrics.template_depth:
+            metrics.template_time += time.perf_counter() - started
+
+
+class RequestMetricsMiddleware:
+    """
+    Замеряет время ответа, число и время запросов к базе и время
+    рендера шаблонов.
+
+    Замеряется доля запросов settings.REQUEST_METRICS_SAMPLE_RATE.
+    Результат отдаётся заголовком Server-Timing и пишется в лог
+    posts.metrics: медленнее settings.REQUEST_METRICS_SLOW_MS —
+    с уровнем WARNING, остальные — INFO.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        Template.render = _timed_render
+
+    def __call__(self, request):
+        if random.random() >= settings.REQUEST_METRICS_SAMPLE_RATE:
+            return self.get_response(request)
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(metrics))
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        total = time.perf_counter() - started
+        response['Server-Timing'] = (
+            f'db;dur={metrics.db_time * 1000:.1f};'
+            f'desc="{metrics.queries} queries", '
+            f'tpl;dur={metrics.template_time * 1000:.1f}, '
+            f'total;dur={total * 1000:.1f}'
+        )
+        self.log(request, response, metrics, total)
+        return response
+
+    def log(self, request, response, metrics, total):
+        slow = total * 1000 >= settings.REQUEST_METRICS_SLOW_MS
+        level = logging.WARNING if slow else logging.INFO
+        if not logger.isEnabledFor(level):
+            return
+        match = request.resolver_match
+        data = {
+            'view': match.view_name if match else None,
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'queries': metrics.queries,
+            'db_ms': round(metrics.db_time * 1000, 1),
+            'template_ms': round(metrics.template_time * 1000, 1),
+            'total_ms': round(total * 1000, 1),
+        }
+        logger.log(
+            level,
+            ' '.join(f'{key}={value}' for key, value in data.items()),
+            extra={'metrics': data}
+        )
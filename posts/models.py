@@ -1,5 +1,6 @@
 from django.contrib.auth import get_user_model
 from django.db import models
+from django.db.models import F, Func, IntegerField, OuterRef, Subquery
 
 User = get_user_model()
 
@@ -13,6 +14,31 @@ class Group(models.Model):
         return self.title
 
 
+class PostQuerySet(models.QuerySet):
+    def with_comment_count(self):
+        """
+        Добавляет comment_count — число комментариев поста.
+
+        Комментарии считаются коррелированным подзапросом по индексу,
+        а не JOIN с GROUP BY, чтобы сортировка ленты шла по индексу.
+        """
+        comment_count = Comment.objects.filter(
+            post=OuterRef('pk')
+        ).order_by().annotate(
+            total=Func(F('pk'), function='COUNT')
+        ).values('total')
+        return self.annotate(
+            comment_count=Subquery(comment_count, output_field=IntegerField())
+        )
+
+    def for_feed(self):
+        """
+        Подтягивает автора, группу и число комментариев
+        одним запросом для вывода в ленте.
+        """
+        return self.select_related('author', 'group').with_comment_count()
+
+
 class Post(models.Model):
     text = models.TextField(
         'Текст поста',
@@ -23,6 +49,10 @@ class Post(models.Model):
         auto_now_add=True,
         db_index=True
     )
+    updated = models.DateTimeField(
+        'date updated',
+        auto_now=True
+    )
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -43,8 +73,20 @@ class Post(models.Model):
         null=True
     )
 
+    objects = PostQuerySet.as_manager()
+
     class Meta:
         ordering = ('-pub_date',)
+        indexes = [
+            models.Index(
+                fields=['author', 'pub_date'],
+                name='posts_post_author_date'
+            ),
+            models.Index(
+                fields=['group', 'pub_date'],
+                name='posts_post_group_date'
+            ),
+        ]
 
     def __str__(self):
         return self.text[:15]
@@ -73,5 +115,95 @@ class Comment(models.Model):
 
     class Meta:
         ordering = ('-created',)
+        indexes = [
+            models.Index(
+                fields=['post', 'created'],
+                name='posts_comment_post_created'
+            ),
+        ]
+
+
+class Follow(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='follower'
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='following'
+    )
 
-    
\ No newline at end of file
+    class Meta:
+        unique_together = ('user', 'author')
+
+
+class TimelineEntry(models.Model):
+    """
+    Пост в персональной ленте подписчика.
+
+    Записи создаются при публикации поста (fan-out-on-write), поэтому
+    лента читается одним диапазоном по индексу (user, pub_date, post);
+    post упорядочивает посты с одинаковой датой.
+    """
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='timeline_entries'
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='timeline_entries'
+    )
+    pub_date = models.DateTimeField('date published')
+
+    class Meta:
+        ordering = ('-pub_date',)
+        unique_together = ('user', 'post')
+        indexes = [
+            models.Index(
+                fields=['user', '-pub_date', '-post'],
+                name='posts_timeline_user_date'
+            ),
+        ]
+
+
+class QueuedTask(models.Model):
+    """
+    Фоновая задача в очереди в базе (settings.TASK_BACKEND = 'database').
+
+    Выполненные задачи удаляются, проваленные после всех попыток
+    остаются со статусом failed и текстом последней ошибки.
+    """
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    FAILED = 'failed'
+    STATUSES = (
+        (QUEUED, 'В очереди'),
+        (RUNNING, 'Выполняется'),
+        (FAILED, 'Ошибка'),
+    )
+
+    name = models.CharField('задача', max_length=200)
+    payload = models.TextField('аргументы (JSON)')
+    status = models.CharField(
+        'статус', max_length=10, choices=STATUSES, default=QUEUED
+    )
+    attempts = models.PositiveIntegerField('попыток', default=0)
+    run_at = models.DateTimeField('выполнить после')
+    locked_at = models.DateTimeField('взята в работу', null=True, blank=True)
+    last_error = models.TextField('последняя ошибка', blank=True)
+    created = models.DateTimeField('поставлена', auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['status', 'run_at'],
+                name='posts_task_status_run_at'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.name} ({self.status})'
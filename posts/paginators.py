@@ -0,0 +1,200 @@
+import base64
+import binascii
+import json
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db.models import Q
+
+from .models import Comment
+
+
+class KeysetPaginator:
+    """
+    Пагинатор по ключу сортировки (по умолчанию (pub_date, id)).
+
+    В отличие от Paginator не выполняет COUNT(*) и OFFSET: страница
+    выбирается условием по ключу последней записи, поэтому стоимость
+    не зависит от глубины. Позиция передаётся непрозрачным курсором.
+    """
+    is_keyset = True
+
+    def __init__(self, object_list, per_page, ordering=('-pub_date', '-id')):
+        self.object_list = object_list
+        self.per_page = int(per_page)
+        self.ordering = tuple(ordering)
+        self.fields = tuple(name.lstrip('-') for name in self.ordering)
+
+    def get_page(self, cursor=None):
+        """Возвращает страницу для курсора, при ошибке — первую."""
+        direction, values = self.decode_cursor(cursor)
+        if direction is None:
+            rows = self._fetch(self.ordering)
+            return KeysetPage(
+                rows[:self.per_page], self, cursor=None,
+                has_next=len(rows) > self.per_page, has_previous=False
+            )
+        if direction == 'n':
+            rows = self._fetch(self.ordering, values)
+            return KeysetPage(
+                rows[:self.per_page], self, cursor=cursor,
+                has_next=len(rows) > self.per_page, has_previous=True
+            )
+        reverse_ordering = tuple(self._reverse(name) for name in self.ordering)
+        rows = self._fetch(reverse_ordering, values)
+        return KeysetPage(
+            rows[:self.per_page][::-1], self, cursor=cursor,
+            has_next=True, has_previous=len(rows) > self.per_page
+        )
+
+    def _fetch(self, ordering, values=None):
+        queryset = self.object_list
+        if values is not None:
+            queryset = queryset.filter(self._after(ordering, values))
+        return list(queryset.order_by(*ordering)[:self.per_page + 1])
+
+    def _after(self, ordering, values):
+        """
+        Условие «строго после ключа» в порядке ordering.
+
+        Первое поле дополнительно ограничено диапазоном, чтобы СУБД
+        могла начать чтение индекса сразу с нужной позиции.
+        """
+        lookups = [
+            (name.lstrip('-'), 'lt' if name.startswith('-') else 'gt')
+            for name in ordering
+        ]
+        first_field, first_lookup = lookups[0]
+        condition = Q()
+        for index, (field, lookup) in enumerate(lookups):
+            equal = {
+                prev_field: values[prev_index]
+                for prev_index, (prev_field, _) in enumerate(lookups[:index])
+            }
+            condition |= Q(**equal, **{f'{field}__{lookup}': values[index]})
+        return Q(**{f'{first_field}__{first_lookup}e': values[0]}) & condition
+
+    @staticmethod
+    def _reverse(name):
+        return name[1:] if name.startswith('-') else f'-{name}'
+
+    def dump_values(self, obj):
+        """
+        Значения ключа obj в виде, пригодном для JSON. obj может быть
+        словарём из values(), если в нём есть поля ключа.
+        """
+        model = self.object_list.model
+        if isinstance(obj, dict):
+            obj = model(**{field: obj[field] for field in self.fields})
+        return [
+            model._meta.get_field(field).value_to_string(obj)
+            for field in self.fields
+        ]
+
+    def load_values(self, raw_values):
+        """Значения ключа из курсора; ошибки — ValueError/ValidationError."""
+        model = self.object_list.model
+        return [
+            model._meta.get_field(field).to_python(value)
+            for field, value in zip(self.fields, raw_values)
+        ]
+
+    def encode_cursor(self, direction, obj):
+        values = self.dump_values(obj)
+        raw = json.dumps([direction, values], separators=(',', ':'))
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        if not cursor:
+            return None, None
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            direction, raw_values = json.loads(
+                base64.urlsafe_b64decode(padded.encode()).decode()
+            )
+            if direction not in ('n', 'p'):
+                raise ValueError(direction)
+            values = self.load_values(raw_values)
+            if len(values) != len(self.fields) or None in values:
+                raise ValueError(raw_values)
+        except (TypeError, ValueError, binascii.Error, ValidationError):
+            return None, None
+        return direction, values
+
+
+class KeysetPage:
+    def __init__(self, object_list, paginator, cursor,
+                 has_next, has_previous):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.cursor = cursor
+        self._has_next = has_next and bool(object_list)
+        self._has_previous = has_previous and bool(object_list)
+
+    def __repr__(self):
+        return f'<Keyset page {self.cursor or "first"}>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+    @property
+    def next_cursor(self):
+        if not self.has_next():
+            return None
+        return self.paginator.encode_cursor('n', self.object_list[-1])
+
+    @property
+    def previous_cursor(self):
+        if not self.has_previous():
+            return None
+        return self.paginator.encode_cursor('p', self.object_list[0])
+
+
+def paginate(request, queryset, view_name, count=None):
+    """
+    Возвращает пару (paginator, page) для ленты view_name.
+
+    Режим задаётся в settings.FEED_PAGINATION. Ссылки вида ?page=
+    продолжают работать и в режиме курсора, а ?cursor= понимается
+    любой лентой. Если передан count (число записей или функция,
+    возвращающая его), Paginator не выполняет COUNT(*).
+    """
+    mode = settings.FEED_PAGINATION.get(view_name, 'page')
+    if 'cursor' in request.GET or (
+        mode == 'cursor' and 'page' not in request.GET
+    ):
+        paginator = KeysetPaginator(queryset, settings.PER_PAGE)
+        return paginator, paginator.get_page(request.GET.get('cursor'))
+    paginator = Paginator(queryset, settings.PER_PAGE)
+    if count is not None:
+        paginator.count = count() if callable(count) else count
+    return paginator, paginator.get_page(request.GET.get('page'))
+
+
+def paginate_comments(request, post_id):
+    """
+    Страница комментариев к посту по курсору из ?cursor=, от новых
+    к старым. Авторы загружаются тем же запросом.
+    """
+    paginator = KeysetPaginator(
+        Comment.objects.filter(post_id=post_id).select_related('author'),
+        settings.COMMENTS_PER_PAGE,
+        ordering=('-created', '-id')
+    )
+    return paginator.get_page(request.GET.get('cursor'))
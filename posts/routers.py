@@ -0,0 +1,119 @@
+import random
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+
+PRIMARY = 'default'
+# Сессии и кэш в базе читаются сразу после записи, поэтому только
+# из основной базы; записи в них не закрепляют пользователя.
+PRIMARY_APPS = ('sessions', 'django_cache')
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+PIN_SESSION_KEY = '_db_pinned_until'
+
+_current = ContextVar('replica_request', default=None)
+
+
+class ReplicaRequest:
+    """Реплика, выбранная для запроса, и была ли в запросе запись."""
+
+    def __init__(self, replica):
+        self.replica = replica
+        self.wrote = False
+
+
+def _primary_only(model):
+    return model._meta.app_label in PRIMARY_APPS
+
+
+def use_primary():
+    """Оставшиеся чтения текущего запроса идут в основную базу."""
+    current = _current.get()
+    if current is not None:
+        current.replica = None
+
+
+class ReplicaRouter:
+    """
+    Чтение — из реплики, выбранной ReplicaMiddleware для запроса,
+    запись — в основную базу. Вне запросов (команды, фоновые задачи)
+    и после первой записи в запросе всё идёт в основную базу.
+    """
+
+    def db_for_read(self, model, **hints):
+        request = _current.get()
+        if (request is None or request.replica is None
+                or _primary_only(model)
+                or connections[PRIMARY].in_atomic_block):
+            return PRIMARY
+        return request.replica
+
+    def db_for_write(self, model, **hints):
+        request = _current.get()
+        if request is not None and not _primary_only(model):
+            request.replica = None
+            request.wrote = True
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Реплики — копии основной базы.
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
+
+
+def _bound(request, chunks):
+    """Читает части потокового ответа с той же репликой, что и view."""
+    chunks = iter(chunks)
+    while True:
+        token = _current.set(request)
+        try:
+            chunk = next(chunks)
+        except StopIteration:
+            return
+        finally:
+            _current.reset(token)
+        yield chunk
+
+
+class ReplicaMiddleware:
+    """
+    Выбирает реплику для чтения в запросах GET и HEAD.
+
+    Пользователь, записавший данные, settings.DATABASE_PIN_SECONDS
+    секунд читает из основной базы, чтобы видеть свои изменения,
+    пока они доходят до реплик. Срок хранится в сессии.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.DATABASE_REPLICAS:
+            return self.get_response(request)
+        current = ReplicaRequest(self.choose(request))
+        token = _current.set(current)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        if current.wrote:
+            request.session[PIN_SESSION_KEY] = (
+                time.time() + settings.DATABASE_PIN_SECONDS
+            )
+        if response.streaming:
+            response.streaming_content = _bound(
+                current, response.streaming_content
+            )
+        return response
+
+    def choose(self, request):
+        if request.method not in SAFE_METHODS:
+            return None
+        if request.session.get(PIN_SESSION_KEY, 0) > time.time():
+            return None
+        return random.choice(settings.DATABASE_REPLICAS)
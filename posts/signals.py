@@ -0,0 +1,111 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import counters, fragments, fulltext, thumbnails, timelines
+from .models import Comment, Follow, Group, Post
+
+
+@receiver(pre_save, sender=Post)
+def remember_old_values(sender, instance, **kwargs):
+    """Запоминает прежние группу и картинку поста перед редактированием."""
+    instance._old_group_id, instance._old_image = None, None
+    if instance.pk is not None:
+        instance._old_group_id, instance._old_image = Post.objects.filter(
+            pk=instance.pk
+        ).values_list('group_id', 'image').first() or (None, None)
+
+
+@receiver(post_save, sender=Post)
+def count_saved_post(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        transaction.on_commit(lambda: counters.post_added(
+            instance.author_id, instance.group_id
+        ))
+    elif instance._old_group_id != instance.group_id:
+        old_group_id = instance._old_group_id
+        transaction.on_commit(lambda: counters.post_moved(
+            old_group_id, instance.group_id
+        ))
+
+
+@receiver(post_delete, sender=Post)
+def count_deleted_post(sender, instance, **kwargs):
+    author_id, group_id = instance.author_id, instance.group_id
+    transaction.on_commit(lambda: counters.post_removed(author_id, group_id))
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post_fragments(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    scopes = fragments.post_scopes(instance)
+    old_group_id = getattr(instance, '_old_group_id', None)
+    if old_group_id is not None:
+        scopes.append(fragments.group_scope(old_group_id))
+    transaction.on_commit(lambda: fragments.bump(*scopes))
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_comment_fragments(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    post = Post.objects.filter(pk=instance.post_id).only(
+        'id', 'author_id', 'group_id'
+    ).first()
+    if post is None:
+        return
+    scopes = fragments.post_scopes(post)
+    transaction.on_commit(lambda: fragments.bump(*scopes))
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def invalidate_group_fragments(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    scopes = [fragments.index_scope(), fragments.group_scope(instance.pk)]
+    author_ids = Post.objects.filter(group_id=instance.pk).order_by(
+    ).values_list('author_id', flat=True).distinct()
+    scopes.extend(fragments.profile_scope(pk) for pk in author_ids)
+    transaction.on_commit(lambda: fragments.bump(*scopes))
+
+
+@receiver(post_save, sender=Post)
+def schedule_thumbnail(sender, instance, raw=False, **kwargs):
+    if raw or not instance.image:
+        return
+    if instance.image.name != getattr(instance, '_old_image', None):
+        thumbnails.generate_post_thumbnails.delay(instance.pk)
+
+
+@receiver(post_save, sender=Post)
+def fan_out_post(sender, instance, created, raw=False, **kwargs):
+    if raw or not created:
+        return
+    timelines.fan_out_post.delay(instance.pk)
+
+
+@receiver(post_save, sender=Follow)
+def count_follow(sender, instance, created, raw=False, **kwargs):
+    if raw or not created:
+        return
+    user_id, author_id = instance.user_id, instance.author_id
+    transaction.on_commit(lambda: counters.follow_added(user_id, author_id))
+
+
+@receiver(post_delete, sender=Follow)
+def count_unfollow(sender, instance, **kwargs):
+    user_id, author_id = instance.user_id, instance.author_id
+    transaction.on_commit(lambda: timelines.follower_removed(
+        author_id, counters.follow_removed(user_id, author_id)
+    ))
+
+
+def install_fulltext(using, **kwargs):
+    """Восстанавливает индексы поиска и триггеры после миграций."""
+    fulltext.install(using)
@@ -0,0 +1,275 @@
+import json
+import logging
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import QueuedTask
+
+logger = logging.getLogger(__name__)
+
+STATS_KEY = 'posts:task-stats:{}:{}'
+SUCCEEDED = 'succeeded'
+RETRIED = 'retried'
+FAILED = 'failed'
+STAT_KINDS = ('enqueued', SUCCEEDED, RETRIED, FAILED, 'runtime_ms')
+# Все объявленные задачи: имя -> Task.
+REGISTRY = {}
+
+
+class Task:
+    """
+    Функция, которую можно выполнить в фоне вызовом task.delay(...).
+
+    Имя задачи — путь к ней в модуле, поэтому задачи объявляются
+    на уровне модуля. Аргументы должны сериализоваться в JSON.
+    """
+
+    def __init__(self, func, max_retries=None):
+        self.func = func
+        self.name = f'{func.__module__}.{func.__name__}'
+        self._max_retries = max_retries
+        self.__doc__ = func.__doc__
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+
+    def __repr__(self):
+        return f'<Task {self.name}>'
+
+    @property
+    def max_retries(self):
+        if self._max_retries is None:
+            return settings.TASK_MAX_RETRIES
+        return self._max_retries
+
+    def delay(self, *args, **kwargs):
+        """Ставит задачу в очередь после фиксации текущей транзакции."""
+        transaction.on_commit(
+            lambda: get_backend().enqueue(self.name, args, kwargs)
+        )
+
+
+def task(max_retries=None):
+    """Объявляет фоновую задачу; max_retries по умолчанию из настроек."""
+    def decorator(func):
+        registered = Task(func, max_retries)
+        REGISTRY[registered.name] = registered
+        return registered
+    return decorator
+
+
+def retry_delay(attempt):
+    """Пауза перед повтором: удваивается с каждой попыткой."""
+    return settings.TASK_RETRY_DELAY * 2 ** attempt
+
+
+def run(name, args, kwargs, attempt=0):
+    """
+    Выполняет задачу и записывает метрики.
+
+    Возвращает (исход, текст ошибки): succeeded, retried — если
+    попытки ещё есть, или failed.
+    """
+    started = time.perf_counter()
+    error = ''
+    registered = REGISTRY.get(name)
+    try:
+        if registered is None:
+            registered = import_string(name)
+        registered.func(*args, **kwargs)
+        outcome = SUCCEEDED
+    except Exception:
+        error = traceback.format_exc()
+        # Неизвестную задачу повторять бессмысленно.
+        retries = registered.max_retries if registered is not None else 0
+        outcome = RETRIED if attempt < retries else FAILED
+        logger.log(
+            logging.WARNING if outcome == RETRIED else logging.ERROR,
+            'Задача %s, попытка %s: %s', name, attempt + 1,
+            error.strip().splitlines()[-1]
+        )
+    _count(name, outcome)
+    _count(name, 'runtime_ms', round((time.perf_counter() - started) * 1000))
+    return outcome, error
+
+
+def _count(name, kind, value=1):
+    key = STATS_KEY.format(name, kind)
+    if not cache.add(key, value, None):
+        try:
+            cache.incr(key, value)
+        except ValueError:
+            cache.add(key, value, None)
+
+
+def stats():
+    """{задача: {enqueued, succeeded, retried, failed, runtime_ms}}."""
+    keys = {
+        (name, kind): STATS_KEY.format(name, kind)
+        for name in REGISTRY
+        for kind in STAT_KINDS
+    }
+    values = cache.get_many(list(keys.values()))
+    return {
+        name: {
+            kind: values.get(keys[(name, kind)], 0) for kind in STAT_KINDS
+        }
+        for name in sorted(REGISTRY)
+    }
+
+
+def reset_stats():
+    cache.delete_many([
+        STATS_KEY.format(name, kind)
+        for name in REGISTRY
+        for kind in STAT_KINDS
+    ])
+
+
+class ImmediateBackend:
+    """Выполняет задачу сразу, повторяя без пауз. Для тестов."""
+
+    def enqueue(self, name, args, kwargs):
+        _count(name, 'enqueued')
+        attempt = 0
+        while run(name, args, kwargs, attempt)[0] == RETRIED:
+            attempt += 1
+
+
+class ThreadBackend:
+    """
+    Пул из settings.TASK_WORKERS потоков в текущем процессе.
+
+    Задачи теряются при перезапуске процесса, поэтому бэкенд
+    предназначен для разработки.
+    """
+
+    def __init__(self):
+        self.executor = ThreadPoolExecutor(
+            max_workers=settings.TASK_WORKERS, thread_name_prefix='tasks'
+        )
+
+    def enqueue(self, name, args, kwargs):
+        _count(name, 'enqueued')
+        self.submit(name, args, kwargs, 0)
+
+    def submit(self, name, args, kwargs, attempt):
+        return self.executor.submit(self.work, name, args, kwargs, attempt)
+
+    def work(self, name, args, kwargs, attempt):
+        try:
+            outcome, _ = run(name, args, kwargs, attempt)
+        finally:
+            connection.close()
+        if outcome == RETRIED:
+            timer = threading.Timer(
+                retry_delay(attempt), self.submit,
+                (name, args, kwargs, attempt + 1)
+            )
+            timer.daemon = True
+            timer.start()
+        return outcome
+
+
+class DatabaseBackend:
+    """
+    Очередь в таблице QueuedTask, которую разбирает
+    ./manage.py run_worker. Задача, взятая упавшим воркером, снова
+    попадает в очередь через settings.TASK_LOCK_TIMEOUT секунд.
+    """
+
+    def enqueue(self, name, args, kwargs):
+        QueuedTask.objects.create(
+            name=name,
+            payload=json.dumps({'args': list(args), 'kwargs': kwargs}),
+            run_at=timezone.now()
+        )
+        _count(name, 'enqueued')
+
+    def claim(self, limit):
+        """
+        Берёт в работу до limit готовых задач. Задачу получает тот
+        воркер, чей UPDATE с условием status=queued изменил строку.
+        """
+        now = timezone.now()
+        QueuedTask.objects.filter(
+            status=QueuedTask.RUNNING,
+            locked_at__lt=now - timedelta(seconds=settings.TASK_LOCK_TIMEOUT)
+        ).update(status=QueuedTask.QUEUED)
+        candidates = QueuedTask.objects.filter(
+            status=QueuedTask.QUEUED, run_at__lte=now
+        ).order_by('run_at', 'id').values_list('id', flat=True)[:limit]
+        claimed = [
+            pk for pk in candidates
+            if QueuedTask.objects.filter(
+                pk=pk, status=QueuedTask.QUEUED
+            ).update(status=QueuedTask.RUNNING, locked_at=now)
+        ]
+        return QueuedTask.objects.filter(pk__in=claimed).order_by(
+            'run_at', 'id'
+        )
+
+    def execute(self, queued):
+        payload = json.loads(queued.payload)
+        outcome, error = run(
+            queued.name, payload['args'], payload['kwargs'], queued.attempts
+        )
+        rows = QueuedTask.objects.filter(pk=queued.pk)
+        if outcome == SUCCEEDED:
+            rows.delete()
+        elif outcome == RETRIED:
+            rows.update(
+                status=QueuedTask.QUEUED,
+                attempts=F('attempts') + 1,
+                run_at=timezone.now() + timedelta(
+                    seconds=retry_delay(queued.attempts)
+                ),
+                locked_at=None,
+                last_error=error
+            )
+        else:
+            rows.update(
+                status=QueuedTask.FAILED,
+                attempts=F('attempts') + 1,
+                last_error=error
+            )
+        return outcome
+
+    def run_pending(self, limit=100):
+        """Выполняет готовые задачи, возвращает число выполненных."""
+        done = 0
+        for queued in self.claim(limit):
+            self.execute(queued)
+            done += 1
+        return done
+
+    def pending(self):
+        return QueuedTask.objects.filter(status=QueuedTask.QUEUED).count()
+
+
+BACKENDS = {
+    'immediate': ImmediateBackend,
+    'thread': ThreadBackend,
+    'database': DatabaseBackend,
+}
+_backends = {}
+_backends_lock = threading.Lock()
+
+
+def get_backend():
+    """Бэкенд из settings.TASK_BACKEND, один на процесс."""
+    name = settings.TASK_BACKEND
+    with _backends_lock:
+        if name not in _backends:
+            _backends[name] = BACKENDS[name]()
+        return _backends[name]
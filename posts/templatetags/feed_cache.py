@@ -0,0 +1,42 @@
+from django import template
+
+from posts import fragments
+
+register = template.Library()
+
+
+class FeedCacheNode(template.Node):
+    def __init__(self, nodelist, scope, vary_on):
+        self.nodelist = nodelist
+        self.scope = scope
+        self.vary_on = vary_on
+
+    def render(self, context):
+        scope = self.scope.resolve(context)
+        vary_on = [value.resolve(context) for value in self.vary_on]
+        return fragments.get_or_render(
+            scope, vary_on, lambda: self.nodelist.render(context)
+        )
+
+
+@register.tag
+def feed_cache(parser, token):
+    """
+    Кэширует фрагмент ленты до смены версии её области.
+
+    Использование::
+
+        {% feed_cache scope [vary_on ...] %} ... {% endfeed_cache %}
+    """
+    bits = token.split_contents()
+    if len(bits) < 2:
+        raise template.TemplateSyntaxError(
+            f"'{bits[0]}' принимает как минимум один аргумент."
+        )
+    nodelist = parser.parse(('endfeed_cache',))
+    parser.delete_first_token()
+    return FeedCacheNode(
+        nodelist,
+        parser.compile_filter(bits[1]),
+        [parser.compile_filter(bit) for bit in bits[2:]]
+    )
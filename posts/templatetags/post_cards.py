@@ -0,0 +1,32 @@
+from django import template
+
+from posts import fragments, thumbnails
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def prefetch_post_cards(context, posts):
+    """Загружает карточки всех постов страницы одним get_many."""
+    context['post_cards'] = fragments.get_cards(posts)
+    return ''
+
+
+@register.simple_tag(takes_context=True)
+def post_card(context, post):
+    """Выводит закэшированную общую для всех часть карточки поста."""
+    cards = context.get('post_cards') or {}
+    if post.pk not in cards:
+        cards = fragments.get_cards([post])
+    return cards[post.pk]
+
+
+@register.simple_tag
+def post_thumbnail(image):
+    """
+    src, srcset и sizes готовых миниатюр картинки поста
+    или None, пока они создаются.
+    """
+    if not image:
+        return None
+    return thumbnails.srcset(image)
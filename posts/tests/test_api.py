@@ -0,0 +1,168 @@
+import json
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Comment, Group, Post
+
+User = get_user_model()
+
+
+class ApiTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='test_author')
+        cls.other = User.objects.create_user(username='test_other')
+        cls.group = Group.objects.create(
+            title='test_group',
+            slug='test-slug',
+            description='test_description'
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.guest = Client()
+        self.client = Client()
+        self.client.force_login(self.author)
+        self.post = Post.objects.create(
+            text='test_post', author=self.author, group=self.group
+        )
+
+    def send(self, method, url, data):
+        return getattr(self.client, method)(
+            url, json.dumps(data), content_type='application/json'
+        )
+
+    def test_lists(self):
+        """Ленты отдают посты новыми вперёд с числом комментариев."""
+        Comment.objects.create(
+            post=self.post, author=self.other, text='test_comment'
+        )
+        other = Post.objects.create(text='other_post', author=self.other)
+        for url, expected in (
+            (reverse('api_posts'), [other, self.post]),
+            (reverse('api_group_posts', args=[self.group.slug]), [self.post]),
+            (reverse('api_profile_posts', args=[self.other.username]),
+             [other]),
+        ):
+            with self.subTest(url=url):
+                response = self.guest.get(url)
+                self.assertEqual(response.status_code, 200)
+                results = response.json()['results']
+                self.assertEqual(
+                    [item['id'] for item in results],
+                    [post.id for post in expected]
+                )
+        item = self.guest.get(reverse('api_posts')).json()['results'][1]
+        self.assertEqual(item['author'], self.author.username)
+        self.assertEqual(item['group_slug'], self.group.slug)
+        self.assertEqual(item['comment_count'], 1)
+        self.assertIsNone(item['image'])
+
+    def test_sparse_fields(self):
+        """?fields= оставляет только запрошенные поля."""
+        url = reverse('api_post', args=[self.post.id])
+        response = self.guest.get(url, {'fields': 'id,text'})
+        self.assertEqual(
+            response.json(), {'id': self.post.id, 'text': 'test_post'}
+        )
+        response = self.guest.get(url, {'fields': 'id,password'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('fields', response.json()['errors'])
+
+    def test_cursor_pagination(self):
+        """Курсор ведёт по страницам без пропусков и повторов."""
+        Post.objects.bulk_create(
+            Post(text=f'post{i}', author=self.author)
+            for i in range(settings.PER_PAGE)
+        )
+        url = reverse('api_posts')
+        first = self.guest.get(url, {'fields': 'id'}).json()
+        self.assertIsNone(first['previous'])
+        second = self.guest.get(first['next']).json()
+        self.assertIsNone(second['next'])
+        self.assertIn('fields=id', first['next'])
+        ids = [item['id'] for item in first['results'] + second['results']]
+        self.assertEqual(
+            sorted(ids), sorted(Post.objects.values_list('id', flat=True))
+        )
+        back = self.guest.get(second['previous']).json()
+        self.assertEqual(back['results'], first['results'])
+
+    def test_create_post(self):
+        """Пост создаётся из JSON с проверкой PostForm."""
+        response = self.send(
+            'post', reverse('api_posts'),
+            {'text': 'api_post', 'group': self.group.id}
+        )
+        self.assertEqual(response.status_code, 201)
+        post = Post.objects.get(text='api_post')
+        self.assertEqual(post.author, self.author)
+        self.assertEqual(response.json()['id'], post.id)
+        response = self.send('post', reverse('api_posts'), {'text': ''})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('text', response.json()['errors'])
+
+    def test_edit_post(self):
+        """PATCH меняет переданные поля; чужой пост не меняется."""
+        url = reverse('api_post', args=[self.post.id])
+        response = self.send('patch', url, {'text': 'edited'})
+        self.assertEqual(response.status_code, 200)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.text, 'edited')
+        self.assertEqual(self.post.group, self.group)
+        self.client.force_login(self.other)
+        response = self.send('patch', url, {'text': 'hijacked'})
+        self.assertEqual(response.status_code, 403)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.text, 'edited')
+
+    def test_comments(self):
+        """Комментарии читаются списком и добавляются POST."""
+        url = reverse('api_comments', args=[self.post.id])
+        response = self.send('post', url, {'text': 'api_comment'})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['author'], self.author.username)
+        results = self.guest.get(url).json()['results']
+        self.assertEqual([item['text'] for item in results], ['api_comment'])
+        missing = reverse('api_comments', args=[self.post.id + 1])
+        self.assertEqual(self.guest.get(missing).status_code, 404)
+
+    def test_head_does_not_write(self):
+        """HEAD с телом отвечает как GET и ничего не меняет."""
+        for url in (
+            reverse('api_post', args=[self.post.id]),
+            reverse('api_comments', args=[self.post.id]),
+        ):
+            for client in (self.client, self.guest):
+                with self.subTest(url=url, client=client):
+                    response = client.generic(
+                        'HEAD', url, json.dumps({'text': 'head'}),
+                        content_type='application/json'
+                    )
+                    self.assertEqual(response.status_code, 200)
+                    self.assertEqual(response.content, b'')
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.text, 'test_post')
+        self.assertFalse(Comment.objects.exists())
+
+    def test_errors(self):
+        """Ошибки доступа и метода отдаются в JSON."""
+        response = self.guest.post(
+            reverse('api_posts'), {'text': 'anonymous'}
+        )
+        self.assertEqual(response.status_code, 401)
+        self.assertFalse(Post.objects.filter(text='anonymous').exists())
+        response = self.guest.delete(reverse('api_post', args=[1]))
+        self.assertEqual(response.status_code, 405)
+        self.assertIn('errors', response.json())
+        response = self.client.patch(
+            reverse('api_post', args=[self.post.id]), 'text=x'
+        )
+        self.assertEqual(response.status_code, 415)
+        groups = self.guest.get(reverse('api_groups')).json()['results']
+        self.assertEqual([group['slug'] for group in groups], ['test-slug'])
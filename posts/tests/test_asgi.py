@@ -0,0 +1,83 @@
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.test import SimpleTestCase
+
+from posts import benchmarks
+from yatube import asgi
+
+
+class OkHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        status = 404 if self.path.endswith('/missing/') else 200
+        self.send_response(status)
+        self.send_header('Content-Length', '2')
+        self.end_headers()
+        self.wfile.write(b'ok')
+
+    def log_message(self, *args):
+        pass
+
+
+class AsgiTest(SimpleTestCase):
+    def call(self, scope, messages):
+        sent = []
+
+        async def receive():
+            return messages.pop(0)
+
+        async def send(message):
+            sent.append(message)
+
+        asyncio.run(asgi.application(scope, receive, send))
+        return sent
+
+    def test_http_request(self):
+        """Запрос проходит через WSGI-приложение Django в пуле потоков."""
+        scope = {
+            'type': 'http',
+            'method': 'GET',
+            'path': '/about/author/',
+            'query_string': b'',
+            'headers': [(b'host', b'testserver')],
+            'server': ('testserver', 80),
+        }
+        with self.settings(ALLOWED_HOSTS=['testserver']):
+            sent = self.call(
+                scope, [{'type': 'http.request', 'body': b''}]
+            )
+        start, *body = sent
+        self.assertEqual(start['type'], 'http.response.start')
+        self.assertEqual(start['status'], 200)
+        self.assertIn(
+            (b'content-type', b'text/html; charset=utf-8'), start['headers']
+        )
+        self.assertFalse(body[-1].get('more_body'))
+        self.assertIn('<html', b''.join(m['body'] for m in body).decode())
+
+    def test_lifespan(self):
+        """События запуска и остановки сервера подтверждаются."""
+        sent = self.call({'type': 'lifespan'}, [
+            {'type': 'lifespan.startup'}, {'type': 'lifespan.shutdown'}
+        ])
+        self.assertEqual([message['type'] for message in sent], [
+            'lifespan.startup.complete', 'lifespan.shutdown.complete'
+        ])
+
+
+class LoadTest(SimpleTestCase):
+    def test_load_counts_requests_and_errors(self):
+        """Нагрузка считает успешные ответы, ошибки и перцентили."""
+        server = ThreadingHTTPServer(('127.0.0.1', 0), OkHandler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        url = f'http://127.0.0.1:{server.server_address[1]}'
+        result = benchmarks.load(url, ['/', '/missing/'], 4, 0.3)
+        self.assertGreater(result['requests'], 0)
+        self.assertGreater(result['errors'], 0)
+        self.assertLessEqual(result['p50_ms'], result['p99_ms'])
@@ -0,0 +1,69 @@
+import json
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, override_settings
+
+from posts import benchmarks
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class BenchmarkTest(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_run_measures_every_scenario(self):
+        """Замер проходит по всем страницам и возвращает метрики."""
+        benchmarks.seed(users=3, groups=2, posts=30, comments=40,
+                        image_ratio=0.5)
+        results = benchmarks.run(requests=2, warmup=1)
+        self.assertEqual(set(results), {
+            'index', 'group_posts', 'profile', 'post_view', 'new_post',
+            'add_comment',
+        })
+        for name, row in results.items():
+            with self.subTest(name=name):
+                self.assertTrue(set(row['status']) <= {200, 302})
+                self.assertGreater(row['queries'], 0)
+                self.assertLessEqual(row['p50_ms'], row['p99_ms'])
+
+    def test_compare_flags_regressions(self):
+        """Рост числа запросов или времени выше порога — регрессия."""
+        def report(p50_ms, queries):
+            return {'dataset': {}, 'results': {'index': {
+                'p50_ms': p50_ms, 'p90_ms': p50_ms, 'queries': queries,
+                'bytes': 1000,
+            }}}
+
+        paths = []
+        for name, data in (('base', report(10.0, 3)),
+                           ('same', report(10.5, 3)),
+                           ('slow', report(20.0, 4))):
+            path = os.path.join(MEDIA_ROOT, f'{name}.json')
+            with open(path, 'w') as stream:
+                json.dump(data, stream)
+            paths.append(path)
+        base, same, slow = paths
+        call_command('compare_benchmarks', base, same, stdout=StringIO())
+        with self.assertRaises(CommandError):
+            call_command('compare_benchmarks', base, slow, stdout=StringIO())
+        regressions = {
+            metric
+            for _, metric, _, _, regression in benchmarks.compare(
+                report(10.0, 3), report(20.0, 4), 0.1
+            )
+            if regression
+        }
+        self.assertEqual(regressions, {'p50_ms', 'p90_ms', 'queries'})
@@ -0,0 +1,122 @@
+import json
+import os
+import tempfile
+from datetime import datetime, timezone
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from posts import counters, fragments
+from posts.models import Comment, Group, Post
+
+User = get_user_model()
+
+RECORDS = [
+    {'model': 'group', 'id': 7, 'title': 'Котики', 'slug': 'cats',
+     'description': 'Про котиков'},
+    {'model': 'post', 'id': 11, 'author': 'leo', 'group': 'cats',
+     'text': 'Первый пост', 'pub_date': '2019-05-01T10:00:00+00:00'},
+    {'model': 'post', 'id': 12, 'author': 'tolstoy',
+     'text': 'Второй пост', 'pub_date': '2019-05-02T10:00:00+00:00'},
+    {'model': 'comment', 'id': 3, 'post': 11, 'author': 'tolstoy',
+     'text': 'Комментарий', 'created': '2019-05-03T10:00:00+00:00'},
+]
+
+
+class BulkCommandsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def path(self, name):
+        return os.path.join(self.directory.name, name)
+
+    def write_jsonl(self, records):
+        path = self.path('posts.jsonl')
+        with open(path, 'w', encoding='utf-8') as stream:
+            for record in records:
+                stream.write(json.dumps(record, ensure_ascii=False) + '\n')
+        return path
+
+    def test_import_keeps_ids_dates_and_authors(self):
+        """Импорт сохраняет id и даты из файла и создаёт авторов."""
+        call_command(
+            'import_posts', self.write_jsonl(RECORDS), '--batch-size', '2',
+            stdout=StringIO()
+        )
+        post = Post.objects.get(pk=11)
+        self.assertEqual(post.group, Group.objects.get(pk=7))
+        self.assertEqual(post.author.username, 'leo')
+        self.assertEqual(
+            post.pub_date, datetime(2019, 5, 1, 10, tzinfo=timezone.utc)
+        )
+        self.assertEqual(post.updated, post.pub_date)
+        comment = Comment.objects.get(pk=3)
+        self.assertEqual(comment.post, post)
+        self.assertEqual(
+            comment.created, datetime(2019, 5, 3, 10, tzinfo=timezone.utc)
+        )
+        leo = User.objects.get(username='leo')
+        self.assertFalse(leo.has_usable_password())
+        self.assertEqual(counters.total_posts(), 2)
+        self.assertEqual(counters.group_posts(7), 1)
+
+    def test_export_import_round_trip(self):
+        """Выгрузка и загрузка обратно дают те же данные в обоих форматах."""
+        call_command('import_posts', self.write_jsonl(RECORDS),
+                     stdout=StringIO())
+        for name in ('export.jsonl', 'export.csv'):
+            with self.subTest(name=name):
+                path = self.path(name)
+                call_command('export_posts', path, '--chunk-size', '1',
+                             stderr=StringIO())
+                before = list(Post.objects.values_list(
+                    'id', 'author__username', 'group__slug', 'text',
+                    'pub_date'
+                ))
+                Post.objects.all().delete()
+                Group.objects.all().delete()
+                call_command('import_posts', path, stdout=StringIO())
+                self.assertEqual(list(Post.objects.values_list(
+                    'id', 'author__username', 'group__slug', 'text',
+                    'pub_date'
+                )), before)
+                self.assertEqual(Comment.objects.count(), 1)
+
+    def test_unknown_group_is_reported(self):
+        """Пост с неизвестной группой останавливает импорт с ошибкой."""
+        records = [{'model': 'post', 'author': 'leo', 'group': 'missing',
+                    'text': 'Пост'}]
+        with self.assertRaises(CommandError):
+            call_command('import_posts', self.write_jsonl(records),
+                         stdout=StringIO())
+        self.assertFalse(Post.objects.exists())
+
+    def test_failed_batch_settles_saved_batches(self):
+        """
+        После ошибки во второй пачке счётчики и версии фрагментов
+        учитывают сохранённую первую пачку.
+        """
+        self.assertEqual(counters.total_posts(), 0)
+        version = fragments.version(fragments.index_scope())
+        records = RECORDS[:3] + [
+            {'model': 'post', 'author': 'leo', 'group': 'missing',
+             'text': 'Пост'},
+        ]
+        with self.assertRaises(CommandError):
+            call_command(
+                'import_posts', self.write_jsonl(records),
+                '--batch-size', '2', stdout=StringIO()
+            )
+        self.assertEqual(list(Post.objects.values_list('id', flat=True)),
+                         [11])
+        self.assertEqual(counters.total_posts(), 1)
+        self.assertEqual(counters.group_posts(7), 1)
+        self.assertNotEqual(
+            fragments.version(fragments.index_scope()), version
+        )
@@ -0,0 +1,68 @@
+from django.conf import settings
+from django.test import SimpleTestCase, override_settings
+
+from posts.checks import check_slow_settings
+
+PRODUCTION_SETTINGS = {
+    'DEBUG': False,
+    'CACHES': {'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': '/tmp/yatube-check-cache',
+    }},
+    'STATICFILES_STORAGE': (
+        'django.contrib.staticfiles.storage.ManifestStaticFilesStorage'
+    ),
+    'SESSION_ENGINE': 'django.contrib.sessions.backends.cached_db',
+    'TEMPLATES': [{
+        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'DIRS': settings.TEMPLATES[0]['DIRS'],
+        'OPTIONS': {'loaders': [(
+            'django.template.loaders.cached.Loader',
+            settings.TEMPLATE_LOADERS,
+        )]},
+    }],
+}
+
+
+class SlowSettingsCheckTest(SimpleTestCase):
+    def check_ids(self):
+        return {warning.id for warning in check_slow_settings(None)}
+
+    def with_conn_max_age(self, conn_max_age):
+        return {
+            alias: {**config, 'CONN_MAX_AGE': conn_max_age}
+            for alias, config in settings.DATABASES.items()
+        }
+
+    def test_development_settings_warn(self):
+        """Настройки разработки помечаются как медленные."""
+        with override_settings(
+            DEBUG=True,
+            STATICFILES_STORAGE=(
+                'django.contrib.staticfiles.storage.StaticFilesStorage'
+            ),
+            SESSION_ENGINE='django.contrib.sessions.backends.db',
+            CACHES={'default': {
+                'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            }},
+        ):
+            self.assertTrue({
+                'posts.W001', 'posts.W002', 'posts.W004', 'posts.W005',
+                'posts.W007',
+            } <= self.check_ids())
+
+    def test_production_settings_pass(self):
+        """Профиль продакшена не вызывает предупреждений."""
+        with override_settings(**PRODUCTION_SETTINGS):
+            with self.settings(DATABASES=self.with_conn_max_age(60)):
+                self.assertEqual(self.check_ids(), set())
+
+    def test_missing_middleware(self):
+        """Отсутствие GZip и ConditionalGet отмечается отдельно."""
+        middleware = [
+            name for name in settings.MIDDLEWARE
+            if not name.startswith(('django.middleware.gzip',
+                                    'django.middleware.http'))
+        ]
+        with override_settings(**PRODUCTION_SETTINGS, MIDDLEWARE=middleware):
+            self.assertIn('posts.W006', self.check_ids())
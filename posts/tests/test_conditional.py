@@ -0,0 +1,131 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TransactionTestCase
+from django.urls import reverse
+
+from posts import fragments
+from posts.models import Comment, Group, Post
+
+User = get_user_model()
+
+
+class ConditionalGetTest(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.author = User.objects.create_user(username='test_author')
+        self.group = Group.objects.create(
+            title='test_group', slug='test-slug', description='test'
+        )
+        self.post = Post.objects.create(
+            text='test_post', author=self.author, group=self.group
+        )
+
+    def urls(self):
+        return [
+            reverse('index'),
+            reverse('group', args=[self.group.slug]),
+            reverse('profile', args=[self.author.username]),
+            reverse('post', args=[self.author.username, self.post.id]),
+        ]
+
+    def age_scopes(self):
+        """Сдвигает время изменения областей на минуту назад."""
+        scopes = [
+            fragments.index_scope(), fragments.group_scope(self.group.id)
+        ]
+        cache.set_many({
+            fragments.MODIFIED_KEY.format(scope): time.time() - 60
+            for scope in scopes
+        }, None)
+
+    def test_unchanged_pages_return_304(self):
+        """Повторный запрос с ETag получает 304."""
+        for url in self.urls():
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                repeated = self.client.get(
+                    url, HTTP_IF_NONE_MATCH=response['ETag']
+                )
+                self.assertEqual(repeated.status_code, 304)
+                self.assertEqual(repeated['ETag'], response['ETag'])
+
+    def test_last_modified_for_anonymous_feeds(self):
+        """
+        Last-Modified отдаётся анонимам только для лент, зависящих
+        лишь от областей кэша, и не раньше следующей секунды.
+        """
+        index, group, profile, post = self.urls()
+        self.assertNotIn('Last-Modified', self.client.get(index))
+        self.age_scopes()
+        for url in (index, group):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                repeated = self.client.get(
+                    url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+                )
+                self.assertEqual(repeated.status_code, 304)
+        for url in (profile, post):
+            with self.subTest(url=url):
+                self.assertNotIn('Last-Modified', self.client.get(url))
+
+    def test_private_pages_are_etag_only(self):
+        """
+        Авторизованным Last-Modified не отдаётся, а ETag зависит
+        от сессии.
+        """
+        self.age_scopes()
+        url = self.urls()[0]
+        self.client.force_login(self.author)
+        response = self.client.get(url)
+        self.assertNotIn('Last-Modified', response)
+        other = Client()
+        other.force_login(self.author)
+        self.assertNotEqual(other.get(url)['ETag'], response['ETag'])
+        repeated = other.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(repeated.status_code, 200)
+
+    def test_cache_control(self):
+        """Анонимам ответ общий, авторизованным — только для браузера."""
+        url = self.urls()[0]
+        anonymous = self.client.get(url)
+        self.assertIn('public', anonymous['Cache-Control'])
+        self.assertIn('Cookie', anonymous['Vary'])
+        self.client.force_login(self.author)
+        personal = self.client.get(url)
+        self.assertIn('private', personal['Cache-Control'])
+        self.assertNotEqual(personal['ETag'], anonymous['ETag'])
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=anonymous['ETag'])
+        self.assertEqual(response.status_code, 200)
+
+    def test_changes_invalidate_etag(self):
+        """Новый комментарий и пост меняют ETag затронутых страниц."""
+        etags = {url: self.client.get(url)['ETag'] for url in self.urls()}
+        Comment.objects.create(
+            post=self.post, author=self.author, text='test_comment'
+        )
+        Post.objects.create(text='other', author=self.author)
+        for url, etag in etags.items():
+            with self.subTest(url=url):
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 200)
+
+    def test_query_string_is_part_of_etag(self):
+        """Разные страницы ленты имеют разные ETag."""
+        url = self.urls()[0]
+        first = self.client.get(url)['ETag']
+        self.assertNotEqual(self.client.get(url, {'page': 2})['ETag'], first)
+
+    def test_missing_objects_are_not_validated(self):
+        """Для несуществующих объектов по-прежнему отдаётся 404."""
+        for url in (
+            reverse('group', args=['missing']),
+            reverse('profile', args=['missing']),
+            reverse('post', args=[self.author.username, self.post.id + 1]),
+        ):
+            with self.subTest(url=url):
+                response = self.client.get(url, HTTP_IF_NONE_MATCH='*')
+                self.assertEqual(response.status_code, 404)
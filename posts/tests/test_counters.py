@@ -0,0 +1,69 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TransactionTestCase
+
+from posts import counters
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+class PostCountersTest(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='test_author')
+        self.group = Group.objects.create(
+            title='test_group',
+            slug='test-slug',
+            description='test_description'
+        )
+        self.other_group = Group.objects.create(
+            title='test_other_group',
+            slug='test-other-slug',
+            description='test_description'
+        )
+        self.post = Post.objects.create(
+            text='test_post',
+            group=self.group,
+            author=self.author
+        )
+
+    def assertCounters(self, total, author, group, other_group):
+        self.assertEqual(counters.total_posts(), total)
+        self.assertEqual(counters.author_posts(self.author.id), author)
+        self.assertEqual(counters.group_posts(self.group.id), group)
+        self.assertEqual(
+            counters.group_posts(self.other_group.id), other_group
+        )
+
+    def test_counters_follow_post_changes(self):
+        """Счётчики обновляются при создании, переносе и удалении поста."""
+        self.assertCounters(1, 1, 1, 0)
+        Post.objects.create(text='test_post_2', author=self.author)
+        self.assertCounters(2, 2, 1, 0)
+        self.post.group = self.other_group
+        self.post.save()
+        self.assertCounters(2, 2, 0, 1)
+        self.post.delete()
+        self.assertCounters(1, 1, 0, 0)
+
+    def test_counters_served_from_cache(self):
+        """Повторное чтение счётчика не обращается к базе."""
+        counters.author_posts(self.author.id)
+        with self.assertNumQueries(0):
+            self.assertEqual(counters.author_posts(self.author.id), 1)
+
+    def test_rebuild_command_fixes_drift(self):
+        """Команда находит и исправляет расхождения счётчиков."""
+        counters.total_posts()
+        cache.set(counters.TOTAL_KEY, 42, None)
+        with self.assertRaises(CommandError):
+            call_command('rebuild_post_counters', check=True,
+                         stdout=StringIO())
+        call_command('rebuild_post_counters', stdout=StringIO())
+        self.assertEqual(counters.total_posts(), 1)
+        call_command('rebuild_post_counters', check=True, stdout=StringIO())
@@ -0,0 +1,150 @@
+import json
+import time
+from xml.etree import ElementTree
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from posts import fragments, timelines
+from posts.models import Group, Post
+
+User = get_user_model()
+
+ATOM = '{http://www.w3.org/2005/Atom}'
+
+
+@override_settings(FEED_ITEMS=5, FEED_CHUNK_ITEMS=2)
+class FeedTest(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.author = User.objects.create_user(username='test_author')
+        self.group = Group.objects.create(
+            title='test_group', slug='test-slug', description='test'
+        )
+        for i in range(3):
+            Post.objects.create(
+                text=f'test_post{i}\nвторая строка',
+                author=self.author,
+                group=self.group
+            )
+        Post.objects.create(text='без группы', author=self.author)
+
+    def content(self, response):
+        if response.streaming:
+            return b''.join(response.streaming_content).decode()
+        return response.content.decode()
+
+    def titles(self, fmt, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        content = self.content(response)
+        if fmt == 'json':
+            return [item['title'] for item in json.loads(content)['items']]
+        root = ElementTree.fromstring(content)
+        if fmt == 'rss':
+            return [item.findtext('title') for item in root.iter('item')]
+        return [
+            entry.findtext(f'{ATOM}title')
+            for entry in root.iter(f'{ATOM}entry')
+        ]
+
+    def test_formats(self):
+        """Ленты во всех форматах содержат посты новыми вперёд."""
+        for fmt in ('rss', 'atom', 'json'):
+            for url, expected in (
+                (reverse('index_feed', args=[fmt]),
+                 ['без группы', 'test_post2', 'test_post1', 'test_post0']),
+                (reverse('group_feed', args=[fmt, self.group.slug]),
+                 ['test_post2', 'test_post1', 'test_post0']),
+                (reverse('profile_feed', args=[fmt, self.author.username]),
+                 ['без группы', 'test_post2', 'test_post1', 'test_post0']),
+            ):
+                with self.subTest(url=url):
+                    self.assertEqual(self.titles(fmt, url), expected)
+
+    def test_feed_length_is_limited(self):
+        """В ленте не больше FEED_ITEMS записей."""
+        Post.objects.bulk_create(
+            Post(text=f'extra{i}', author=self.author) for i in range(5)
+        )
+        url = reverse('index_feed', args=['rss'])
+        self.assertEqual(len(self.titles('rss', url)), 5)
+
+    def test_streamed_then_cached(self):
+        """Первый ответ идёт потоком, следующий — из кэша до изменений."""
+        url = reverse('index_feed', args=['atom'])
+        first = self.client.get(url)
+        self.assertTrue(first.streaming)
+        body = self.content(first)
+        second = self.client.get(url)
+        self.assertFalse(second.streaming)
+        self.assertEqual(second.content.decode(), body)
+        Post.objects.create(text='новый пост', author=self.author)
+        third = self.client.get(url)
+        self.assertTrue(third.streaming)
+        self.assertIn('новый пост', self.content(third))
+
+    def test_conditional_get(self):
+        """Неизменившаяся лента отдаётся ответом 304."""
+        url = reverse('group_feed', args=['rss', self.group.slug])
+        response = self.client.get(url)
+        self.content(response)
+        repeated = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(repeated.status_code, 304)
+        Post.objects.create(
+            text='новый пост', author=self.author, group=self.group
+        )
+        changed = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(changed.status_code, 200)
+
+    def test_cached_per_scheme(self):
+        """Документ из кэша не отдаётся с ссылками другой схемы."""
+        url = reverse('index_feed', args=['rss'])
+        self.content(self.client.get(url))
+        response = self.client.get(url, secure=True)
+        self.assertIn('https://testserver/', self.content(response))
+        self.assertNotIn('http://testserver/', self.content(response))
+
+    def test_author_feed_ignores_follows(self):
+        """
+        Подписки не меняют ETag ленты автора, и он одинаков для всех
+        читателей.
+        """
+        cache.set(fragments.MODIFIED_KEY.format(
+            fragments.profile_scope(self.author.pk)
+        ), time.time() - 60, None)
+        url = reverse('profile_feed', args=['atom', self.author.username])
+        response = self.client.get(url)
+        self.content(response)
+        self.assertIn('Last-Modified', response)
+        reader = User.objects.create_user(username='test_reader')
+        timelines.follow(reader, self.author)
+        client = Client()
+        client.force_login(reader)
+        for requester in (self.client, client):
+            with self.subTest(requester=requester):
+                repeated = requester.get(
+                    url, HTTP_IF_NONE_MATCH=response['ETag']
+                )
+                self.assertEqual(repeated.status_code, 304)
+                self.assertIn('public', repeated['Cache-Control'])
+
+    def test_unknown_feeds(self):
+        """Неизвестный формат, группа или автор дают 404."""
+        for url in (
+            reverse('index_feed', args=['xml']),
+            reverse('group_feed', args=['rss', 'missing']),
+            reverse('profile_feed', args=['rss', 'missing']),
+        ):
+            with self.subTest(url=url):
+                self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_pages_link_feeds(self):
+        """Страницы лент ссылаются на свои RSS и Atom."""
+        response = self.client.get(reverse('group', args=[self.group.slug]))
+        self.assertContains(
+            response, reverse('group_feed', args=['rss', self.group.slug])
+        )
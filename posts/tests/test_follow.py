@@ -0,0 +1,125 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Follow, Post, TimelineEntry
+
+User = get_user_model()
+
+
+@override_settings(TASK_BACKEND='immediate')
+class FollowViewsTest(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='test_author')
+        self.follower = User.objects.create_user(username='test_follower')
+        self.follower_client = Client()
+        self.follower_client.force_login(self.follower)
+        self.stranger = User.objects.create_user(username='test_stranger')
+        self.stranger_client = Client()
+        self.stranger_client.force_login(self.stranger)
+        self.old_post = Post.objects.create(
+            text='test_old_post',
+            author=self.author
+        )
+
+    def follow(self):
+        return self.follower_client.get(
+            reverse('profile_follow', args=[self.author.username])
+        )
+
+    def feed_posts(self, client):
+        response = client.get(reverse('follow_index'))
+        return list(response.context.get('page').object_list)
+
+    def test_follow_backfills_timeline(self):
+        """Подписка добавляет в ленту прежние посты автора."""
+        self.follow()
+        self.assertTrue(Follow.objects.filter(
+            user=self.follower, author=self.author
+        ).exists())
+        self.assertEqual(self.feed_posts(self.follower_client),
+                         [self.old_post])
+        self.assertEqual(self.feed_posts(self.stranger_client), [])
+
+    def test_new_post_fanned_out_to_followers(self):
+        """Новый пост сразу записывается в ленты подписчиков."""
+        self.follow()
+        post = Post.objects.create(text='test_new_post', author=self.author)
+        self.assertTrue(TimelineEntry.objects.filter(
+            user=self.follower, post=post
+        ).exists())
+        self.assertEqual(self.feed_posts(self.follower_client),
+                         [post, self.old_post])
+
+    def test_unfollow_clears_timeline(self):
+        """После отписки посты автора пропадают из ленты."""
+        self.follow()
+        self.follower_client.get(
+            reverse('profile_unfollow', args=[self.author.username])
+        )
+        self.assertFalse(Follow.objects.exists())
+        self.assertEqual(self.feed_posts(self.follower_client), [])
+
+    def test_cannot_follow_self(self):
+        """Нельзя подписаться на самого себя."""
+        client = Client()
+        client.force_login(self.author)
+        client.get(reverse('profile_follow', args=[self.author.username]))
+        self.assertFalse(Follow.objects.exists())
+
+    @override_settings(FANOUT_MAX_FOLLOWERS=0)
+    def test_popular_author_read_on_demand(self):
+        """Посты популярного автора подмешиваются в ленту при чтении."""
+        self.follow()
+        post = Post.objects.create(text='test_new_post', author=self.author)
+        self.assertFalse(TimelineEntry.objects.filter(post=post).exists())
+        self.assertEqual(self.feed_posts(self.follower_client),
+                         [post, self.old_post])
+
+    @override_settings(FANOUT_MAX_FOLLOWERS=1)
+    def test_author_no_longer_popular(self):
+        """
+        Когда популярный автор теряет подписчиков, посты, написанные
+        без fan-out, остаются в лентах.
+        """
+        self.follow()
+        self.stranger_client.get(
+            reverse('profile_follow', args=[self.author.username])
+        )
+        post = Post.objects.create(text='test_new_post', author=self.author)
+        self.assertFalse(TimelineEntry.objects.filter(post=post).exists())
+        self.stranger_client.get(
+            reverse('profile_unfollow', args=[self.author.username])
+        )
+        self.assertEqual(self.feed_posts(self.follower_client),
+                         [post, self.old_post])
+        late_follower = User.objects.create_user(username='test_late')
+        client = Client()
+        client.force_login(late_follower)
+        client.get(reverse('profile_follow', args=[self.author.username]))
+        self.assertEqual(self.feed_posts(client), [post, self.old_post])
+
+    def test_equal_dates_ordered_by_id(self):
+        """Посты с одинаковой датой идут в ленте в одном порядке."""
+        self.follow()
+        post = Post.objects.create(text='test_new_post', author=self.author)
+        Post.objects.update(pub_date=self.old_post.pub_date)
+        TimelineEntry.objects.update(pub_date=self.old_post.pub_date)
+        self.assertEqual(self.feed_posts(self.follower_client),
+                         [post, self.old_post])
+
+    def test_profile_shows_follow_counts(self):
+        """Карточка автора выводит число подписчиков и подписок."""
+        self.follow()
+        response = self.stranger_client.get(
+            reverse('profile', args=[self.author.username])
+        )
+        self.assertEqual(response.context.get('followers_count'), 1)
+        self.assertEqual(response.context.get('following_count'), 0)
+        self.assertFalse(response.context.get('following'))
+        response = self.follower_client.get(
+            reverse('profile', args=[self.author.username])
+        )
+        self.assertTrue(response.context.get('following'))
@@ -1,11 +1,13 @@
 import shutil
 import tempfile
+from io import BytesIO
 
 from django.contrib.auth import get_user_model
 from django.conf import settings
-from django.test import Client, TestCase
+from django.test import Client, TestCase, override_settings
 from django.urls import reverse
 from django.core.files.uploadedfile import SimpleUploadedFile
+from PIL import Image
 
 from posts.models import Group, Post
 from posts.forms import PostForm
@@ -101,7 +103,7 @@ class PostFormTests(TestCase):
             Post.objects.filter(
                 group=PostFormTests.group_old.id,
                 text='test_new_post',
-                image='posts/small_old2.gif',
+                image='posts/small_old2.jpg',
             ).exists()
         )
 
@@ -140,7 +142,7 @@ class PostFormTests(TestCase):
             Post.objects.filter(
                 group=PostFormTests.group_new.id,
                 text='test_edit_post',
-                image='posts/small_new.gif'
+                image='posts/small_new.jpg'
             ).exists()
         )
         self.assertFalse(
@@ -150,3 +152,56 @@ class PostFormTests(TestCase):
                 image='posts/small_old1.gif'
             ).exists()
         )
+
+    def make_image(self, size, exif=None):
+        buffer = BytesIO()
+        image = Image.new('RGB', size, (255, 0, 0))
+        if exif is not None:
+            image.save(buffer, format='JPEG', exif=exif)
+        else:
+            image.save(buffer, format='JPEG')
+        return SimpleUploadedFile(
+            name='photo.jpeg',
+            content=buffer.getvalue(),
+            content_type='image/jpeg'
+        )
+
+    @override_settings(POST_IMAGE_MAX_UPLOAD_SIZE=2 ** 20)
+    def test_oversized_image_rejected(self):
+        """Слишком большой файл отклоняется, пост не создаётся."""
+        posts_count = Post.objects.count()
+        response = PostFormTests.author_client.post(
+            reverse('new_post'),
+            data={
+                'text': 'test_oversized_post',
+                'image': SimpleUploadedFile(
+                    name='big.gif',
+                    content=b'\x00' * 2 ** 21,
+                    content_type='image/gif'
+                )
+            }
+        )
+        self.assertEqual(Post.objects.count(), posts_count)
+        self.assertFormError(
+            response,
+            'form',
+            'image',
+            'Файл слишком большой: 2.0 МБ, допустимо не больше 1.0 МБ.'
+        )
+
+    @override_settings(POST_IMAGE_MAX_SIDE=100)
+    def test_image_normalized(self):
+        """Картинка уменьшается, пересохраняется в JPEG и теряет EXIF."""
+        exif = Image.Exif()
+        exif[0x010F] = 'test camera'
+        form = PostForm(
+            data={'text': 'test_post'},
+            files={'image': self.make_image((400, 200), exif.tobytes())}
+        )
+        self.assertTrue(form.is_valid())
+        image = form.cleaned_data['image']
+        self.assertEqual(image.name, 'photo.jpg')
+        with Image.open(image) as saved:
+            self.assertEqual(saved.size, (100, 50))
+            self.assertEqual(saved.format, 'JPEG')
+            self.assertNotIn('exif', saved.info)
@@ -0,0 +1,72 @@
+import time
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from posts import fragments
+
+
+@override_settings(FRAGMENT_STAMPEDE_SCOPES=('index',))
+class FragmentCacheTest(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.render = mock.Mock(return_value='<p>fragment</p>')
+
+    def get(self, scope='index'):
+        return fragments.get_or_render(scope, ['page'], self.render)
+
+    @override_settings(FRAGMENT_COMPRESS_MIN_LENGTH=100)
+    def test_large_fragments_are_compressed(self):
+        """Длинные фрагменты хранятся сжатыми и читаются без изменений."""
+        html = '<p>текст</p>' * 100
+        packed = fragments.pack(html)
+        self.assertIsInstance(packed, bytes)
+        self.assertLess(len(packed), len(html.encode()))
+        self.assertEqual(fragments.unpack(packed), html)
+        self.assertEqual(fragments.pack('<p></p>'), '<p></p>')
+        self.render.return_value = html
+        self.get()
+        self.assertEqual(self.get(), html)
+        self.assertEqual(self.render.call_count, 1)
+
+    @override_settings(FRAGMENT_STAMPEDE_MODE='lock')
+    def test_lock_serves_previous_version(self):
+        """Пока новый фрагмент рендерится, отдаётся прежняя версия."""
+        self.get()
+        fragments.bump(fragments.index_scope())
+        lock_key = fragments.LOCK_KEY.format(
+            'index', fragments._digest(['page'])
+        )
+        cache.add(lock_key, 1)
+        self.render.return_value = '<p>new</p>'
+        self.assertEqual(self.get(), '<p>fragment</p>')
+        self.assertEqual(self.render.call_count, 1)
+        cache.delete(lock_key)
+        self.assertEqual(self.get(), '<p>new</p>')
+        self.assertIsNone(cache.get(lock_key))
+
+    @override_settings(FRAGMENT_STAMPEDE_MODE='lock')
+    def test_lock_applies_to_protected_scopes_only(self):
+        """Области вне FRAGMENT_STAMPEDE_SCOPES рендерятся как обычно."""
+        self.get('group:1')
+        fragments.bump('group:1')
+        cache.add(
+            fragments.LOCK_KEY.format('group:1', fragments._digest(['page'])),
+            1
+        )
+        self.get('group:1')
+        self.assertEqual(self.render.call_count, 2)
+
+    @override_settings(FRAGMENT_STAMPEDE_MODE='xfetch')
+    def test_xfetch_refreshes_before_expiry(self):
+        """В режиме xfetch фрагмент обновляется до истечения срока."""
+        key = fragments.fragment_key('index', ['page'])
+        # Рендер шёл секунду, до истечения срока минута.
+        cache.set(key, ('<p>cached</p>', 1.0, time.time() + 60))
+        with mock.patch.object(fragments.random, 'random', return_value=0.5):
+            with override_settings(FRAGMENT_XFETCH_BETA=1):
+                self.assertEqual(self.get(), '<p>cached</p>')
+            with override_settings(FRAGMENT_XFETCH_BETA=1000):
+                self.assertEqual(self.get(), '<p>fragment</p>')
+        self.assertEqual(self.render.call_count, 1)
@@ -0,0 +1,62 @@
+import re
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import Post
+
+User = get_user_model()
+
+SERVER_TIMING = re.compile(
+    r'db;dur=[\d.]+;desc="(\d+) queries", '
+    r'tpl;dur=([\d.]+), total;dur=([\d.]+)'
+)
+
+
+class RequestMetricsMiddlewareTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        author = User.objects.create_user(username='test_author')
+        Post.objects.create(text='test_post', author=author)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_server_timing_header(self):
+        """Заголовок Server-Timing содержит число запросов и времена."""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('index'))
+        match = SERVER_TIMING.fullmatch(response['Server-Timing'])
+        self.assertIsNotNone(match)
+        self.assertEqual(int(match.group(1)), len(queries))
+        self.assertGreater(float(match.group(2)), 0)
+        self.assertGreaterEqual(float(match.group(3)),
+                                float(match.group(2)))
+
+    @override_settings(REQUEST_METRICS_SAMPLE_RATE=0)
+    def test_unsampled_requests_are_not_measured(self):
+        """Запросы вне выборки не получают заголовок."""
+        response = self.client.get(reverse('index'))
+        self.assertFalse(response.has_header('Server-Timing'))
+
+    def test_log_line(self):
+        """Каждый замеренный запрос пишется в лог posts.metrics."""
+        with self.assertLogs('posts.metrics', 'INFO') as logs:
+            self.client.get(reverse('index'))
+        self.assertEqual(logs.records[0].levelname, 'INFO')
+        metrics = logs.records[0].metrics
+        self.assertEqual(metrics['view'], 'index')
+        self.assertEqual(metrics['status'], 200)
+        self.assertIn('view=index', logs.output[0])
+
+    @override_settings(REQUEST_METRICS_SLOW_MS=0)
+    def test_slow_requests_are_warnings(self):
+        """Медленные запросы пишутся с уровнем WARNING."""
+        with self.assertLogs('posts.metrics', 'WARNING') as logs:
+            self.client.get(reverse('index'))
+        self.assertEqual(logs.records[0].levelname, 'WARNING')
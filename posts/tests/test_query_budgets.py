@@ -0,0 +1,88 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Comment, Group, Post
+from posts.tests.utils import QUERY_BUDGETS, QueryBudget
+
+User = get_user_model()
+
+POSTS = 5
+
+
+class QueryBudgetTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='test_author')
+        cls.group = Group.objects.create(
+            title='test_group',
+            slug='test-slug',
+            description='test_description'
+        )
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(self.author)
+
+    def add_posts(self, count):
+        for i in range(count):
+            post = Post.objects.create(
+                text=f'test_post{i}', group=self.group, author=self.author
+            )
+            Comment.objects.create(
+                post=post, author=self.author, text=f'test_comment{i}'
+            )
+
+    def requests(self):
+        post = Post.objects.order_by('pk').first()
+        post_args = [self.author.username, post.id]
+        edit = {'text': 'test_edited', 'group': self.group.id}
+        return [
+            ('index', 'get', reverse('index'), None),
+            ('group', 'get', reverse('group', args=[self.group.slug]), None),
+            ('profile', 'get',
+             reverse('profile', args=[self.author.username]), None),
+            ('post', 'get', reverse('post', args=post_args), None),
+            ('post_edit', 'get', reverse('post_edit', args=post_args), None),
+            ('post_edit', 'post', reverse('post_edit', args=post_args), edit),
+            ('add_comment', 'post', reverse('add_comment', args=post_args),
+             {'text': 'test_comment'}),
+            ('api_posts', 'get', reverse('api_posts'), None),
+            ('api_comments', 'get', reverse('api_comments', args=[post.id]),
+             None),
+        ]
+
+    def measure(self):
+        counts = {}
+        for url_name, method, url, data in self.requests():
+            with self.subTest(url_name=url_name, method=method):
+                cache.clear()
+                with QueryBudget(url_name) as queries:
+                    response = getattr(self.client, method)(url, data)
+                self.assertIn(response.status_code, (200, 302))
+                counts[url_name, method] = len(queries)
+        return counts
+
+    def test_budgets_are_declared_for_every_page(self):
+        """Бюджеты объявлены для всех проверяемых страниц."""
+        self.add_posts(1)
+        self.assertEqual(
+            {url_name for url_name, *_ in self.requests()},
+            set(QUERY_BUDGETS)
+        )
+
+    def test_queries_do_not_grow_with_posts(self):
+        """С N и 10N постами страницы укладываются в один бюджет."""
+        self.add_posts(POSTS)
+        small = self.measure()
+        self.add_posts(POSTS * 9)
+        self.assertEqual(self.measure(), small)
+
+    def test_budget_violation_is_reported(self):
+        """Превышение бюджета роняет тест со списком запросов."""
+        self.add_posts(1)
+        with self.assertRaisesMessage(AssertionError, 'при бюджете 1'):
+            with QueryBudget('index', budget=1):
+                self.client.get(reverse('index'))
@@ -0,0 +1,118 @@
+import re
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts import fragments, timelines
+from posts.models import Comment, Group, Post
+
+User = get_user_model()
+
+FULL_SCAN = re.compile(r'\bSCAN (TABLE )?\w+\b(?! USING)')
+TEMP_SORT = re.compile(r'TEMP B-TREE')
+
+
+class QueryPlanTest(TestCase):
+    """
+    Планы SQLite для запросов, которые выполняют представления ленты.
+
+    Запрос не должен читать таблицу целиком и сортировать во временном
+    B-дереве: нужные составные индексы объявлены в Meta моделей.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='test_author')
+        cls.reader = User.objects.create_user(username='test_reader')
+        cls.reader_client = Client()
+        cls.reader_client.force_login(cls.reader)
+        cls.group = Group.objects.create(
+            title='test_group',
+            slug='test-slug',
+            description='test_description'
+        )
+        timelines.follow(cls.reader, cls.author)
+        for i in range(3):
+            cls.post = Post.objects.create(
+                text=f'test_post{i}',
+                group=cls.group,
+                author=cls.author
+            )
+            timelines.fan_out(cls.post)
+            Comment.objects.create(
+                post=cls.post,
+                author=cls.reader,
+                text=f'test_comment{i}'
+            )
+        cls.urls = {
+            'index': (reverse('index'), fragments.index_scope()),
+            'group': (
+                reverse('group', args=[cls.group.slug]),
+                fragments.group_scope(cls.group.id)
+            ),
+            'profile': (
+                reverse('profile', args=[cls.author.username]),
+                fragments.profile_scope(cls.author.id)
+            ),
+            'post': (
+                reverse('post', args=[cls.author.username, cls.post.id]),
+                fragments.post_scope(cls.post.id)
+            ),
+            'follow_index': (reverse('follow_index'), None),
+        }
+
+    def setUp(self):
+        cache.clear()
+
+    def capture(self, url, scope, params=None):
+        # Первый запрос прогревает счётчики, второй — после сброса
+        # фрагментов — выполняет все запросы ленты.
+        self.reader_client.get(url, params)
+        if scope is not None:
+            fragments.bump(scope)
+        with CaptureQueriesContext(connection) as queries:
+            self.reader_client.get(url, params)
+        return [query['sql'] for query in queries.captured_queries]
+
+    def explain(self, sql):
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            return [row[-1] for row in cursor.fetchall()]
+
+    def assertIndexedPlans(self, queries):
+        for sql in queries:
+            if not sql.startswith('SELECT'):
+                continue
+            for step in self.explain(sql):
+                with self.subTest(sql=sql, step=step):
+                    self.assertIsNone(FULL_SCAN.search(step))
+                    self.assertIsNone(TEMP_SORT.search(step))
+
+    def test_views_use_indexes(self):
+        """Запросы страниц читают данные по индексам без сортировки."""
+        for name, (url, scope) in QueryPlanTest.urls.items():
+            with self.subTest(view=name):
+                self.assertIndexedPlans(self.capture(url, scope))
+
+    @override_settings(FEED_PAGINATION={
+        'index': 'cursor',
+        'group': 'cursor',
+        'profile': 'cursor'
+    })
+    def test_cursor_pages_use_indexes(self):
+        """Страницы по курсору читают данные по индексам без сортировки."""
+        for name in ('index', 'group', 'profile'):
+            url, scope = QueryPlanTest.urls[name]
+            with self.subTest(view=name):
+                page = self.reader_client.get(url).context.get('page')
+                cursor = page.paginator.encode_cursor(
+                    'n', page.object_list[0]
+                )
+                self.assertIndexedPlans(
+                    self.capture(url, scope, {'cursor': cursor})
+                )
@@ -0,0 +1,158 @@
+import os
+import sqlite3
+import tempfile
+import time
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.contrib.sessions.backends.db import SessionStore
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connections, router
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import (
+    Client, RequestFactory, SimpleTestCase, TransactionTestCase,
+    override_settings
+)
+from django.urls import reverse
+
+from posts import counters, fragments
+from posts.models import Post
+from posts.routers import PIN_SESSION_KEY, ReplicaMiddleware
+
+User = get_user_model()
+
+
+@override_settings(DATABASE_REPLICAS=['replica1'])
+class ReplicaRoutingTest(SimpleTestCase):
+    def handle(self, method='get', session=None, write=False):
+        """Пропускает запрос через middleware, возвращает базы чтения."""
+        request = getattr(RequestFactory(), method)('/')
+        request.session = session if session is not None else SessionStore()
+        seen = []
+
+        def view(request):
+            seen.append(router.db_for_read(Post))
+            seen.append(router.db_for_read(Session))
+            if write:
+                router.db_for_write(Post)
+                seen.append(router.db_for_read(Post))
+            return HttpResponse()
+
+        ReplicaMiddleware(view)(request)
+        return request, seen
+
+    def test_reads_from_replica(self):
+        """GET читает посты из реплики, а сессии — из основной базы."""
+        self.assertEqual(self.handle()[1], ['replica1', 'default'])
+
+    def test_unsafe_methods_use_primary(self):
+        """POST целиком выполняется в основной базе."""
+        self.assertEqual(self.handle('post')[1], ['default', 'default'])
+
+    def test_write_pins_session(self):
+        """После записи пользователь читает из основной базы."""
+        request, seen = self.handle(write=True)
+        self.assertEqual(seen[-1], 'default')
+        self.assertGreater(request.session[PIN_SESSION_KEY], time.time())
+        self.assertEqual(self.handle(session=request.session)[1][0], 'default')
+        request.session[PIN_SESSION_KEY] = time.time() - 1
+        self.assertEqual(
+            self.handle(session=request.session)[1][0], 'replica1'
+        )
+
+    def test_reads_outside_requests_use_primary(self):
+        """Команды и фоновые задачи работают с основной базой."""
+        self.assertEqual(router.db_for_read(Post), 'default')
+        self.assertEqual(router.db_for_write(Post), 'default')
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_without_replicas(self):
+        """Без реплик сессия не трогается, всё идёт в основную базу."""
+        request, seen = self.handle(write=True)
+        self.assertEqual(seen, ['default', 'default', 'default'])
+        self.assertNotIn(PIN_SESSION_KEY, request.session)
+
+    def test_streaming_content_reads_from_replica(self):
+        """Потоковый ответ дочитывается из той же реплики."""
+        def chunks():
+            yield router.db_for_read(Post)
+
+        request = RequestFactory().get('/')
+        request.session = SessionStore()
+        response = ReplicaMiddleware(
+            lambda request: StreamingHttpResponse(chunks())
+        )(request)
+        self.assertEqual(b''.join(response.streaming_content), b'replica1')
+
+    def test_replicas_are_not_migrated(self):
+        self.assertIs(router.allow_migrate('replica1', 'posts'), False)
+        self.assertIs(router.allow_migrate('default', 'posts'), True)
+
+
+class SyncReplicaTest(TransactionTestCase):
+    def test_copies_primary(self):
+        """sync_replica копирует данные основной базы в файл реплики."""
+        author = User.objects.create_user(username='test_author')
+        Post.objects.create(text='test_post', author=author)
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, 'replica.sqlite3')
+        call_command('sync_replica', to=[path], stdout=StringIO())
+        replica = sqlite3.connect(path)
+        self.addCleanup(replica.close)
+        self.assertEqual(
+            replica.execute('SELECT text FROM posts_post').fetchall(),
+            [('test_post',)]
+        )
+
+    def test_requires_replicas(self):
+        with self.assertRaises(CommandError):
+            call_command('sync_replica')
+
+
+@override_settings(DATABASE_REPLICAS=['replica1'], DATABASE_PIN_SECONDS=5)
+class LaggingReplicaTest(TransactionTestCase):
+    """Реплика скопирована до последнего поста и с тех пор отстаёт."""
+
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='test_author')
+        Post.objects.create(text='test_synced_post', author=self.author)
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, 'replica.sqlite3')
+        call_command('sync_replica', to=[path], stdout=StringIO())
+        connections.databases['replica1'] = dict(
+            connections['default'].settings_dict, NAME=path
+        )
+        self.addCleanup(self.remove_replica)
+        Post.objects.create(text='test_lagging_post', author=self.author)
+        self.url = reverse('profile', args=[self.author.username])
+
+    def remove_replica(self):
+        connections['replica1'].close()
+        del connections.databases['replica1']
+        delattr(connections._connections, 'replica1')
+
+    def test_fresh_changes_are_read_from_primary(self):
+        """Сразу после изменения страница и счётчики — из основной базы."""
+        response = Client().get(self.url)
+        self.assertContains(response, 'test_lagging_post')
+        self.assertEqual(cache.get(counters.AUTHOR_KEY.format(
+            self.author.pk
+        )), 2)
+
+    def test_counters_are_counted_on_primary(self):
+        """После окна страница читается из реплики, счётчики — нет."""
+        cache.set(fragments.MODIFIED_KEY.format(
+            fragments.profile_scope(self.author.pk)
+        ), time.time() - 60, None)
+        response = Client().get(self.url)
+        self.assertContains(response, 'test_synced_post')
+        self.assertNotContains(response, 'test_lagging_post')
+        self.assertEqual(counters.author_posts(self.author.pk), 2)
+        self.assertEqual(counters.followers_many([self.author.pk]), {
+            self.author.pk: 0
+        })
@@ -0,0 +1,85 @@
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts import fulltext
+from posts.models import Comment, Post
+
+User = get_user_model()
+
+
+class SearchViewTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.author = User.objects.create_user(username='test_author')
+
+    def search(self, query, **params):
+        response = self.client.get(reverse('search'), {'q': query, **params})
+        self.assertEqual(response.status_code, 200)
+        return response.context['page']
+
+    def test_index_is_installed(self):
+        """После миграций индекс FTS5 создан и используется."""
+        self.assertTrue(fulltext.available())
+
+    def test_finds_posts_and_comments(self):
+        """Ищутся и текст поста, и текст комментариев к нему."""
+        in_text = Post.objects.create(
+            text='Пишу про вулканы Камчатки', author=self.author
+        )
+        in_comment = Post.objects.create(text='Фото', author=self.author)
+        Comment.objects.create(
+            post=in_comment, author=self.author, text='Это вулкан? Вулканы!'
+        )
+        Post.objects.create(text='Про горы', author=self.author)
+        self.assertEqual(
+            list(self.search('вулканы')), [in_text, in_comment]
+        )
+
+    def test_index_follows_edits(self):
+        """Изменённый и удалённый текст сразу пропадает из поиска."""
+        post = Post.objects.create(text='старый текст', author=self.author)
+        post.text = 'новый текст'
+        post.save()
+        self.assertEqual(list(self.search('старый')), [])
+        self.assertEqual(list(self.search('новый')), [post])
+        post.delete()
+        self.assertEqual(list(self.search('новый')), [])
+
+    def test_query_syntax_is_escaped(self):
+        """Синтаксис FTS5 в запросе не приводит к ошибке."""
+        post = Post.objects.create(text='AND or NEAR', author=self.author)
+        for query in ('AND', 'NEAR(" or', '"*', 'text:*', '^', ''):
+            with self.subTest(query=query):
+                self.search(query)
+        self.assertEqual(list(self.search('near')), [post])
+
+    def test_keyset_pages(self):
+        """Страницы результатов не пересекаются и ведут назад."""
+        Post.objects.bulk_create(
+            Post(text=f'кот {"кот " * i}', author=self.author)
+            for i in range(settings.PER_PAGE + 3)
+        )
+        first = self.search('кот')
+        self.assertTrue(first.has_next())
+        second = self.search('кот', cursor=first.next_cursor)
+        self.assertEqual(len(second), 3)
+        self.assertFalse(second.has_next())
+        self.assertEqual(
+            {post.pk for post in [*first, *second]},
+            set(Post.objects.values_list('pk', flat=True))
+        )
+        back = self.search('кот', cursor=second.previous_cursor)
+        self.assertEqual(list(back), list(first))
+        self.assertEqual(list(self.search('кот', cursor='xx')), list(first))
+
+    def test_fallback_without_fts(self):
+        """Без FTS5 поиск выполняется подстрокой."""
+        post = Post.objects.create(text='Про вулканы', author=self.author)
+        with mock.patch.object(fulltext, 'available', return_value=False):
+            self.assertEqual(list(self.search('вулкан')), [post])
@@ -0,0 +1,135 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from posts import tasks
+from posts.models import QueuedTask
+
+CALLS_KEY = 'test:task-calls'
+
+
+@tasks.task(max_retries=2)
+def record(value, fail_times=0):
+    """Записывает вызов в кэш; первые fail_times вызовов падают."""
+    calls = cache.get(CALLS_KEY, [])
+    cache.set(CALLS_KEY, calls + [value])
+    if len(calls) < fail_times:
+        raise RuntimeError('сбой')
+
+
+def calls():
+    return cache.get(CALLS_KEY, [])
+
+
+@override_settings(TASK_BACKEND='immediate')
+class OnCommitTest(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_runs_after_commit_only(self):
+        """Задача выполняется после фиксации и не выполняется при откате."""
+        with transaction.atomic():
+            record.delay('committed')
+            self.assertEqual(calls(), [])
+        self.assertEqual(calls(), ['committed'])
+        try:
+            with transaction.atomic():
+                record.delay('rolled back')
+                raise RuntimeError
+        except RuntimeError:
+            pass
+        self.assertEqual(calls(), ['committed'])
+
+    def test_retries_and_stats(self):
+        """Упавшая задача повторяется, исходы попадают в метрики."""
+        record.delay('a', fail_times=1)
+        record.delay('b', fail_times=10)
+        self.assertEqual(calls(), ['a', 'a', 'b', 'b', 'b'])
+        values = tasks.stats()[record.name]
+        self.assertEqual(values['enqueued'], 2)
+        self.assertEqual(values['succeeded'], 1)
+        self.assertEqual(values['retried'], 3)
+        self.assertEqual(values['failed'], 1)
+
+
+class ThreadBackendTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_runs_in_pool(self):
+        """Задача выполняется в пуле потоков."""
+        backend = tasks.ThreadBackend()
+        self.addCleanup(backend.executor.shutdown)
+        future = backend.submit(record.name, ['pooled'], {}, 0)
+        self.assertEqual(future.result(timeout=10), tasks.SUCCEEDED)
+        self.assertEqual(calls(), ['pooled'])
+
+
+@override_settings(TASK_RETRY_DELAY=60)
+class DatabaseBackendTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.backend = tasks.DatabaseBackend()
+
+    def enqueue(self, value, fail_times=0):
+        self.backend.enqueue(
+            record.name, [value], {'fail_times': fail_times}
+        )
+        return QueuedTask.objects.latest('pk')
+
+    def test_success_removes_task(self):
+        """Выполненная задача удаляется из очереди."""
+        self.enqueue('ok')
+        self.assertEqual(self.backend.run_pending(), 1)
+        self.assertEqual(calls(), ['ok'])
+        self.assertFalse(QueuedTask.objects.exists())
+
+    def test_retry_is_delayed_then_fails(self):
+        """Повтор откладывается, после всех попыток задача — failed."""
+        queued = self.enqueue('x', fail_times=10)
+        self.backend.run_pending()
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, QueuedTask.QUEUED)
+        self.assertEqual(queued.attempts, 1)
+        self.assertGreater(queued.run_at, timezone.now())
+        self.assertIn('RuntimeError', queued.last_error)
+        self.assertEqual(self.backend.run_pending(), 0)
+        for _ in range(2):
+            QueuedTask.objects.update(run_at=timezone.now())
+            self.backend.run_pending()
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, QueuedTask.FAILED)
+        self.assertEqual(queued.attempts, 3)
+        self.assertEqual(calls(), ['x', 'x', 'x'])
+
+    def test_unknown_task_is_not_retried(self):
+        """Задача с неизвестным именем сразу проваливается."""
+        self.backend.enqueue('posts.tests.test_tasks.missing', [], {})
+        self.backend.run_pending()
+        self.assertEqual(
+            QueuedTask.objects.get().status, QueuedTask.FAILED
+        )
+
+    def test_stale_tasks_are_reclaimed(self):
+        """Задача упавшего воркера снова попадает в очередь."""
+        queued = self.enqueue('stale')
+        QueuedTask.objects.update(
+            status=QueuedTask.RUNNING,
+            locked_at=timezone.now() - timedelta(hours=1)
+        )
+        self.assertEqual(list(self.backend.claim(10)), [queued])
+        self.assertEqual(list(self.backend.claim(10)), [])
+
+    def test_run_worker_once(self):
+        """run_worker --once разбирает очередь и выходит."""
+        for value in ('a', 'b', 'c'):
+            self.enqueue(value)
+        out = StringIO()
+        call_command('run_worker', once=True, batch=2, stdout=out)
+        self.assertEqual(calls(), ['a', 'b', 'c'])
+        self.assertIn('Выполнено задач: 3', out.getvalue())
@@ -0,0 +1,118 @@
+import json
+import shutil
+import tempfile
+from io import StringIO
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+
+from posts import thumbnails
+from posts.models import Post
+
+User = get_user_model()
+
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x01\x00'
+    b'\x01\x00\x00\x00\x00\x21\xf9\x04'
+    b'\x01\x0a\x00\x01\x00\x2c\x00\x00'
+    b'\x00\x00\x01\x00\x01\x00\x00\x02'
+    b'\x02\x4c\x01\x00\x3b'
+)
+
+
+class ThumbnailTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        settings.MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+        cls.author = User.objects.create_user(username='test_author')
+        cls.post = Post.objects.create(
+            text='test_post',
+            author=cls.author,
+            image=SimpleUploadedFile(
+                name='small.gif',
+                content=SMALL_GIF,
+                content_type='image/gif'
+            )
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(settings.MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_placeholder_until_thumbnail_ready(self):
+        """Пока миниатюры нет, карточка выводит заглушку."""
+        self.assertIsNone(
+            thumbnails.ready_variants(ThumbnailTest.post.image)
+        )
+        response = self.client.get(reverse('index'))
+        self.assertContains(response, 'bg-light')
+        self.assertNotContains(response, '<img class="card-img"')
+
+    def test_card_shows_generated_thumbnails(self):
+        """После генерации карточка выводит srcset из всех размеров."""
+        self.client.get(reverse('index'))
+        self.assertTrue(thumbnails.generate_for_post(ThumbnailTest.post.pk))
+        variants = thumbnails.ready_variants(ThumbnailTest.post.image)
+        self.assertEqual(
+            [thumbnail.width for thumbnail in variants],
+            [480, 768, 960, 1440]
+        )
+        response = self.client.get(reverse('index'))
+        for thumbnail in variants:
+            with self.subTest(width=thumbnail.width):
+                self.assertContains(
+                    response, f'{thumbnail.url} {thumbnail.width}w'
+                )
+
+    def test_image_bytes_benchmark(self):
+        """Замер объёма картинок сравнивает одну миниатюру и srcset."""
+        out = StringIO()
+        call_command('benchmark_image_bytes', json=True, stdout=out)
+        results = json.loads(out.getvalue())
+        self.assertEqual(len(results), 4)
+        for row in results:
+            with self.subTest(viewport=row['viewport']):
+                self.assertEqual(row['posts'], 1)
+                self.assertGreater(row['bytes_before'], 0)
+
+
+class GenerateThumbnailsCommandTest(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.media_root = tempfile.mkdtemp(dir=settings.BASE_DIR)
+        self.settings_override = self.settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+        author = User.objects.create_user(username='test_author')
+        Post.objects.bulk_create([
+            Post(text='test_post', author=author, image=SimpleUploadedFile(
+                name=f'small{i}.gif',
+                content=SMALL_GIF,
+                content_type='image/gif'
+            ))
+            for i in range(3)
+        ])
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def test_backfill_generates_all_thumbnails(self):
+        """Команда создаёт миниатюры для всех постов с картинками."""
+        out = StringIO()
+        # Тестовая SQLite в памяти не ждёт снятия блокировки при
+        # параллельной записи, поэтому здесь достаточно одного потока.
+        call_command('generate_thumbnails', workers=1, stdout=out)
+        self.assertIn('Миниатюр создано: 3 из 3', out.getvalue())
+        for post in Post.objects.all():
+            with self.subTest(post=post.pk):
+                self.assertIsNotNone(thumbnails.ready_variants(post.image))
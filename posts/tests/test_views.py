@@ -4,12 +4,17 @@ import tempfile
 from django import forms
 from django.contrib.auth import get_user_model
 from django.conf import settings
-from django.test import Client, TestCase
+from django.test import (
+    Client, TestCase, TransactionTestCase, override_settings
+)
 from django.urls import reverse
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 
-from posts.models import Group, Post
+from posts import fragments
+from posts.models import Comment, Group, Post
 
 User = get_user_model()
 
@@ -90,6 +95,9 @@ class PostPagesTest(TestCase):
         super().tearDownClass()
         shutil.rmtree(settings.MEDIA_ROOT, ignore_errors=True)
 
+    def setUp(self):
+        cache.clear()
+
     def test_pages_uses_correct_template(self):
         """URL-адрес использует соответствующий шаблон."""
 
@@ -289,6 +297,9 @@ class PaginatorViewsTest(TestCase):
             3: reverse('profile', args=[cls.author.username])
         }
 
+    def setUp(self):
+        cache.clear()
+
     def test_first_page_contains_ten_records(self):
         """Paginator предоставляет ожидаемое количество постов
          на первую страницую."""
@@ -310,36 +321,310 @@ class PaginatorViewsTest(TestCase):
                 ).object_list), 3)
 
 
-class CacheViewsTest(TestCase):
+class CacheViewsTest(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='test_user')
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.author)
+        self.group = Group.objects.create(
+            title='test_group',
+            slug='test-slug',
+            description='test_description'
+        )
+        self.post = Post.objects.create(
+            text='test_post',
+            group=self.group,
+            author=self.author
+        )
+        self.urls = (
+            reverse('index'),
+            reverse('group', args=[self.group.slug]),
+            reverse('profile', args=[self.author.username])
+        )
+
+    def test_cache_index(self):
+        """Повторный запрос index отдаётся из кэша фрагментов."""
+        fragments.reset_stats()
+        response = self.authorized_client.get(reverse('index'))
+        response_cached = self.authorized_client.get(reverse('index'))
+        self.assertEqual(response_cached.content, response.content)
+        self.assertEqual(
+            fragments.stats()['index'], {'hits': 1, 'misses': 1}
+        )
+
+    def test_new_post_appears_immediately(self):
+        """Новый пост сразу появляется в закэшированных лентах."""
+        for url in self.urls:
+            self.authorized_client.get(url)
+        Post.objects.create(
+            text='test_new_post',
+            group=self.group,
+            author=self.author
+        )
+        for url in self.urls:
+            with self.subTest(url=url):
+                response = self.authorized_client.get(url)
+                self.assertContains(response, 'test_new_post')
+
+    def test_edit_and_comment_invalidate_cache(self):
+        """Правка поста и комментарий сбрасывают кэш лент."""
+        for url in self.urls:
+            self.authorized_client.get(url)
+        self.post.text = 'test_edited_post'
+        self.post.save()
+        Comment.objects.create(
+            post=self.post,
+            author=self.author,
+            text='test_comment'
+        )
+        for url in self.urls:
+            with self.subTest(url=url):
+                response = self.authorized_client.get(url)
+                self.assertContains(response, 'test_edited_post')
+                self.assertContains(response, 'Комментариев: 1')
+
+    def test_group_change_invalidates_cache(self):
+        """Изменение группы сбрасывает кэш её ленты."""
+        url = reverse('group', args=[self.group.slug])
+        self.authorized_client.get(url)
+        self.group.description = 'test_new_description'
+        self.group.save()
+        response = self.authorized_client.get(url)
+        self.assertContains(response, 'test_new_description')
+
+
+class FeedQueriesTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='test_user')
+        cls.group = Group.objects.create(
+            title='test_group',
+            slug='test-slug',
+            description='test_description'
+        )
+        for i in range(12):
+            post = Post.objects.create(
+                text=f'test_post{i}',
+                group=cls.group,
+                author=cls.author
+            )
+            Comment.objects.create(
+                post=post,
+                author=cls.author,
+                text=f'test_comment{i}'
+            )
+        cls.urls = (
+            reverse('index'),
+            reverse('group', args=[cls.group.slug]),
+            reverse('profile', args=[cls.author.username])
+        )
+
+    def count_queries(self, url, per_page):
+        cache.clear()
+        with self.settings(PER_PAGE=per_page):
+            with CaptureQueriesContext(connection) as queries:
+                self.client.get(url)
+        return len(queries)
+
+    def test_feed_queries_do_not_grow_with_page_size(self):
+        """Число запросов ленты не зависит от размера страницы."""
+        for url in FeedQueriesTest.urls:
+            with self.subTest(url=url):
+                self.assertEqual(
+                    self.count_queries(url, 2),
+                    self.count_queries(url, 10)
+                )
+
+    def test_feed_shows_annotated_comment_count(self):
+        """Карточка поста выводит число комментариев из аннотации."""
+        cache.clear()
+        response = self.client.get(reverse('index'))
+        post = response.context.get('page').object_list[0]
+        self.assertEqual(post.comment_count, 1)
+        self.assertContains(response, 'Комментариев: 1')
+
+
+@override_settings(FEED_PAGINATION={
+    'index': 'cursor',
+    'group': 'cursor',
+    'profile': 'cursor'
+})
+class KeysetPaginatorViewsTest(TestCase):
     @classmethod
     def setUpClass(cls):
         super().setUpClass()
         cls.author = User.objects.create_user(username='test_user')
-        cls.authorized_client = Client()
-        cls.authorized_client.force_login(cls.author)
         cls.group = Group.objects.create(
             title='test_group',
             slug='test-slug',
             description='test_description'
         )
+        for i in range(13):
+            Post.objects.create(
+                text=f'test_post{i}',
+                group=cls.group,
+                author=cls.author
+            )
+        cls.urls = (
+            reverse('index'),
+            reverse('group', args=[cls.group.slug]),
+            reverse('profile', args=[cls.author.username])
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_cursor_pages(self):
+        """Курсор ведёт на следующую страницу и обратно."""
+        for url in KeysetPaginatorViewsTest.urls:
+            with self.subTest(url=url):
+                first = self.client.get(url).context.get('page')
+                self.assertEqual(len(first.object_list), 10)
+                self.assertFalse(first.has_previous())
+                second = self.client.get(
+                    url, {'cursor': first.next_cursor}
+                ).context.get('page')
+                self.assertEqual(len(second.object_list), 3)
+                self.assertFalse(second.has_next())
+                back = self.client.get(
+                    url, {'cursor': second.previous_cursor}
+                ).context.get('page')
+                self.assertEqual(back.object_list, first.object_list)
+                self.assertFalse(back.has_previous())
+
+    def test_cursor_pages_skip_count_and_offset(self):
+        """Страница по курсору не выполняет COUNT(*) и OFFSET."""
+        first = self.client.get(reverse('index')).context.get('page')
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse('index'), {'cursor': first.next_cursor})
+        for query in queries.captured_queries:
+            with self.subTest(sql=query['sql']):
+                self.assertNotIn('COUNT(*)', query['sql'])
+                self.assertNotIn('OFFSET', query['sql'])
+
+    def test_page_urls_still_work(self):
+        """Ссылки ?page= продолжают работать в режиме курсора."""
+        response = self.client.get(reverse('index'), {'page': 2})
+        self.assertEqual(len(response.context.get('page').object_list), 3)
+
+    def test_broken_cursor_returns_first_page(self):
+        """Испорченный курсор открывает первую страницу."""
+        response = self.client.get(reverse('index'), {'cursor': 'broken'})
+        page = response.context.get('page')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(page.has_previous())
+        self.assertEqual(len(page.object_list), 10)
+
+
+class PostCardCacheTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='test_author')
+        cls.auth_author_client = Client()
+        cls.auth_author_client.force_login(cls.author)
         cls.post = Post.objects.create(
             text='test_post',
-            group=cls.group,
             author=cls.author
         )
 
-    def test_cache_index(self):
-        """Проверка хранения и очищения кэша для index."""
-        response = CacheViewsTest.authorized_client.get(reverse('index'))
-        posts = response.content
-        Post.objects.create(
-            text='test_new_post',
-            author=CacheViewsTest.author,
+    def setUp(self):
+        cache.clear()
+
+    def test_cached_cards_are_not_rendered_again(self):
+        """Карточка из кэша не рендерится повторно в другой ленте."""
+        response = self.client.get(reverse('index'))
+        self.assertTemplateUsed(response, 'includes/post_card.html')
+        response = self.client.get(
+            reverse('profile', args=[PostCardCacheTest.author.username])
         )
-        response_old = CacheViewsTest.authorized_client.get(reverse('index'))
-        old_posts = response_old.content
-        self.assertEqual(old_posts, posts, 'Не возвращает кэшированную страницу.')
+        self.assertTemplateNotUsed(response, 'includes/post_card.html')
+        self.assertContains(response, 'test_post')
+
+    def test_edit_button_rendered_outside_card_cache(self):
+        """Кнопка редактирования видна только автору при общей карточке."""
+        response = self.client.get(reverse('index'))
+        self.assertNotContains(response, 'Редактировать')
+        response = PostCardCacheTest.auth_author_client.get(reverse('index'))
+        self.assertTemplateNotUsed(response, 'includes/post_card.html')
+        self.assertContains(response, 'Редактировать')
+
+    def test_edited_post_gets_new_card(self):
+        """После правки поста карточка рендерится заново."""
+        self.client.get(reverse('index'))
+        post = Post.objects.get(pk=PostCardCacheTest.post.pk)
+        post.text = 'test_edited_post'
+        post.save()
+        fragments.bump(fragments.index_scope())
+        response = self.client.get(reverse('index'))
+        self.assertTemplateUsed(response, 'includes/post_card.html')
+        self.assertContains(response, 'test_edited_post')
+
+
+class CommentPaginationTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='test_author')
+        cls.post = Post.objects.create(text='test_post', author=cls.author)
+        Comment.objects.bulk_create(
+            Comment(
+                post=cls.post,
+                author=User.objects.create_user(username=f'commenter{i}'),
+                text=f'test_comment{i}'
+            )
+            for i in range(settings.COMMENTS_PER_PAGE + 5)
+        )
+        cls.post_url = reverse(
+            'post', args=[cls.author.username, cls.post.id]
+        )
+
+    def setUp(self):
         cache.clear()
-        response_new = CacheViewsTest.authorized_client.get(reverse('index'))
-        new_posts = response_new.content
-        self.assertNotEqual(old_posts, new_posts, 'Нет сброса кэша.')
+
+    def test_post_page_shows_first_comments(self):
+        """Страница поста выводит только первую страницу комментариев."""
+        response = self.client.get(self.post_url)
+        comments = response.context['comments']
+        self.assertEqual(len(comments), settings.COMMENTS_PER_PAGE)
+        self.assertTrue(comments.has_next())
+        self.assertContains(response, 'js-more-comments')
+
+    def test_more_comments_fragment(self):
+        """Фрагмент по курсору отдаёт оставшиеся комментарии."""
+        first = self.client.get(self.post_url).context['comments']
+        url = reverse(
+            'post_comments', args=[self.author.username, self.post.id]
+        )
+        response = self.client.get(url, {'cursor': first.next_cursor})
+        rest = response.context['comments']
+        self.assertEqual(len(rest), 5)
+        self.assertFalse(rest.has_next())
+        self.assertNotContains(response, 'js-more-comments')
+        self.assertNotContains(response, '<html')
+        self.assertFalse(
+            {item.pk for item in first} & {item.pk for item in rest}
+        )
+
+    def test_fragment_of_unknown_post(self):
+        """Фрагмент чужого или несуществующего поста — 404."""
+        response = self.client.get(
+            reverse('post_comments', args=['nobody', self.post.id])
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_comment_authors_loaded_with_comments(self):
+        """Число запросов страницы поста не зависит от числа авторов."""
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(self.post_url)
+        comment_queries = [
+            query['sql'] for query in queries
+            if 'FROM "posts_comment"' in query['sql']
+            and 'COUNT' not in query['sql']
+        ]
+        self.assertEqual(len(comment_queries), 1)
+        self.assertIn('INNER JOIN "auth_user"', comment_queries[0])
+        self.assertNotIn('OFFSET', comment_queries[0])
@@ -0,0 +1,35 @@
+from django.conf import settings
+from django.template import engines
+from django.test import SimpleTestCase, override_settings
+
+from posts import warmup
+
+CACHED_TEMPLATES = [{
+    **settings.TEMPLATES[0],
+    'OPTIONS': {
+        **settings.TEMPLATES[0]['OPTIONS'],
+        'loaders': [(
+            'django.template.loaders.cached.Loader',
+            settings.TEMPLATE_LOADERS,
+        )],
+    },
+}]
+
+
+@override_settings(TEMPLATES=CACHED_TEMPLATES)
+class WarmupTest(SimpleTestCase):
+    def test_project_templates_only(self):
+        """Прогреваются шаблоны проекта, но не шаблоны админки."""
+        names = warmup.template_names(engines['django'])
+        self.assertIn('base.html', names)
+        self.assertIn('includes/comment_list.html', names)
+        self.assertFalse(any(name.startswith('admin/') for name in names))
+
+    def test_templates_are_cached(self):
+        """После прогрева кэширующий загрузчик не разбирает шаблоны снова."""
+        engine = engines['django']
+        compiled, errors, _ = warmup.warm_templates()
+        self.assertEqual(errors, [])
+        self.assertEqual(compiled, len(warmup.template_names(engine)))
+        loader = engine.engine.template_loaders[0]
+        self.assertIn('base.html', loader.get_template_cache)
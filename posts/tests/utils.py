@@ -0,0 +1,53 @@
+from contextlib import ContextDecorator
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+# Наибольшее число SQL-запросов на один запрос к странице с пустым кэшем
+# от авторизованного пользователя (сессия и пользователь — два запроса).
+# Не должно зависеть от числа постов и комментариев. Группа, профиль
+# и пост тратят ещё один запрос на ETag (posts.conditional).
+QUERY_BUDGETS = {
+    'index': 4,
+    'group': 6,
+    'profile': 9,
+    'post': 8,
+    'post_edit': 8,
+    'add_comment': 6,
+    'api_posts': 3,
+    'api_comments': 4,
+}
+
+
+class QueryBudget(ContextDecorator):
+    """
+    Проверяет, что код внутри выполнил не больше запросов к базе,
+    чем разрешено странице url_name в QUERY_BUDGETS.
+
+    Используется как контекстный менеджер или декоратор теста.
+    """
+
+    def __init__(self, url_name, budget=None):
+        self.url_name = url_name
+        self.budget = QUERY_BUDGETS[url_name] if budget is None else budget
+
+    def __enter__(self):
+        self.queries = CaptureQueriesContext(connection)
+        self.queries.__enter__()
+        return self.queries
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.queries.__exit__(exc_type, exc_value, traceback)
+        if exc_type is not None:
+            return False
+        executed = len(self.queries)
+        if executed > self.budget:
+            sql = '\n'.join(
+                f'{number}. {query["sql"]}'
+                for number, query in enumerate(self.queries, 1)
+            )
+            raise AssertionError(
+                f'Страница {self.url_name}: {executed} запросов к базе '
+                f'при бюджете {self.budget}:\n{sql}'
+            )
+        return False
@@ -0,0 +1,163 @@
+import logging
+
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+from sorl.thumbnail import default
+from sorl.thumbnail.base import ThumbnailBackend
+from sorl.thumbnail.conf import defaults as default_settings
+from sorl.thumbnail.conf import settings as thumbnail_settings
+from sorl.thumbnail.images import ImageFile
+
+from . import fragments, tasks
+from .models import Post
+
+logger = logging.getLogger(__name__)
+
+
+class PostThumbnailBackend(ThumbnailBackend):
+    """
+    Бэкенд sorl-thumbnail, который умеет искать миниатюры без их
+    создания и создавать несколько размеров за одно декодирование.
+    """
+
+    def _thumbnail_file(self, source, geometry_string, options):
+        options = dict(options)
+        if thumbnail_settings.THUMBNAIL_PRESERVE_FORMAT:
+            options.setdefault('format', self._get_format(source))
+        for key, value in self.default_options.items():
+            options.setdefault(key, value)
+        for key, attr in self.extra_options:
+            value = getattr(thumbnail_settings, attr)
+            if value != getattr(default_settings, attr):
+                options.setdefault(key, value)
+        name = self._get_thumbnail_filename(source, geometry_string, options)
+        return ImageFile(name, default.storage), options
+
+    def get_ready_thumbnail(self, file_, geometry_string, **options):
+        """Возвращает готовую миниатюру или None, ничего не генерируя."""
+        thumbnail, _ = self._thumbnail_file(
+            ImageFile(file_), geometry_string, options
+        )
+        return default.kvstore.get(thumbnail)
+
+    def get_thumbnails(self, file_, geometries, **options):
+        """
+        Возвращает миниатюры всех размеров geometries.
+
+        Исходная картинка декодируется один раз, и только если
+        какой-то из размеров ещё не создан.
+        """
+        source = ImageFile(file_)
+        thumbnails, missing = [], []
+        for geometry_string in geometries:
+            thumbnail, thumbnail_options = self._thumbnail_file(
+                source, geometry_string, options
+            )
+            cached = default.kvstore.get(thumbnail)
+            thumbnails.append(cached or thumbnail)
+            if not cached:
+                missing.append((geometry_string, thumbnail_options, thumbnail))
+        if not missing:
+            return thumbnails
+        source_image = default.engine.get_image(source)
+        try:
+            image_info = default.engine.get_image_info(source_image)
+            source.set_size(default.engine.get_image_size(source_image))
+            for geometry_string, thumbnail_options, thumbnail in missing:
+                thumbnail_options['image_info'] = image_info
+                self._create_thumbnail(
+                    source_image, geometry_string, thumbnail_options,
+                    thumbnail
+                )
+        finally:
+            default.engine.cleanup(source_image)
+        default.kvstore.get_or_set(source)
+        for _, _, thumbnail in missing:
+            default.kvstore.set(thumbnail, source)
+        return thumbnails
+
+
+backend = PostThumbnailBackend()
+
+
+def ready_variants(image):
+    """
+    Готовые размеры миниатюры картинки поста от меньшего к большему
+    или None, если хотя бы один ещё не создан.
+    """
+    variants = []
+    for geometry in settings.POST_IMAGE_VARIANTS:
+        thumbnail = backend.get_ready_thumbnail(
+            image, geometry, **settings.POST_THUMBNAIL_OPTIONS
+        )
+        if thumbnail is None:
+            return None
+        variants.append(thumbnail)
+    return sorted(variants, key=lambda thumbnail: thumbnail.width)
+
+
+def srcset(image):
+    """
+    Атрибуты src, srcset и sizes для картинки поста или None,
+    пока миниатюры создаются.
+    """
+    variants = ready_variants(image)
+    if variants is None:
+        return None
+    default_width = int(settings.POST_THUMBNAIL_GEOMETRY.split('x')[0])
+    src = next(
+        (thumbnail for thumbnail in variants
+         if thumbnail.width >= default_width),
+        variants[-1]
+    )
+    return {
+        'src': src.url,
+        'srcset': ', '.join(
+            f'{thumbnail.url} {thumbnail.width}w' for thumbnail in variants
+        ),
+        'sizes': settings.POST_IMAGE_SIZES,
+    }
+
+
+def generate(image):
+    """Создаёт все размеры миниатюры из settings.POST_IMAGE_VARIANTS."""
+    return backend.get_thumbnails(
+        image,
+        settings.POST_IMAGE_VARIANTS,
+        **settings.POST_THUMBNAIL_OPTIONS
+    )
+
+
+def generate_for_post(post_id):
+    """
+    Генерирует миниатюры поста и сбрасывает закэшированные карточки.
+
+    Пока миниатюры нет, карточка выводит заглушку, поэтому после
+    генерации обновляется Post.updated (входит в ключ карточки)
+    и версии лент, где выводится пост.
+    """
+    post = Post.objects.filter(pk=post_id).first()
+    if post is None or not post.image:
+        return False
+    generate(post.image)
+    Post.objects.filter(pk=post_id).update(updated=timezone.now())
+    fragments.bump(*fragments.post_scopes(post))
+    return True
+
+
+def run(post_id):
+    """Для пула generate_thumbnails: ошибки в лог, соединение закрыть."""
+    try:
+        return generate_for_post(post_id)
+    except Exception:
+        logger.exception('Не удалось создать миниатюру поста %s', post_id)
+        return False
+    finally:
+        connection.close()
+
+
+@tasks.task()
+def generate_post_thumbnails(post_id):
+    """Фоновая задача: миниатюры загруженной картинки поста."""
+    generate_for_post(post_id)
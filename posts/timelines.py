@@ -0,0 +1,159 @@
+from django.conf import settings
+from django.db.models import F, Q
+
+from . import counters, tasks
+from .models import Follow, Post, TimelineEntry
+
+BATCH_SIZE = 500
+
+
+def is_popular(author_id):
+    """
+    Популярному автору посты не раскладываются по лентам подписчиков,
+    а подмешиваются при чтении (fan-out-on-read).
+    """
+    return counters.followers(author_id) > settings.FANOUT_MAX_FOLLOWERS
+
+
+def _add_entries(entries):
+    TimelineEntry.objects.bulk_create(
+        entries, batch_size=BATCH_SIZE, ignore_conflicts=True
+    )
+
+
+def fan_out(post):
+    """Раскладывает новый пост по лентам подписчиков автора."""
+    if is_popular(post.author_id):
+        return 0
+    follower_ids = Follow.objects.filter(
+        author_id=post.author_id
+    ).values_list('user_id', flat=True).iterator(chunk_size=BATCH_SIZE)
+    entries = [
+        TimelineEntry(user_id=user_id, post=post, pub_date=post.pub_date)
+        for user_id in follower_ids
+    ]
+    _add_entries(entries)
+    return len(entries)
+
+
+@tasks.task()
+def fan_out_post(post_id):
+    """Фоновая задача: fan_out для опубликованного поста."""
+    post = Post.objects.filter(pk=post_id).only(
+        'id', 'author_id', 'pub_date'
+    ).first()
+    if post is None:
+        return 0
+    return fan_out(post)
+
+
+def _recent_posts(author_id):
+    return list(Post.objects.filter(author_id=author_id).order_by(
+        '-pub_date', '-id'
+    ).values_list('id', 'pub_date')[:settings.TIMELINE_BACKFILL])
+
+
+def follow(user, author):
+    """
+    Подписывает user на author и добавляет в его ленту
+    последние settings.TIMELINE_BACKFILL постов автора.
+
+    Посты добавляются и для популярного автора: если подписчиков
+    станет меньше порога, лента читается только из TimelineEntry.
+    """
+    _, created = Follow.objects.get_or_create(user=user, author=author)
+    if not created:
+        return created
+    _add_entries([
+        TimelineEntry(user=user, post_id=post_id, pub_date=pub_date)
+        for post_id, pub_date in _recent_posts(author.id)
+    ])
+    return created
+
+
+@tasks.task()
+def backfill_followers(author_id):
+    """
+    Фоновая задача: добавляет последние settings.TIMELINE_BACKFILL
+    постов автора в ленты всех его подписчиков.
+    """
+    posts = _recent_posts(author_id)
+    follower_ids = Follow.objects.filter(
+        author_id=author_id
+    ).values_list('user_id', flat=True).iterator(chunk_size=BATCH_SIZE)
+    entries = []
+    for user_id in follower_ids:
+        entries.extend(
+            TimelineEntry(user_id=user_id, post_id=post_id, pub_date=pub_date)
+            for post_id, pub_date in posts
+        )
+        if len(entries) >= BATCH_SIZE:
+            _add_entries(entries)
+            entries = []
+    _add_entries(entries)
+
+
+def follower_removed(author_id, followers):
+    """
+    Вызывается после отписки; followers — оставшееся число подписчиков.
+
+    Пока автор был популярным, его посты не раскладывались по лентам.
+    Когда подписчиков становится ровно settings.FANOUT_MAX_FOLLOWERS,
+    лента снова читается из TimelineEntry, поэтому пропущенные посты
+    добавляются в ленты подписчиков.
+    """
+    if followers is None:
+        followers = counters.followers(author_id)
+    if followers == settings.FANOUT_MAX_FOLLOWERS:
+        backfill_followers.delay(author_id)
+
+
+def unfollow(user, author):
+    deleted, _ = Follow.objects.filter(user=user, author=author).delete()
+    TimelineEntry.objects.filter(user=user, post__author=author).delete()
+    return bool(deleted)
+
+
+def _popular_followed(user):
+    author_ids = list(
+        Follow.objects.filter(user=user).values_list('author_id', flat=True)
+    )
+    return [
+        author_id
+        for author_id, total in counters.followers_many(author_ids).items()
+        if total > settings.FANOUT_MAX_FOLLOWERS
+    ]
+
+
+def _popular_filter(user, popular):
+    entries = TimelineEntry.objects.filter(user=user).values('post_id')
+    return Q(pk__in=entries) | Q(author_id__in=popular)
+
+
+def feed(user):
+    """
+    Посты персональной ленты user.
+
+    Обычно это чтение диапазона индекса (user, pub_date) ленты;
+    посты популярных авторов выбираются напрямую из Post.
+    """
+    popular = _popular_followed(user)
+    if not popular:
+        return Post.objects.for_feed().filter(
+            timeline_entries__user=user
+        ).order_by(
+            '-timeline_entries__pub_date',
+            # Строка ордеринга через связь добавила бы сортировку Post.
+            F('timeline_entries__post').desc()
+        )
+    return Post.objects.for_feed().filter(
+        _popular_filter(user, popular)
+    ).order_by('-pub_date', '-id')
+
+
+def feed_count(user):
+    """Число постов персональной ленты без подзапросов ленты."""
+    popular = _popular_followed(user)
+    if not popular:
+        return TimelineEntry.objects.filter(user=user).count()
+    return Post.objects.filter(_popular_filter(user, popular)).count()
@@ -0,0 +1,92 @@
+import io
+import os
+
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile, UploadedFile
+from django.core.files.uploadhandler import FileUploadHandler
+from PIL import Image, ImageOps
+
+EXTENSIONS = {
+    'JPEG': 'jpg',
+    'WEBP': 'webp',
+    'PNG': 'png',
+}
+
+
+class OversizedUploadedFile(UploadedFile):
+    """Заглушка вместо файла, превысившего допустимый размер."""
+
+    def __init__(self, name, content_type, size, charset,
+                 content_type_extra=None):
+        super().__init__(
+            io.BytesIO(), name, content_type, size, charset,
+            content_type_extra
+        )
+
+
+class SizeLimitUploadHandler(FileUploadHandler):
+    """
+    Перестаёт принимать файл, как только он превысил
+    settings.POST_IMAGE_MAX_UPLOAD_SIZE.
+
+    Стоит первым в FILE_UPLOAD_HANDLERS: лишние куски не доходят
+    до следующих обработчиков и не пишутся на диск, а вместо файла
+    форма получает OversizedUploadedFile с настоящим размером.
+    """
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.received = 0
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received > settings.POST_IMAGE_MAX_UPLOAD_SIZE:
+            return None
+        return raw_data
+
+    def file_complete(self, file_size):
+        if self.received <= settings.POST_IMAGE_MAX_UPLOAD_SIZE:
+            return None
+        return OversizedUploadedFile(
+            self.file_name, self.content_type, self.received, self.charset,
+            self.content_type_extra
+        )
+
+
+def normalize_image(uploaded):
+    """
+    Пересохраняет загруженную картинку в мастер-копию ограниченного
+    размера без EXIF.
+
+    JPEG декодируется сразу в уменьшенном виде (draft), крупные
+    картинки сначала сжимаются в целое число раз (reduce),
+    и только потом точно вписываются в POST_IMAGE_MAX_SIDE.
+    """
+    max_side = settings.POST_IMAGE_MAX_SIDE
+    image_format = settings.POST_IMAGE_FORMAT
+    uploaded.seek(0)
+    with Image.open(uploaded) as source:
+        source.draft('RGB', (max_side, max_side))
+        image = ImageOps.exif_transpose(source)
+    factor = max(image.size) // max_side
+    if factor > 1:
+        image = image.reduce(factor)
+    image.thumbnail((max_side, max_side), Image.LANCZOS)
+    if image.mode not in ('RGB', 'L'):
+        image = image.convert('RGBA')
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        background.paste(image, mask=image.split()[-1])
+        image = background
+    buffer = io.BytesIO()
+    image.save(
+        buffer,
+        format=image_format,
+        quality=settings.POST_IMAGE_QUALITY,
+        optimize=True
+    )
+    stem = os.path.splitext(os.path.basename(uploaded.name))[0]
+    return SimpleUploadedFile(
+        f'{stem}.{EXTENSIONS[image_format]}',
+        buffer.getvalue(),
+        content_type=Image.MIME[image_format]
+    )
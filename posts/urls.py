@@ -1,6 +1,6 @@
 from django.urls import path
 
-from . import views
+from . import api, feeds, views
 
 urlpatterns = [
     path('', views.index, name='index'),
@@ -10,8 +10,54 @@ urlpatterns = [
         name='group'
     ),
     path('new/', views.new_post, name='new_post'),
+    path('follow/', views.follow_index, name='follow_index'),
+    path('search/', views.search, name='search'),
+    path('feeds/<str:fmt>/', feeds.index_feed, name='index_feed'),
+    path(
+        'feeds/<str:fmt>/group/<slug:slug>/',
+        feeds.group_feed,
+        name='group_feed'
+    ),
+    path(
+        'feeds/<str:fmt>/author/<str:username>/',
+        feeds.profile_feed,
+        name='profile_feed'
+    ),
+    path('api/posts/', api.posts, name='api_posts'),
+    path('api/posts/<int:post_id>/', api.post, name='api_post'),
+    path(
+        'api/posts/<int:post_id>/comments/',
+        api.comments,
+        name='api_comments'
+    ),
+    path('api/groups/', api.groups, name='api_groups'),
+    path(
+        'api/groups/<slug:slug>/posts/',
+        api.group_posts,
+        name='api_group_posts'
+    ),
+    path(
+        'api/users/<str:username>/posts/',
+        api.profile_posts,
+        name='api_profile_posts'
+    ),
     path('<str:username>/', views.profile, name='profile'),
+    path(
+        '<str:username>/follow/',
+        views.profile_follow,
+        name='profile_follow'
+    ),
+    path(
+        '<str:username>/unfollow/',
+        views.profile_unfollow,
+        name='profile_unfollow'
+    ),
     path('<str:username>/<int:post_id>/', views.post_view, name='post'),
+    path(
+        '<str:username>/<int:post_id>/comments/',
+        views.post_comments,
+        name='post_comments'
+    ),
     path(
         '<str:username>/<int:post_id>/edit/',
         views.post_edit,
@@ -1,35 +1,66 @@
+from functools import partial
+from urllib.parse import urlencode
+
 from django.contrib.auth.decorators import login_required
-from django.core.paginator import Paginator
 from django.shortcuts import get_object_or_404, redirect, render
 
-from yatube import settings
-
+from . import conditional, counters, fragments, fulltext, timelines
 from .forms import PostForm, CommentForm
-from .models import Group, Post, User, Comment
+from .models import Follow, Group, Post, User
+from .paginators import paginate, paginate_comments
 
 
+@conditional.conditional_page(conditional.index_page)
 def index(request):
-    post_list = Post.objects.all()
-    paginator = Paginator(post_list, settings.PER_PAGE)
-    page_number = request.GET.get('page')
-    page = paginator.get_page(page_number)
+    post_list = Post.objects.for_feed()
+    paginator, page = paginate(
+        request, post_list, 'index', count=counters.total_posts
+    )
     return render(
         request,
         'index.html',
-        {'page': page, 'paginator': paginator}
+        {
+            'page': page,
+            'paginator': paginator,
+            'cache_scope': fragments.index_scope()
+        }
     )
 
 
+@conditional.conditional_page(conditional.group_page)
 def group_posts(request, slug):
     group = get_object_or_404(Group, slug=slug)
-    group_list = group.posts.all()
-    paginator = Paginator(group_list, settings.PER_PAGE)
-    page_number = request.GET.get('page')
-    page = paginator.get_page(page_number)
+    group_list = group.posts.for_feed()
+    paginator, page = paginate(
+        request,
+        group_list,
+        'group',
+        count=partial(counters.group_posts, group.id)
+    )
     return render(
         request,
         'group.html',
-        {'group': group, 'page': page, 'paginator': paginator}
+        {
+            'group': group,
+            'page': page,
+            'paginator': paginator,
+            'cache_scope': fragments.group_scope(group.id)
+        }
+    )
+
+
+def search(request):
+    query = request.GET.get('q', '')
+    paginator, page = fulltext.paginate(request, query)
+    return render(
+        request,
+        'search.html',
+        {
+            'query': query,
+            'page': page,
+            'paginator': paginator,
+            'page_query': urlencode({'q': query}) + '&'
+        }
     )
 
 
@@ -52,20 +83,62 @@ def new_post(request):
     )
 
 
+@conditional.conditional_page(conditional.profile_page)
 def profile(request, username):
     author = get_object_or_404(User, username=username)
-    author_posts = author.posts.all()
-    count = author_posts.count()
-    paginator = Paginator(author_posts, settings.PER_PAGE)
-    page_number = request.GET.get('page')
-    page = paginator.get_page(page_number)
+    count = counters.author_posts(author.id)
+    paginator, page = paginate(
+        request, author.posts.for_feed(), 'profile', count=count
+    )
+    following = request.user.is_authenticated and Follow.objects.filter(
+        user=request.user, author=author
+    ).exists()
     return render(
         request,
         'profile.html',
-        {'page': page, 'count': count, 'author': author}
+        {
+            'page': page,
+            'count': count,
+            'author': author,
+            'following': following,
+            'followers_count': counters.followers(author.id),
+            'following_count': counters.following(author.id),
+            'cache_scope': fragments.profile_scope(author.id)
+        }
+    )
+
+
+@login_required
+def follow_index(request):
+    post_list = timelines.feed(request.user)
+    paginator, page = paginate(
+        request,
+        post_list,
+        'follow',
+        count=partial(timelines.feed_count, request.user)
+    )
+    return render(
+        request,
+        'follow.html',
+        {'page': page, 'paginator': paginator}
     )
 
 
+@login_required
+def profile_follow(request, username):
+    author = get_object_or_404(User, username=username)
+    if author != request.user:
+        timelines.follow(request.user, author)
+    return redirect('profile', username=username)
+
+
+@login_required
+def profile_unfollow(request, username):
+    author = get_object_or_404(User, username=username)
+    timelines.unfollow(request.user, author)
+    return redirect('profile', username=username)
+
+
 @login_required
 def add_comment(request, post_id, username):
     post = get_object_or_404(Post, id=post_id, author__username=username)
@@ -90,12 +163,16 @@ def add_comment(request, post_id, username):
     )
 
 
+@conditional.conditional_page(conditional.post_page)
 def post_view(request, username, post_id):
-    post = get_object_or_404(Post, id=post_id, author__username=username)
+    post = get_object_or_404(
+        Post.objects.for_feed(),
+        id=post_id,
+        author__username=username
+    )
     form = CommentForm()
-    author_posts = post.author.posts.all()
-    count = author_posts.count()
-    comments = post.comments.all()
+    count = counters.author_posts(post.author_id)
+    comments = paginate_comments(request, post.id)
     return render(
         request,
         'post.html',
@@ -103,12 +180,29 @@ def post_view(request, username, post_id):
             'author': post.author,
             'post': post,
             'count': count,
+            'followers_count': counters.followers(post.author_id),
+            'following_count': counters.following(post.author_id),
             'comments': comments,
             'form': form
         }
     )
 
 
+def post_comments(request, username, post_id):
+    post = get_object_or_404(
+        Post.objects.select_related('author').only(
+            'id', 'author__username'
+        ),
+        id=post_id,
+        author__username=username
+    )
+    return render(
+        request,
+        'includes/comment_list.html',
+        {'post': post, 'comments': paginate_comments(request, post.id)}
+    )
+
+
 @login_required
 def post_edit(request, username, post_id):
     post = get_object_or_404(Post, author__username=username, id=post_id)
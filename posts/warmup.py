@@ -0,0 +1,73 @@
+import logging
+import os
+import time
+
+from django.conf import settings
+from django.template import TemplateSyntaxError, engines
+from django.template.backends.django import DjangoTemplates
+
+logger = logging.getLogger(__name__)
+
+EXTENSIONS = ('.html', '.txt')
+
+
+def _loader_dirs(loaders):
+    for loader in loaders:
+        if hasattr(loader, 'loaders'):
+            yield from _loader_dirs(loader.loaders)
+        elif hasattr(loader, 'get_dirs'):
+            yield from loader.get_dirs()
+
+
+def template_names(engine):
+    """
+    Имена шаблонов проекта: файлы из каталогов загрузчиков внутри
+    BASE_DIR. Шаблоны сторонних пакетов (админки) не прогреваются.
+    """
+    root = os.path.abspath(settings.BASE_DIR)
+    names = set()
+    for directory in _loader_dirs(engine.engine.template_loaders):
+        directory = os.path.abspath(str(directory))
+        if not directory.startswith(root + os.sep):
+            continue
+        for path, _, files in os.walk(directory):
+            for file_name in files:
+                if file_name.endswith(EXTENSIONS):
+                    names.add(os.path.relpath(
+                        os.path.join(path, file_name), directory
+                    ).replace(os.sep, '/'))
+    return sorted(names)
+
+
+def warm_templates():
+    """
+    Компилирует все шаблоны проекта, чтобы кэширующий загрузчик
+    не разбирал их на первых запросах.
+
+    Возвращает (число шаблонов, список (имя, ошибка), секунды).
+    """
+    started = time.monotonic()
+    compiled, errors = 0, []
+    for engine in engines.all():
+        if not isinstance(engine, DjangoTemplates):
+            continue
+        for name in template_names(engine):
+            try:
+                engine.get_template(name)
+            except TemplateSyntaxError as error:
+                errors.append((name, error))
+            else:
+                compiled += 1
+    return compiled, errors, time.monotonic() - started
+
+
+def warm_up():
+    """Прогрев при старте воркера: ошибки пишутся в лог, не мешая старту."""
+    try:
+        compiled, errors, elapsed = warm_templates()
+    except Exception:
+        logger.exception('Не удалось прогреть шаблоны')
+        return
+    for name, error in errors:
+        logger.error('Ошибка в шаблоне %s: %s', name, error)
+    logger.info('Прогрето шаблонов: %s за %.3f с', compiled, elapsed)
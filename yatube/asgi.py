@@ -0,0 +1,126 @@
+"""
+ASGI config for yatube project.
+
+Django 2.2 has no ASGI handler and no async views, so the WSGI
+application is adapted here: the event loop accepts connections and
+reads request bodies, and every request runs the synchronous Django
+handler in a thread pool of YATUBE_ASGI_THREADS threads. The response
+is passed back to the loop chunk by chunk, so streaming responses stay
+streamed. Run it with any ASGI server:
+
+    uvicorn yatube.asgi:application
+
+Compare it with the WSGI entry point with ./manage.py benchmark_http.
+"""
+
+import asyncio
+import io
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from yatube.wsgi import application as wsgi_application
+
+executor = ThreadPoolExecutor(
+    int(os.environ.get('YATUBE_ASGI_THREADS', 32)),
+    thread_name_prefix='asgi'
+)
+
+
+def build_environ(scope, body):
+    server_name, server_port = scope.get('server') or ('localhost', 80)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', ''),
+        'PATH_INFO': scope['path'].encode().decode('latin-1'),
+        'QUERY_STRING': scope['query_string'].decode('latin-1'),
+        'SERVER_NAME': server_name,
+        'SERVER_PORT': str(server_port),
+        'SERVER_PROTOCOL': f'HTTP/{scope.get("http_version", "1.1")}',
+        'REMOTE_ADDR': (scope.get('client') or ('', 0))[0],
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    for name, value in scope['headers']:
+        name = name.decode('latin-1').upper().replace('-', '_')
+        value = value.decode('latin-1')
+        if name not in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+            name = f'HTTP_{name}'
+        if name in environ:
+            separator = '; ' if name == 'HTTP_COOKIE' else ','
+            value = f'{environ[name]}{separator}{value}'
+        environ[name] = value
+    return environ
+
+
+def run_wsgi(environ, send):
+    """Runs in a pool thread; send() delivers a message to the loop."""
+    response = {}
+
+    def start_response(status, headers, exc_info=None):
+        response['start'] = {
+            'type': 'http.response.start',
+            'status': int(status.split(' ', 1)[0]),
+            'headers': [
+                (name.lower().encode('latin-1'), value.encode('latin-1'))
+                for name, value in headers
+            ],
+        }
+
+    result = wsgi_application(environ, start_response)
+    try:
+        started = False
+        for chunk in result:
+            if not chunk:
+                continue
+            if not started:
+                send(response['start'])
+                started = True
+            send({'type': 'http.response.body', 'body': chunk,
+                  'more_body': True})
+        if not started:
+            send(response['start'])
+        send({'type': 'http.response.body', 'body': b''})
+    finally:
+        close = getattr(result, 'close', None)
+        if close is not None:
+            close()
+
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def application(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        return await lifespan(receive, send)
+    if scope['type'] != 'http':
+        raise ValueError(f'Unsupported ASGI scope: {scope["type"]}')
+    body = []
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            return
+        body.append(message.get('body', b''))
+        if not message.get('more_body'):
+            break
+    loop = asyncio.get_running_loop()
+
+    def send_from_thread(message):
+        asyncio.run_coroutine_threadsafe(send(message), loop).result()
+
+    await loop.run_in_executor(
+        executor, run_wsgi, build_environ(scope, b''.join(body)),
+        send_from_thread
+    )
@@ -12,32 +12,55 @@ https://docs.djangoproject.com/en/2.2/ref/settings/
 
 import os
 
+from django.core.exceptions import ImproperlyConfigured
+
+
+def env_bool(name, default):
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.lower() in ('1', 'true', 'yes', 'on')
+
+
+def env_list(name):
+    return [item for item in os.environ.get(name, '').split(',') if item]
+
+
 # Build paths inside the project like this: os.path.join(BASE_DIR, ...)
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
 
-# Quick-start development settings - unsuitable for production
+# YATUBE_ENV=production switches to the production profile: no debug,
+# cached templates, persistent connections, hashed static files and
+# compressed responses. Every value below can be overridden from the
+# environment; ./manage.py check --deploy warns about slow settings.
 # See https://docs.djangoproject.com/en/2.2/howto/deployment/checklist/
 
+PRODUCTION = os.environ.get('YATUBE_ENV', 'development') == 'production'
+
 # SECURITY WARNING: keep the secret key used in production secret!
-SECRET_KEY = 'e_@g0o(^$ne#+5h^+73k^-nx2_g4y#3on9-8uhz$2iu)@fej+#'
+SECRET_KEY = os.environ.get('YATUBE_SECRET_KEY')
+if SECRET_KEY is None:
+    if PRODUCTION:
+        raise ImproperlyConfigured('Set YATUBE_SECRET_KEY in production.')
+    SECRET_KEY = 'e_@g0o(^$ne#+5h^+73k^-nx2_g4y#3on9-8uhz$2iu)@fej+#'
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+DEBUG = env_bool('YATUBE_DEBUG', not PRODUCTION)
 
 ALLOWED_HOSTS = [
     'localhost',
     '127.0.0.1',
     '[::1]',
     'testserver',
-]
+] + env_list('YATUBE_ALLOWED_HOSTS')
 
 
 # Application definition
 
 INSTALLED_APPS = [
     'users',
-    'posts',
+    'posts.apps.PostsConfig',
     'about',
     'django.contrib.admin',
     'django.contrib.auth',
@@ -49,8 +72,12 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'posts.middleware.RequestMetricsMiddleware',
+    'django.middleware.gzip.GZipMiddleware',
+    'django.middleware.http.ConditionalGetMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
+    'posts.routers.ReplicaMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
@@ -60,13 +87,20 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = 'yatube.urls'
 TEMPLATES_DIR = os.path.join(BASE_DIR, 'templates')
+TEMPLATE_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
 
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [TEMPLATES_DIR],
-        'APP_DIRS': True,
         'OPTIONS': {
+            # Compiled templates are kept in memory unless in debug mode.
+            'loaders': TEMPLATE_LOADERS if DEBUG else [
+                ('django.template.loaders.cached.Loader', TEMPLATE_LOADERS),
+            ],
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
@@ -86,12 +120,53 @@ WSGI_APPLICATION = 'yatube.wsgi.application'
 
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        'ENGINE': os.environ.get(
+            'YATUBE_DB_ENGINE', 'django.db.backends.sqlite3'
+        ),
+        'NAME': os.environ.get(
+            'YATUBE_DB_NAME', os.path.join(BASE_DIR, 'db.sqlite3')
+        ),
+        'USER': os.environ.get('YATUBE_DB_USER', ''),
+        'PASSWORD': os.environ.get('YATUBE_DB_PASSWORD', ''),
+        'HOST': os.environ.get('YATUBE_DB_HOST', ''),
+        'PORT': os.environ.get('YATUBE_DB_PORT', ''),
+        # Connections are reused between requests instead of reopened.
+        'CONN_MAX_AGE': int(os.environ.get(
+            'YATUBE_CONN_MAX_AGE', 60 if PRODUCTION else 0
+        )),
     }
 }
 
 
+# Read replicas: YATUBE_DB_REPLICAS lists file names for SQLite or hosts
+# for other engines. GET and HEAD requests read from a random replica,
+# writes go to the primary, and so do all requests of a user for
+# DATABASE_PIN_SECONDS after they wrote. Pages whose cached fragments
+# changed in that window are rendered from the primary as well, so it
+# must exceed the replication lag. ./manage.py sync_replica copies a
+# SQLite primary into its replicas.
+
+REPLICA_SETTING = (
+    'NAME' if DATABASES['default']['ENGINE'].endswith('sqlite3') else 'HOST'
+)
+DATABASES.update({
+    f'replica{number}': dict(
+        DATABASES['default'],
+        **{REPLICA_SETTING: location},
+        TEST={'MIRROR': 'default'}
+    )
+    for number, location in enumerate(env_list('YATUBE_DB_REPLICAS'), 1)
+})
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+DATABASE_ROUTERS = ['posts.routers.ReplicaRouter']
+DATABASE_PIN_SECONDS = int(os.environ.get('YATUBE_DB_PIN_SECONDS', 5))
+
+
+# Sessions are read from the cache and written through to the database.
+if PRODUCTION:
+    SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+
+
 # Password validation
 # https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
 
@@ -130,6 +205,12 @@ USE_TZ = True
 
 STATIC_URL = '/static/'
 STATIC_ROOT = os.path.join(BASE_DIR, 'static')
+# Hashed file names let the web server cache static files forever,
+# ./manage.py collectstatic has to run before start.
+if PRODUCTION:
+    STATICFILES_STORAGE = (
+        'django.contrib.staticfiles.storage.ManifestStaticFilesStorage'
+    )
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
@@ -147,11 +228,146 @@ EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 
 PER_PAGE = 10
+COMMENTS_PER_PAGE = 20
+
+# Feed and post pages answer conditional GETs with 304. Pages for
+# anonymous users are public: shared caches may keep them this many
+# seconds and revalidate them with ETag afterwards.
+
+PAGE_CACHE_MAX_AGE = int(os.environ.get('YATUBE_PAGE_MAX_AGE', 0))
+
+# RSS, Atom and JSON feeds list the newest FEED_ITEMS posts and are
+# streamed to the client FEED_CHUNK_ITEMS entries at a time.
+
+FEED_ITEMS = 50
+FEED_CHUNK_ITEMS = 10
+
+# Post thumbnails are generated by a background task after upload.
+# Every variant keeps the 960x339 aspect ratio and is listed in srcset,
+# POST_THUMBNAIL_GEOMETRY is the src for browsers without srcset support.
+
+POST_IMAGE_VARIANTS = ('480x170', '768x271', '960x339', '1440x508')
+POST_IMAGE_SIZES = '(min-width: 1000px) 960px, 100vw'
+POST_THUMBNAIL_GEOMETRY = '960x339'
+POST_THUMBNAIL_OPTIONS = {'crop': 'center', 'upscale': True}
+THUMBNAIL_WORKERS = 2
+
+# Background tasks run after the write transaction commits. 'thread' runs
+# them in a pool inside the web process (development), 'database' queues
+# them in the posts_queuedtask table for ./manage.py run_worker,
+# 'immediate' runs them right away (tests). Failed tasks are retried
+# TASK_MAX_RETRIES times, waiting TASK_RETRY_DELAY seconds doubled on each
+# retry. Tasks held by a dead worker are requeued after TASK_LOCK_TIMEOUT.
+
+TASK_BACKEND = os.environ.get(
+    'YATUBE_TASK_BACKEND', 'database' if PRODUCTION else 'thread'
+)
+TASK_WORKERS = 2
+TASK_MAX_RETRIES = 3
+TASK_RETRY_DELAY = 5
+TASK_LOCK_TIMEOUT = 600
+
+# Uploads are streamed to temporary files and cut off at the size limit,
+# post images are re-encoded to a bounded master copy without EXIF
+
+FILE_UPLOAD_HANDLERS = [
+    'posts.uploads.SizeLimitUploadHandler',
+    'django.core.files.uploadhandler.TemporaryFileUploadHandler',
+]
+POST_IMAGE_MAX_UPLOAD_SIZE = 10 * 1024 * 1024
+POST_IMAGE_MAX_SIDE = 1920
+POST_IMAGE_FORMAT = 'JPEG'
+POST_IMAGE_QUALITY = 85
+
+# Feed pagination: 'page' (?page=, Paginator) or 'cursor' (?cursor=, keyset)
+
+FEED_PAGINATION = {
+    'index': 'page',
+    'group': 'page',
+    'profile': 'page',
+    'follow': 'page',
+}
 
-# Cache
+# Personal feed: new posts are copied into followers' timelines, posts of
+# authors with more followers than FANOUT_MAX_FOLLOWERS are read directly
+
+FANOUT_MAX_FOLLOWERS = 1000
+TIMELINE_BACKFILL = 100
+
+# Cache: YATUBE_CACHE selects the backend. locmem is per process, use
+# redis (needs django-redis) or memcached (needs python-memcached) when
+# several workers run. file is the shared local stand-in for tests,
+# db works too (./manage.py createcachetable) but its queries show up
+# in query counts.
+
+CACHE_BACKENDS = {
+    'locmem': ('django.core.cache.backends.locmem.LocMemCache', ''),
+    'file': (
+        'django.core.cache.backends.filebased.FileBasedCache',
+        os.path.join(BASE_DIR, 'cache'),
+    ),
+    'db': ('django.core.cache.backends.db.DatabaseCache', 'yatube_cache'),
+    'redis': ('django_redis.cache.RedisCache', 'redis://127.0.0.1:6379/1'),
+    'memcached': (
+        'django.core.cache.backends.memcached.MemcachedCache',
+        '127.0.0.1:11211',
+    ),
+}
+CACHE_NAME = os.environ.get('YATUBE_CACHE', 'locmem')
+if CACHE_NAME not in CACHE_BACKENDS:
+    raise ImproperlyConfigured(
+        f'YATUBE_CACHE must be one of: {", ".join(CACHE_BACKENDS)}.'
+    )
+CACHE_BACKEND, CACHE_LOCATION = CACHE_BACKENDS[CACHE_NAME]
 
 CACHES = {
     'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'BACKEND': CACHE_BACKEND,
+        'LOCATION': os.environ.get('YATUBE_CACHE_LOCATION') or CACHE_LOCATION,
+        'KEY_PREFIX': os.environ.get('YATUBE_CACHE_PREFIX', 'yatube'),
     }
-}
\ No newline at end of file
+}
+
+# Feed fragments are invalidated by version bumps, the timeout only
+# bounds memory use.
+
+FRAGMENT_CACHE_TIMEOUT = 60 * 60 * 6
+
+# Fragments and post cards longer than this are stored zlib-compressed.
+
+FRAGMENT_COMPRESS_MIN_LENGTH = 4096
+
+# Stampede protection for hot fragments: 'lock' lets one request render
+# the new version while the others serve the previous one, 'xfetch'
+# refreshes entries early with a probability growing towards expiry.
+
+FRAGMENT_STAMPEDE_SCOPES = ('index',)
+FRAGMENT_STAMPEDE_MODE = os.environ.get('YATUBE_STAMPEDE_MODE', 'lock')
+FRAGMENT_LOCK_TIMEOUT = 10
+FRAGMENT_XFETCH_BETA = 1.0
+
+# Request metrics: a sampled share of requests gets a Server-Timing header
+# and a log line in posts.metrics. Slow requests are logged as warnings,
+# lower the logger level to INFO to log every sampled request.
+
+REQUEST_METRICS_SAMPLE_RATE = float(os.environ.get(
+    'YATUBE_METRICS_SAMPLE_RATE', 0.1 if PRODUCTION else 1.0
+))
+REQUEST_METRICS_SLOW_MS = int(os.environ.get('YATUBE_METRICS_SLOW_MS', 500))
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'posts.metrics': {
+            'handlers': ['console'],
+            'level': os.environ.get('YATUBE_METRICS_LOG_LEVEL', 'WARNING'),
+            'propagate': False,
+        },
+    },
+}
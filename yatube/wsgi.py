@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
 
 application = get_wsgi_application()
+
+# Compile the project templates before the first request reaches the worker.
+from posts.warmup import warm_up  # noqa: E402
+
+warm_up()